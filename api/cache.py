@@ -0,0 +1,294 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, List, Optional
+from urllib.parse import urlencode
+
+import psycopg
+from fastapi.encoders import jsonable_encoder
+
+from api.db import CACHE_INVALIDATION_CHANNEL, _get_db_url
+from api.env import float_env, int_env
+
+MISSING = object()
+
+
+class TTLCache:
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._items: Dict[Hashable, tuple] = {}
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Any:
+        if self.ttl <= 0:
+            return MISSING
+        now = time.monotonic()
+        with self._lock:
+            item = self._items.get(key)
+            if item is None or item[0] <= now:
+                if item is not None:
+                    del self._items[key]
+                self.misses += 1
+                return MISSING
+            self.hits += 1
+            return item[1]
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            # A value read before the last invalidation may already be stale.
+            if generation is not None and generation != self.generation:
+                return
+            self._items[key] = (time.monotonic() + self.ttl, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.generation += 1
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "ttl": self.ttl,
+                "size": len(self._items),
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "generation": self.generation,
+            }
+
+
+class LRUCache:
+    backend = "memory"
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._items: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            if key not in self._items:
+                self.misses += 1
+                return MISSING
+            self._items.move_to_end(key)
+            self.hits += 1
+            return self._items[key]
+
+    def set(self, key: str, value: Any, generation: Optional[int] = None) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.generation += 1
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": self.backend,
+                "size": len(self._items),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "generation": self.generation,
+            }
+
+
+class SqliteResponseCache:
+    backend = "sqlite"
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS response_cache (
+              cache_key TEXT PRIMARY KEY,
+              payload TEXT NOT NULL,
+              accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_response_cache_accessed ON response_cache (accessed_at)"
+        )
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM response_cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return MISSING
+            self._conn.execute(
+                "UPDATE response_cache SET accessed_at = ? WHERE cache_key = ?",
+                (time.time(), key),
+            )
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, generation: Optional[int] = None) -> None:
+        if self.max_entries <= 0:
+            return
+        payload = json.dumps(jsonable_encoder(value), ensure_ascii=True)
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._conn.execute(
+                "INSERT OR REPLACE INTO response_cache (cache_key, payload, accessed_at) VALUES (?, ?, ?)",
+                (key, payload, time.time()),
+            )
+            size = self._conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+            overflow = size - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    """
+                    DELETE FROM response_cache
+                    WHERE cache_key IN (
+                      SELECT cache_key FROM response_cache ORDER BY accessed_at LIMIT ?
+                    )
+                    """,
+                    (overflow,),
+                )
+                self.evictions += overflow
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM response_cache")
+            self.generation += 1
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+            return {
+                "backend": self.backend,
+                "path": self.path,
+                "size": size,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "generation": self.generation,
+            }
+
+
+def build_response_cache():
+    backend = os.getenv("API_RESPONSE_CACHE_BACKEND", "memory").strip().lower()
+    max_entries = int_env("API_RESPONSE_CACHE_SIZE", 1024)
+    if backend in {"none", "off", "0"}:
+        return LRUCache(0)
+    if backend == "sqlite":
+        path = os.getenv("API_RESPONSE_CACHE_PATH", "").strip() or "tmp/api_response_cache.sqlite3"
+        if not os.path.isabs(path):
+            path = str(Path(__file__).resolve().parents[1] / path)
+        return SqliteResponseCache(path, max_entries)
+    return LRUCache(max_entries)
+
+
+def response_cache_key(route: str, data_version: str, week: Optional[str], **params: Any) -> str:
+    normalized = sorted((key, str(value)) for key, value in params.items() if value is not None)
+    return f"{route}|{data_version}|{week or ''}|{urlencode(normalized)}"
+
+
+resolution_cache = TTLCache(float_env("API_RESOLVE_CACHE_TTL", 300.0))
+response_cache = build_response_cache()
+
+
+class InvalidationListener:
+    def __init__(self, callbacks: List[Callable[[str], None]], channel: str = CACHE_INVALIDATION_CHANNEL):
+        self.callbacks = callbacks
+        self.channel = channel
+        self.notifications = 0
+        self.last_payload: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="cache-invalidation", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        thread = self._thread
+        self._thread = None
+        if thread is not None:
+            thread.join(timeout=5)
+
+    def _dispatch(self, payload: str) -> None:
+        self.notifications += 1
+        self.last_payload = payload
+        for callback in self.callbacks:
+            callback(payload)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                with psycopg.connect(_get_db_url(), autocommit=True) as conn:
+                    conn.execute(f"LISTEN {self.channel}")
+                    # Anything sent while we were disconnected is lost, so start clean.
+                    self._dispatch("listen")
+                    while not self._stop.is_set():
+                        for notify in conn.notifies(timeout=1.0):
+                            self._dispatch(notify.payload)
+            except psycopg.Error as exc:
+                print("[cache] listener error", f"error={exc}", flush=True)
+                self._stop.wait(5.0)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "channel": self.channel,
+            "running": self._thread is not None,
+            "notifications": self.notifications,
+            "last_payload": self.last_payload,
+        }
+
+
+invalidation_listener = InvalidationListener(
+    [
+        lambda _payload: resolution_cache.clear(),
+        lambda _payload: response_cache.clear(),
+    ]
+)
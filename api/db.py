@@ -1,13 +1,22 @@
 import os
-from contextlib import contextmanager
+from contextlib import asynccontextmanager, contextmanager
 from pathlib import Path
+from typing import Any, Dict, Optional
 
 from dotenv import load_dotenv
 import psycopg
+from psycopg_pool import AsyncConnectionPool, ConnectionPool
+
+from api.env import float_env, int_env
 
 _ENV_PATH = Path(__file__).resolve().parents[1] / ".env"
 load_dotenv(dotenv_path=_ENV_PATH)
 
+CACHE_INVALIDATION_CHANNEL = "task_risk_cache"
+
+_pool: Optional[ConnectionPool] = None
+_async_pool: Optional[AsyncConnectionPool] = None
+
 
 def _get_db_url() -> str:
     db_url = os.getenv("DATABASE_URL")
@@ -21,10 +30,103 @@ def _get_db_url() -> str:
     return f"postgresql://{user}:{password}@{host}:{port}/{name}"
 
 
+def _pool_settings() -> Dict[str, Any]:
+    min_size = max(0, int_env("DB_POOL_MIN_SIZE", 2))
+    max_size = max(min_size, 1, int_env("DB_POOL_MAX_SIZE", 10))
+    return {
+        "min_size": min_size,
+        "max_size": max_size,
+        "max_lifetime": float_env("DB_POOL_MAX_LIFETIME", 1800.0),
+        "max_idle": float_env("DB_POOL_MAX_IDLE", 300.0),
+        "timeout": float_env("DB_POOL_TIMEOUT", 10.0),
+    }
+
+
+def open_pool() -> ConnectionPool:
+    global _pool
+    if _pool is not None:
+        return _pool
+    pool = ConnectionPool(
+        _get_db_url(),
+        name="task-risk-api",
+        check=ConnectionPool.check_connection,
+        open=False,
+        **_pool_settings(),
+    )
+    pool.open(wait=False)
+    _pool = pool
+    return pool
+
+
+def close_pool() -> None:
+    global _pool
+    pool = _pool
+    _pool = None
+    if pool is not None:
+        pool.close()
+
+
+def pool_stats() -> Dict[str, Any]:
+    if _pool is None:
+        return {"open": False}
+    stats: Dict[str, Any] = {"open": True, "name": _pool.name}
+    stats.update(_pool.get_stats())
+    return stats
+
+
+async def open_async_pool() -> AsyncConnectionPool:
+    global _async_pool
+    if _async_pool is not None:
+        return _async_pool
+    pool = AsyncConnectionPool(
+        _get_db_url(),
+        name="task-risk-api-async",
+        check=AsyncConnectionPool.check_connection,
+        open=False,
+        **_pool_settings(),
+    )
+    await pool.open(wait=False)
+    _async_pool = pool
+    return pool
+
+
+async def close_async_pool() -> None:
+    global _async_pool
+    pool = _async_pool
+    _async_pool = None
+    if pool is not None:
+        await pool.close()
+
+
+def async_pool_stats() -> Dict[str, Any]:
+    if _async_pool is None:
+        return {"open": False}
+    stats: Dict[str, Any] = {"open": True, "name": _async_pool.name}
+    stats.update(_async_pool.get_stats())
+    return stats
+
+
+def notify_cache_invalidation(conn, payload: str) -> None:
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_notify(%s, %s)", (CACHE_INVALIDATION_CHANNEL, payload))
+
+
 @contextmanager
 def get_conn():
+    if _pool is not None:
+        with _pool.connection() as conn:
+            yield conn
+        return
     conn = psycopg.connect(_get_db_url())
     try:
         yield conn
     finally:
         conn.close()
+
+
+@asynccontextmanager
+async def get_async_conn():
+    if _async_pool is None:
+        raise RuntimeError("async connection pool is not open")
+    async with _async_pool.connection() as conn:
+        yield conn
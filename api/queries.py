@@ -0,0 +1,577 @@
+import base64
+import binascii
+import json
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Optional, Tuple
+
+ACTIVE_DATA_VERSION_SQL = """
+    SELECT id
+    FROM data_version
+    WHERE is_active = TRUE
+    ORDER BY id DESC
+    LIMIT 1
+"""
+
+LATEST_SNAPSHOT_WEEK_SQL = """
+    SELECT week
+    FROM tech_progress_weekly_snapshot
+    WHERE data_version = %(data_version)s
+    ORDER BY week DESC
+    LIMIT 1
+"""
+
+LATEST_ACTIVE_WEEK_SQL = """
+    SELECT week
+    FROM tech_progress_scope_active
+    WHERE data_version = %(data_version)s
+      AND status = 'active'
+    ORDER BY week DESC, created_at DESC
+    LIMIT 1
+"""
+
+ACTIVE_SCOPE_ID_SQL = """
+    SELECT active_id
+    FROM tech_progress_scope_active
+    WHERE data_version = %(data_version)s
+      AND week = %(week)s
+      AND status = 'active'
+    ORDER BY created_at DESC
+    LIMIT 1
+"""
+
+OCCUPATION_ROWS_SQL = """
+    SELECT onetsoc_code, title, description
+    FROM occupation_master
+    WHERE data_version = %(data_version)s
+      AND soc_code = %(soc_code)s
+    ORDER BY onetsoc_code
+"""
+
+OCCUPATION_ALTERNATE_TITLES_SQL = """
+    SELECT DISTINCT at.alternate_title
+    FROM alternate_titles at
+    JOIN occupation_master om
+      ON om.data_version = at.data_version
+     AND om.onetsoc_code = at.onetsoc_code
+    WHERE at.data_version = %(data_version)s
+      AND om.soc_code = %(soc_code)s
+    ORDER BY at.alternate_title
+"""
+
+OCCUPATION_TOP_TASKS_SQL = """
+    SELECT ts.task_id, ts.task_statement, otw.weight
+    FROM occupation_task_weight otw
+    JOIN task_statements ts
+      ON ts.data_version = otw.data_version
+     AND ts.task_id = otw.task_id
+    WHERE otw.data_version = %(data_version)s
+      AND otw.soc_code = %(soc_code)s
+    ORDER BY otw.weight DESC, ts.task_id
+    LIMIT 20
+"""
+
+OCCUPATION_AI_SCORE_SQL = """
+    SELECT
+      mean,
+      std,
+      ai_augmentation_potential_mean,
+      ai_augmentation_potential_std,
+      human_context_dependency_mean,
+      human_context_dependency_std,
+      physical_world_dependency_mean,
+      physical_world_dependency_std,
+      confidence_mean,
+      confidence_std,
+      updated_at
+    FROM occupation_ai_score
+    WHERE data_version = %(data_version)s
+      AND soc_code = %(soc_code)s
+      AND (
+        (%(week)s::text IS NULL AND week = 'legacy')
+        OR week = %(week)s::text
+      )
+"""
+
+OCCUPATION_SEARCH_MATCH_SQL = """
+            SELECT soc_code
+            FROM occupation_search
+            WHERE data_version = %(data_version)s
+              AND {match_sql}
+"""
+
+OCCUPATION_SEARCH_SUBSTRING_SQL = "term_norm LIKE %(q)s"
+
+OCCUPATION_SEARCH_FUZZY_SQL = "(term_norm LIKE %(q)s OR term_norm %% %(q_norm)s)"
+
+OCCUPATION_SEARCH_RELEVANCE_SQL = """
+        LEFT JOIN (
+            SELECT
+                soc_code,
+                MAX(
+                  similarity(term_norm, %(q_norm)s)
+                  + CASE WHEN term_norm LIKE %(q_prefix)s THEN 1 ELSE 0 END
+                ) AS relevance
+            FROM occupation_search
+            WHERE data_version = %(data_version)s
+              AND {match_sql}
+            GROUP BY soc_code
+        ) search_match ON search_match.soc_code = om.soc_code
+"""
+
+OCCUPATION_SUGGEST_SQL = """
+    SELECT soc_code, title, term, source
+    FROM (
+      SELECT DISTINCT ON (os.soc_code)
+        os.soc_code, om.title, os.term, os.source
+      FROM occupation_search os
+      JOIN occupation_master om
+        ON om.data_version = os.data_version
+       AND om.onetsoc_code = os.soc_code || '.00'
+      WHERE os.data_version = %(data_version)s
+        AND os.term_norm LIKE %(prefix)s
+      ORDER BY os.soc_code, (os.source = 'title') DESC, LENGTH(os.term)
+    ) matches
+    ORDER BY (source = 'title') DESC, LENGTH(term), title
+    LIMIT %(limit)s
+"""
+
+OCCUPATION_DETAIL_DOC_SQL = """
+    SELECT doc::text AS doc
+    FROM occupation_detail_doc
+    WHERE data_version = %(data_version)s
+      AND week = %(week)s
+      AND soc_code = %(soc_code)s
+"""
+
+AI_RISK_RANKINGS_SQL = """
+    SELECT
+        om.soc_code,
+        om.title,
+        oai.mean AS ai_mean,
+        oai.std AS ai_std
+    FROM occupation_master om
+    JOIN occupation_ai_score oai
+      ON oai.data_version = om.data_version
+     AND oai.soc_code = om.soc_code
+     AND (
+       (%(week)s::text IS NULL AND oai.week = 'legacy')
+       OR oai.week = %(week)s::text
+     )
+    WHERE om.data_version = %(data_version)s
+      AND om.onetsoc_code LIKE '%%.00'
+    ORDER BY oai.mean DESC NULLS LAST
+    LIMIT %(limit)s
+"""
+
+TECH_PROGRESS_WEEKS_SQL = """
+    SELECT DISTINCT week
+    FROM tech_progress_weekly_snapshot
+    WHERE data_version = %(data_version)s
+    ORDER BY week DESC
+"""
+
+TECH_PROGRESS_SUMMARY_VERSION = 1
+
+TECH_PROGRESS_SUMMARY_SCOPE_SQL = """
+    SELECT sa.active_id, ws.payload_json
+    FROM tech_progress_scope_active sa
+    LEFT JOIN tech_progress_llm_weekly_summary ws
+      ON ws.data_version = sa.data_version
+     AND ws.week = sa.week
+     AND ws.version = %(version)s
+     AND ws.payload_json->>'active_scope_id' = sa.active_id
+    WHERE sa.data_version = %(data_version)s
+      AND sa.week = %(week)s
+      AND sa.status = 'active'
+    ORDER BY sa.created_at DESC
+    LIMIT 1
+"""
+
+TECH_PROGRESS_SUMMARY_METRICS_SQL = """
+    WITH scope_tasks AS (
+      SELECT task_id
+      FROM tech_progress_scope_active_task
+      WHERE active_id = %(active_id)s
+        AND data_version = %(data_version)s
+    ),
+    snap AS (
+      SELECT s.progress_score, s.delta
+      FROM tech_progress_weekly_snapshot s
+      JOIN scope_tasks st ON st.task_id = s.task_id
+      WHERE s.data_version = %(data_version)s
+        AND s.week = %(week)s
+    )
+    SELECT
+      COUNT(*) FILTER (WHERE delta <> 0) AS tasks_with_change,
+      AVG(progress_score) AS avg_progress
+    FROM snap
+"""
+
+TECH_PROGRESS_SUMMARY_TOP_TASKS_SQL = """
+    WITH scope_tasks AS (
+      SELECT task_id
+      FROM tech_progress_scope_active_task
+      WHERE active_id = %(active_id)s
+        AND data_version = %(data_version)s
+    )
+    SELECT s.task_id, ts.task_statement, s.delta
+    FROM tech_progress_weekly_snapshot s
+    JOIN scope_tasks st ON st.task_id = s.task_id
+    JOIN task_statements ts
+      ON ts.data_version = %(data_version)s
+     AND ts.task_id = s.task_id
+    WHERE s.data_version = %(data_version)s
+      AND s.week = %(week)s
+    ORDER BY s.delta DESC NULLS LAST
+    LIMIT 6
+"""
+
+TECH_PROGRESS_SUMMARY_TOP_TECH_SQL = """
+    WITH scope_tasks AS (
+      SELECT task_id
+      FROM tech_progress_scope_active_task
+      WHERE active_id = %(active_id)s
+        AND data_version = %(data_version)s
+    )
+    SELECT
+      l.tech_id,
+      t.name,
+      COUNT(DISTINCT l.task_id) AS task_count,
+      AVG(l.impact_score) AS avg_impact
+    FROM tech_progress_task_link l
+    JOIN tech_progress_technology t ON t.tech_id = l.tech_id
+    JOIN scope_tasks st ON st.task_id = l.task_id
+    WHERE l.data_version = %(data_version)s
+      AND l.week = %(week)s
+    GROUP BY l.tech_id, t.name
+    ORDER BY task_count DESC, avg_impact DESC
+    LIMIT 6
+"""
+
+TECH_PROGRESS_TASKS_SQL_TEMPLATE = """
+    WITH scope_tasks AS (
+      SELECT task_id
+      FROM tech_progress_scope_active_task
+      WHERE active_id = %(active_id)s
+        AND data_version = %(data_version)s
+    )
+    SELECT
+      s.task_id,
+      ts.task_statement,
+      s.progress_score,
+      s.delta,
+      r.top_tech_id,
+      r.top_tech_name,
+      COALESCE(r.link_count, 0) AS link_count{total_sql}
+    FROM tech_progress_weekly_snapshot s
+    JOIN scope_tasks st ON st.task_id = s.task_id
+    JOIN task_statements ts
+      ON ts.data_version = %(data_version)s
+     AND ts.task_id = s.task_id
+    LEFT JOIN tech_progress_task_link_rollup r
+      ON r.data_version = s.data_version
+     AND r.week = s.week
+     AND r.task_id = s.task_id
+    WHERE s.data_version = %(data_version)s
+      AND s.week = %(week)s
+      AND (
+        %(min_delta)s::double precision IS NULL
+        OR s.delta >= %(min_delta)s::double precision
+      )
+      AND (
+        %(link_type)s::text IS NULL
+        OR %(link_type)s::text = ANY(r.link_types)
+      )
+      {keyset_sql}
+    ORDER BY s.delta DESC NULLS LAST, s.task_id
+    LIMIT %(limit)s OFFSET %(offset)s
+"""
+
+TECH_PROGRESS_TASKS_KEYSET_SQL = """
+      AND (
+        s.delta < %(cursor_key)s::numeric
+        OR (s.delta = %(cursor_key)s::numeric AND s.task_id > %(cursor_id)s::bigint)
+      )
+"""
+
+WINDOW_TOTAL_SQL = """,
+      COUNT(*) OVER () AS total_count"""
+
+TECH_PROGRESS_TASKS_SQL = TECH_PROGRESS_TASKS_SQL_TEMPLATE.format(keyset_sql="", total_sql="")
+
+TECH_PROGRESS_TASKS_COUNT_SQL = """
+    WITH scope_tasks AS (
+      SELECT task_id
+      FROM tech_progress_scope_active_task
+      WHERE active_id = %(active_id)s
+        AND data_version = %(data_version)s
+    )
+    SELECT COUNT(*) AS total
+    FROM tech_progress_weekly_snapshot s
+    JOIN scope_tasks st ON st.task_id = s.task_id
+    LEFT JOIN tech_progress_task_link_rollup r
+      ON r.data_version = s.data_version
+     AND r.week = s.week
+     AND r.task_id = s.task_id
+    WHERE s.data_version = %(data_version)s
+      AND s.week = %(week)s
+      AND (
+        %(min_delta)s::double precision IS NULL
+        OR s.delta >= %(min_delta)s::double precision
+      )
+      AND (
+        %(link_type)s::text IS NULL
+        OR %(link_type)s::text = ANY(r.link_types)
+      )
+"""
+
+TECH_PROGRESS_TASK_SQL = """
+    SELECT s.task_id, ts.task_statement, s.progress_score, s.delta
+    FROM tech_progress_weekly_snapshot s
+    JOIN task_statements ts
+      ON ts.data_version = %(data_version)s
+     AND ts.task_id = s.task_id
+    WHERE s.data_version = %(data_version)s
+      AND s.week = %(week)s
+      AND s.task_id = %(task_id)s
+"""
+
+TECH_PROGRESS_TASK_LINKS_SQL = """
+    SELECT
+      l.tech_id,
+      t.name AS tech_name,
+      l.link_type,
+      l.impact_score,
+      l.confidence,
+      l.evidence_id
+    FROM tech_progress_task_link l
+    JOIN tech_progress_technology t ON t.tech_id = l.tech_id
+    WHERE l.data_version = %(data_version)s
+      AND l.week = %(week)s
+      AND l.task_id = %(task_id)s
+    ORDER BY l.impact_score DESC
+"""
+
+TECH_PROGRESS_EVIDENCE_SQL = """
+    SELECT
+      e.evidence_id,
+      e.evidence_date,
+      e.summary,
+      es.source_type
+    FROM tech_progress_evidence e
+    JOIN tech_progress_evidence_source es
+      ON es.source_id = e.source_id
+    WHERE e.evidence_id = ANY(%(ids)s)
+    ORDER BY e.evidence_date DESC
+"""
+
+
+def encode_cursor(payload: Dict[str, Any]) -> str:
+    raw = json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _is_numeric_key(value: Any) -> bool:
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, (int, float)):
+        return value == value and abs(value) != float("inf")
+    if isinstance(value, str):
+        try:
+            return Decimal(value).is_finite()
+        except InvalidOperation:
+            return False
+    return False
+
+
+def parse_cursor(
+    value: Optional[str],
+    sort: Optional[str] = None,
+    id_type: type = int,
+    nullable_key: bool = False,
+) -> Optional[Dict[str, Any]]:
+    if not value:
+        return None
+    padded = value + "=" * (-len(value) % 4)
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, binascii.Error) as exc:
+        raise ValueError("invalid cursor") from exc
+    if not isinstance(payload, dict) or "id" not in payload or "k" not in payload:
+        raise ValueError("invalid cursor")
+    if sort is not None and payload.get("s") != sort:
+        raise ValueError("cursor does not match sort")
+    key, cursor_id = payload["k"], payload["id"]
+    if not (_is_numeric_key(key) or (key is None and nullable_key)):
+        raise ValueError("invalid cursor")
+    if isinstance(cursor_id, bool) or not isinstance(cursor_id, id_type):
+        raise ValueError("invalid cursor")
+    return payload
+
+
+def split_keyset_page(
+    rows: List[Dict[str, Any]],
+    page_size: int,
+    key_field: str,
+    id_field: str,
+    sort: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    last = rows[-1]
+    payload: Dict[str, Any] = {"k": last[key_field], "id": last[id_field]}
+    if sort is not None:
+        payload["s"] = sort
+    return rows, encode_cursor(payload)
+
+
+def pop_window_total(rows: List[Dict[str, Any]]) -> Optional[int]:
+    total = None
+    for row in rows:
+        total = row.pop("total_count")
+    return total
+
+
+def like_pattern(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def normalize_search(value: Optional[str]) -> Optional[str]:
+    value = (value or "").strip()
+    return value or None
+
+
+def normalize_occupation_sort(sort: str, search: Optional[str]) -> str:
+    if sort == "relevance" and not search:
+        return "ai"
+    return sort
+
+
+def occupation_sort_key(sort: str) -> Tuple[str, str]:
+    if sort == "employment":
+        return "bls.employment", "employment"
+    if sort == "relevance":
+        return "search_match.relevance", "relevance"
+    return "oai.mean", "ai_mean"
+
+
+def occupation_list_queries(
+    data_version: str,
+    week: Optional[str],
+    search: Optional[str],
+    sort: str,
+    page: int,
+    page_size: int,
+    keyset: bool = False,
+    after: Optional[Dict[str, Any]] = None,
+    with_total: bool = False,
+    fuzzy: bool = False,
+) -> Tuple[str, str, Dict[str, Any]]:
+    where_clauses = ["om.onetsoc_code LIKE '%%.00'", "om.data_version = %(data_version)s"]
+    params: Dict[str, Any] = {"data_version": data_version, "week": week}
+
+    relevance_join = ""
+    relevance_select = ""
+    if search:
+        q_norm = search.strip().lower()
+        match_sql = OCCUPATION_SEARCH_FUZZY_SQL if fuzzy else OCCUPATION_SEARCH_SUBSTRING_SQL
+        where_clauses.append(f"om.soc_code IN ({OCCUPATION_SEARCH_MATCH_SQL.format(match_sql=match_sql).strip()})")
+        params["q"] = f"%{like_pattern(q_norm)}%"
+        params["q_norm"] = q_norm
+        if sort == "relevance":
+            params["q_prefix"] = f"{like_pattern(q_norm)}%"
+            relevance_join = OCCUPATION_SEARCH_RELEVANCE_SQL.format(match_sql=match_sql)
+            relevance_select = ",\n            search_match.relevance"
+
+    filter_sql = ""
+    if where_clauses:
+        filter_sql = "WHERE " + " AND ".join(where_clauses)
+
+    sort_expr, _ = occupation_sort_key(sort)
+    if after:
+        params["cursor_id"] = after["id"]
+        if after["k"] is None:
+            where_clauses.append(f"({sort_expr} IS NULL AND om.onetsoc_code > %(cursor_id)s)")
+        else:
+            params["cursor_key"] = str(after["k"])
+            where_clauses.append(
+                f"({sort_expr} < %(cursor_key)s::numeric"
+                f" OR ({sort_expr} = %(cursor_key)s::numeric AND om.onetsoc_code > %(cursor_id)s)"
+                f" OR {sort_expr} IS NULL)"
+            )
+
+    where_sql = "WHERE " + " AND ".join(where_clauses)
+    order_sql = f"ORDER BY {sort_expr} DESC NULLS LAST, om.onetsoc_code"
+
+    if keyset:
+        params.update({"limit": page_size + 1, "offset": 0})
+    else:
+        params.update({"limit": page_size, "offset": (page - 1) * page_size})
+    total_sql = WINDOW_TOTAL_SQL if with_total else ""
+
+    query = f"""
+        SELECT
+            om.onetsoc_code,
+            om.soc_code,
+            om.title,
+            oai.mean AS ai_mean,
+            oai.std AS ai_std,
+            bls.employment,
+            bls.median_wage,
+            bls.ref_year_month{relevance_select}{total_sql}
+        FROM occupation_master om
+        LEFT JOIN occupation_ai_score oai
+          ON oai.data_version = om.data_version
+         AND oai.soc_code = om.soc_code
+         AND (
+           (%(week)s::text IS NULL AND oai.week = 'legacy')
+           OR oai.week = %(week)s::text
+         )
+        LEFT JOIN bls_oews_latest bls ON bls.soc_code = om.soc_code{relevance_join}        {where_sql}
+        {order_sql}
+        LIMIT %(limit)s OFFSET %(offset)s
+    """
+
+    count_query = f"""
+        SELECT COUNT(*) AS total
+        FROM occupation_master om
+        {filter_sql}
+    """
+    return query, count_query, params
+
+
+def tech_progress_tasks_query(after: Optional[Dict[str, Any]] = None, with_total: bool = False) -> str:
+    if not after and not with_total:
+        return TECH_PROGRESS_TASKS_SQL
+    return TECH_PROGRESS_TASKS_SQL_TEMPLATE.format(
+        keyset_sql=TECH_PROGRESS_TASKS_KEYSET_SQL if after else "",
+        total_sql=WINDOW_TOTAL_SQL if with_total else "",
+    )
+
+
+def tech_progress_task_params(
+    active_id: str,
+    data_version: str,
+    week: str,
+    page: int,
+    page_size: int,
+    link_type: Optional[str],
+    min_delta: Optional[float],
+    keyset: bool = False,
+    after: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    params = {
+        "active_id": active_id,
+        "data_version": data_version,
+        "week": week,
+        "limit": page_size,
+        "offset": (page - 1) * page_size,
+        "link_type": link_type,
+        "min_delta": min_delta,
+    }
+    if keyset:
+        params.update({"limit": page_size + 1, "offset": 0})
+    if after:
+        params.update({"cursor_key": str(after["k"]), "cursor_id": after["id"]})
+    return params
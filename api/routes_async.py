@@ -0,0 +1,115 @@
+import asyncio
+from typing import Any, Optional
+
+from fastapi import APIRouter, Query
+from psycopg.rows import dict_row
+
+from api import service
+from api.db import get_async_conn
+
+router = APIRouter()
+
+
+async def run_fetch(fetch: service.Fetch) -> Any:
+    async with get_async_conn() as conn:
+        async with conn.cursor(row_factory=dict_row) as cur:
+            await cur.execute(fetch.sql, fetch.params)
+            return await (cur.fetchall() if fetch.many else cur.fetchone())
+
+
+async def run_handler(handler: service.Handler):
+    # Queries yielded together are independent, so each gets its own pooled connection.
+    try:
+        fetches = next(handler)
+        while True:
+            results = await asyncio.gather(*(run_fetch(fetch) for fetch in fetches))
+            fetches = handler.send(list(results))
+    except StopIteration as stop:
+        return stop.value
+
+
+@router.get("/occupations")
+async def list_occupations(
+    search: Optional[str] = Query(default=None),
+    sort: str = Query(default="ai"),
+    page: int = Query(default=1, ge=1),
+    page_size: int = Query(default=20, ge=1, le=100),
+    cursor: Optional[str] = Query(default=None),
+    include_total: bool = Query(default=True),
+    week: Optional[str] = Query(default=None),
+    data_version: Optional[str] = Query(default=None),
+    fuzzy: bool = Query(default=False),
+):
+    return await run_handler(
+        service.list_occupations(search, sort, page, page_size, cursor, include_total, week, data_version, fuzzy)
+    )
+
+
+@router.get("/occupations/suggest")
+async def suggest_occupations(
+    q: str = Query(min_length=1, max_length=100),
+    limit: int = Query(default=10, ge=1, le=50),
+    data_version: Optional[str] = Query(default=None),
+):
+    return await run_handler(service.suggest_occupations(q, limit, data_version))
+
+
+@router.get("/occupations/{soc_code}")
+async def get_occupation(
+    soc_code: str,
+    week: Optional[str] = Query(default=None),
+    data_version: Optional[str] = Query(default=None),
+):
+    return await run_handler(service.get_occupation(soc_code, week, data_version))
+
+
+@router.get("/rankings/ai_risk")
+async def ai_risk_rankings(
+    limit: int = Query(default=50, ge=1, le=200),
+    week: Optional[str] = Query(default=None),
+    data_version: Optional[str] = Query(default=None),
+):
+    return await run_handler(service.ai_risk_rankings(limit, week, data_version))
+
+
+@router.get("/tech-progress/weeks")
+async def list_tech_progress_weeks(
+    data_version: Optional[str] = Query(default=None),
+):
+    return await run_handler(service.list_tech_progress_weeks(data_version))
+
+
+@router.get("/tech-progress/summary")
+async def tech_progress_summary(
+    week: Optional[str] = Query(default=None),
+    data_version: Optional[str] = Query(default=None),
+):
+    return await run_handler(service.tech_progress_summary(week, data_version))
+
+
+@router.get("/tech-progress/tasks")
+async def list_tech_progress_tasks(
+    week: Optional[str] = Query(default=None),
+    data_version: Optional[str] = Query(default=None),
+    page: int = Query(default=1, ge=1),
+    page_size: int = Query(default=20, ge=1, le=100),
+    link_type: Optional[str] = Query(default=None),
+    min_delta: Optional[float] = Query(default=None),
+    cursor: Optional[str] = Query(default=None),
+    include_total: bool = Query(default=True),
+):
+    return await run_handler(
+        service.list_tech_progress_tasks(
+            week, data_version, page, page_size, link_type, min_delta, cursor, include_total
+        )
+    )
+
+
+@router.get("/tech-progress/tasks/{task_id}")
+async def tech_progress_task_detail(
+    task_id: int,
+    week: Optional[str] = Query(default=None),
+    data_version: Optional[str] = Query(default=None),
+):
+    return await run_handler(service.tech_progress_task_detail(task_id, week, data_version))
+
@@ -0,0 +1,416 @@
+import os
+from typing import Any, Dict, Generator, List, NamedTuple, Optional
+
+from fastapi import HTTPException, Response
+
+from api import queries
+from api.cache import MISSING, resolution_cache, response_cache, response_cache_key
+
+
+class Fetch(NamedTuple):
+    sql: str
+    params: Optional[Dict[str, Any]]
+    many: bool
+
+
+# Route handlers are generators: they yield a list of Fetch, receive the rows in the same order and
+# return the payload. api.main and api.routes_async only decide how the queries reach the database.
+Handler = Generator[List[Fetch], List[Any], Any]
+
+
+def fetch_one(sql: str, params: Optional[Dict[str, Any]] = None) -> Fetch:
+    return Fetch(sql, params, False)
+
+
+def fetch_all(sql: str, params: Optional[Dict[str, Any]] = None) -> Fetch:
+    return Fetch(sql, params, True)
+
+
+def resolve_data_version(requested: Optional[str]) -> Handler:
+    if requested:
+        return requested
+    env_version = os.getenv("DEFAULT_DATA_VERSION")
+    if env_version:
+        return env_version
+    generation = resolution_cache.generation
+    cached = resolution_cache.get(("data_version",))
+    if cached is not MISSING:
+        return cached
+    (row,) = yield [fetch_one(queries.ACTIVE_DATA_VERSION_SQL)]
+    resolved = row["id"] if row else "30.1"
+    resolution_cache.set(("data_version",), resolved, generation)
+    return resolved
+
+
+def _resolve_latest_week(key: tuple, sql: str, data_version: str, requested: Optional[str]) -> Handler:
+    if requested:
+        return requested
+    generation = resolution_cache.generation
+    cached = resolution_cache.get(key)
+    if cached is not MISSING:
+        return cached
+    (row,) = yield [fetch_one(sql, {"data_version": data_version})]
+    resolved = row["week"] if row else None
+    resolution_cache.set(key, resolved, generation)
+    return resolved
+
+
+def resolve_week(data_version: str, requested: Optional[str]) -> Handler:
+    return (
+        yield from _resolve_latest_week(
+            ("week", data_version), queries.LATEST_SNAPSHOT_WEEK_SQL, data_version, requested
+        )
+    )
+
+
+def resolve_active_week(data_version: str, requested: Optional[str]) -> Handler:
+    return (
+        yield from _resolve_latest_week(
+            ("active_week", data_version), queries.LATEST_ACTIVE_WEEK_SQL, data_version, requested
+        )
+    )
+
+
+def list_occupations(
+    search: Optional[str],
+    sort: str,
+    page: int,
+    page_size: int,
+    cursor: Optional[str],
+    include_total: bool,
+    week: Optional[str],
+    data_version: Optional[str],
+    fuzzy: bool = False,
+) -> Handler:
+    generation = response_cache.generation
+    keyset = cursor is not None
+    window_total = include_total and not keyset
+    search = queries.normalize_search(search)
+    fuzzy = fuzzy and search is not None
+    sort = queries.normalize_occupation_sort(sort, search)
+    try:
+        after = queries.parse_cursor(cursor, sort, id_type=str, nullable_key=True)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    data_version = yield from resolve_data_version(data_version)
+    score_week = yield from resolve_active_week(data_version, week)
+    cache_key = response_cache_key(
+        "occupations",
+        data_version,
+        score_week,
+        search=search,
+        sort=sort,
+        page=page,
+        page_size=page_size,
+        cursor=cursor,
+        include_total=include_total,
+        fuzzy=fuzzy or None,
+    )
+    cached = response_cache.get(cache_key)
+    if cached is not MISSING:
+        return cached
+
+    query, count_query, params = queries.occupation_list_queries(
+        data_version, score_week, search, sort, page, page_size, keyset, after, window_total, fuzzy
+    )
+    (items,) = yield [fetch_all(query, params)]
+    total = queries.pop_window_total(items) if window_total else None
+    if include_total and total is None:
+        (count_row,) = yield [fetch_one(count_query, params)]
+        total = count_row["total"]
+
+    next_cursor = None
+    if keyset:
+        _, key_field = queries.occupation_sort_key(sort)
+        items, next_cursor = queries.split_keyset_page(items, page_size, key_field, "onetsoc_code", sort)
+
+    payload = {
+        "week": score_week,
+        "items": items,
+        "page": page,
+        "page_size": page_size,
+        "total": total,
+        "next_cursor": next_cursor,
+    }
+    response_cache.set(cache_key, payload, generation)
+    return payload
+
+
+def suggest_occupations(q: str, limit: int, data_version: Optional[str]) -> Handler:
+    generation = response_cache.generation
+    prefix = q.strip().lower()
+    data_version = yield from resolve_data_version(data_version)
+    if not prefix:
+        return {"data_version": data_version, "q": q, "items": []}
+    cache_key = response_cache_key("occupations/suggest", data_version, None, q=prefix, limit=limit)
+    cached = response_cache.get(cache_key)
+    if cached is not MISSING:
+        return cached
+
+    (items,) = yield [
+        fetch_all(
+            queries.OCCUPATION_SUGGEST_SQL,
+            {
+                "data_version": data_version,
+                "prefix": f"{queries.like_pattern(prefix)}%",
+                "limit": limit,
+            },
+        )
+    ]
+    payload = {"data_version": data_version, "q": q, "items": items}
+    response_cache.set(cache_key, payload, generation)
+    return payload
+
+
+def get_occupation(soc_code: str, week: Optional[str], data_version: Optional[str]) -> Handler:
+    generation = response_cache.generation
+    data_version = yield from resolve_data_version(data_version)
+    score_week = yield from resolve_active_week(data_version, week)
+    cache_key = response_cache_key("occupation", data_version, score_week, soc_code=soc_code)
+    cached = response_cache.get(cache_key)
+    if cached is not MISSING:
+        return cached
+    params = {"data_version": data_version, "soc_code": soc_code, "week": score_week}
+    if score_week:
+        (doc_row,) = yield [fetch_one(queries.OCCUPATION_DETAIL_DOC_SQL, params)]
+        if doc_row:
+            return Response(content=doc_row["doc"], media_type="application/json")
+
+    rows, alternate_rows, top_tasks, ai_score = yield [
+        fetch_all(queries.OCCUPATION_ROWS_SQL, params),
+        fetch_all(queries.OCCUPATION_ALTERNATE_TITLES_SQL, params),
+        fetch_all(queries.OCCUPATION_TOP_TASKS_SQL, params),
+        fetch_one(queries.OCCUPATION_AI_SCORE_SQL, params),
+    ]
+
+    if not rows:
+        raise HTTPException(status_code=404, detail="occupation not found")
+
+    payload = {
+        "week": score_week,
+        "soc_code": soc_code,
+        "onetsoc_codes": [row["onetsoc_code"] for row in rows],
+        "title": rows[0]["title"],
+        "description": rows[0]["description"],
+        "alternate_titles": [row["alternate_title"] for row in alternate_rows],
+        "top_tasks": top_tasks,
+        "ai_score": ai_score,
+    }
+    response_cache.set(cache_key, payload, generation)
+    return payload
+
+
+def ai_risk_rankings(limit: int, week: Optional[str], data_version: Optional[str]) -> Handler:
+    generation = response_cache.generation
+    data_version = yield from resolve_data_version(data_version)
+    score_week = yield from resolve_active_week(data_version, week)
+    cache_key = response_cache_key("rankings/ai_risk", data_version, score_week, limit=limit)
+    cached = response_cache.get(cache_key)
+    if cached is not MISSING:
+        return cached
+    (items,) = yield [
+        fetch_all(
+            queries.AI_RISK_RANKINGS_SQL,
+            {"data_version": data_version, "limit": limit, "week": score_week},
+        )
+    ]
+    payload = {"week": score_week, "items": items, "limit": limit}
+    response_cache.set(cache_key, payload, generation)
+    return payload
+
+
+def list_tech_progress_weeks(data_version: Optional[str]) -> Handler:
+    generation = response_cache.generation
+    data_version = yield from resolve_data_version(data_version)
+    cache_key = response_cache_key("tech-progress/weeks", data_version, None)
+    cached = response_cache.get(cache_key)
+    if cached is not MISSING:
+        return cached
+    (rows,) = yield [fetch_all(queries.TECH_PROGRESS_WEEKS_SQL, {"data_version": data_version})]
+    payload = {"data_version": data_version, "weeks": [row["week"] for row in rows]}
+    response_cache.set(cache_key, payload, generation)
+    return payload
+
+
+def empty_tech_progress_summary(data_version: str, week: Optional[str]) -> Dict[str, Any]:
+    return {
+        "data_version": data_version,
+        "week": week,
+        "active_scope_id": None,
+        "tasks_with_change": 0,
+        "avg_progress": None,
+        "top_tasks": [],
+        "top_tech": [],
+    }
+
+
+def tech_progress_summary(week: Optional[str], data_version: Optional[str]) -> Handler:
+    generation = response_cache.generation
+    data_version = yield from resolve_data_version(data_version)
+    resolved_week = yield from resolve_week(data_version, week)
+    if not resolved_week:
+        return empty_tech_progress_summary(data_version, None)
+
+    cache_key = response_cache_key("tech-progress/summary", data_version, resolved_week)
+    cached = response_cache.get(cache_key)
+    if cached is not MISSING:
+        return cached
+
+    (active_row,) = yield [
+        fetch_one(
+            queries.TECH_PROGRESS_SUMMARY_SCOPE_SQL,
+            {
+                "data_version": data_version,
+                "week": resolved_week,
+                "version": queries.TECH_PROGRESS_SUMMARY_VERSION,
+            },
+        )
+    ]
+    active_id = active_row["active_id"] if active_row else None
+    if not active_id:
+        return empty_tech_progress_summary(data_version, resolved_week)
+
+    stored = active_row["payload_json"]
+    if stored:
+        metrics = stored
+        top_tasks = stored["top_tasks"]
+        top_tech = stored["top_tech"]
+    else:
+        params = {"active_id": active_id, "data_version": data_version, "week": resolved_week}
+        metrics, top_tasks, top_tech = yield [
+            fetch_one(queries.TECH_PROGRESS_SUMMARY_METRICS_SQL, params),
+            fetch_all(queries.TECH_PROGRESS_SUMMARY_TOP_TASKS_SQL, params),
+            fetch_all(queries.TECH_PROGRESS_SUMMARY_TOP_TECH_SQL, params),
+        ]
+        metrics = metrics or {}
+
+    payload = {
+        "data_version": data_version,
+        "week": resolved_week,
+        "active_scope_id": active_id,
+        "tasks_with_change": metrics.get("tasks_with_change", 0),
+        "avg_progress": metrics.get("avg_progress"),
+        "top_tasks": top_tasks,
+        "top_tech": top_tech,
+    }
+    response_cache.set(cache_key, payload, generation)
+    return payload
+
+
+def tech_progress_tasks_payload(
+    data_version: str,
+    week: Optional[str],
+    items: List[Dict[str, Any]],
+    page: int,
+    page_size: int,
+    total: Optional[int],
+    next_cursor: Optional[str] = None,
+) -> Dict[str, Any]:
+    return {
+        "data_version": data_version,
+        "week": week,
+        "items": items,
+        "page": page,
+        "page_size": page_size,
+        "total": total,
+        "next_cursor": next_cursor,
+    }
+
+
+def list_tech_progress_tasks(
+    week: Optional[str],
+    data_version: Optional[str],
+    page: int,
+    page_size: int,
+    link_type: Optional[str],
+    min_delta: Optional[float],
+    cursor: Optional[str],
+    include_total: bool,
+) -> Handler:
+    generation = response_cache.generation
+    keyset = cursor is not None
+    window_total = include_total and not keyset
+    try:
+        after = queries.parse_cursor(cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    data_version = yield from resolve_data_version(data_version)
+    resolved_week = yield from resolve_week(data_version, week)
+    empty_total = 0 if include_total else None
+    if not resolved_week:
+        return tech_progress_tasks_payload(data_version, None, [], page, page_size, empty_total)
+
+    cache_key = response_cache_key(
+        "tech-progress/tasks",
+        data_version,
+        resolved_week,
+        page=page,
+        page_size=page_size,
+        link_type=link_type,
+        min_delta=min_delta,
+        cursor=cursor,
+        include_total=include_total,
+    )
+    cached = response_cache.get(cache_key)
+    if cached is not MISSING:
+        return cached
+
+    (active_row,) = yield [
+        fetch_one(queries.ACTIVE_SCOPE_ID_SQL, {"data_version": data_version, "week": resolved_week})
+    ]
+    active_id = active_row["active_id"] if active_row else None
+    if not active_id:
+        return tech_progress_tasks_payload(data_version, resolved_week, [], page, page_size, empty_total)
+
+    params = queries.tech_progress_task_params(
+        active_id, data_version, resolved_week, page, page_size, link_type, min_delta, keyset, after
+    )
+    (items,) = yield [fetch_all(queries.tech_progress_tasks_query(after, window_total), params)]
+    total = queries.pop_window_total(items) if window_total else None
+    if include_total and total is None:
+        (count_row,) = yield [fetch_one(queries.TECH_PROGRESS_TASKS_COUNT_SQL, params)]
+        total = count_row["total"]
+
+    next_cursor = None
+    if keyset:
+        items, next_cursor = queries.split_keyset_page(items, page_size, "delta", "task_id")
+
+    payload = tech_progress_tasks_payload(data_version, resolved_week, items, page, page_size, total, next_cursor)
+    response_cache.set(cache_key, payload, generation)
+    return payload
+
+
+def tech_progress_task_detail(task_id: int, week: Optional[str], data_version: Optional[str]) -> Handler:
+    generation = response_cache.generation
+    data_version = yield from resolve_data_version(data_version)
+    resolved_week = yield from resolve_week(data_version, week)
+    if not resolved_week:
+        raise HTTPException(status_code=404, detail="no tech progress data")
+
+    cache_key = response_cache_key("tech-progress/task", data_version, resolved_week, task_id=task_id)
+    cached = response_cache.get(cache_key)
+    if cached is not MISSING:
+        return cached
+
+    params = {"data_version": data_version, "week": resolved_week, "task_id": task_id}
+    task_row, links = yield [
+        fetch_one(queries.TECH_PROGRESS_TASK_SQL, params),
+        fetch_all(queries.TECH_PROGRESS_TASK_LINKS_SQL, params),
+    ]
+    if not task_row:
+        raise HTTPException(status_code=404, detail="task not found")
+
+    evidence_ids = list({link["evidence_id"] for link in links})
+    evidence = []
+    if evidence_ids:
+        (evidence,) = yield [fetch_all(queries.TECH_PROGRESS_EVIDENCE_SQL, {"ids": evidence_ids})]
+
+    payload = {
+        "data_version": data_version,
+        "week": resolved_week,
+        "task": task_row,
+        "links": links,
+        "evidence": evidence,
+    }
+    response_cache.set(cache_key, payload, generation)
+    return payload
@@ -0,0 +1,69 @@
+import argparse
+import os
+
+from api.db import get_conn
+
+
+def build_occupation_search(cur, data_version: str) -> int:
+    cur.execute("DELETE FROM occupation_search WHERE data_version = %s", (data_version,))
+    cur.execute(
+        """
+        INSERT INTO occupation_search (data_version, soc_code, term_norm, term, source)
+        SELECT data_version, soc_code, term_norm, term, source
+        FROM (
+          SELECT
+            terms.*,
+            ROW_NUMBER() OVER (
+              PARTITION BY terms.soc_code, terms.term_norm
+              ORDER BY terms.priority
+            ) AS rn
+          FROM (
+            SELECT om.data_version, om.soc_code, LOWER(om.title) AS term_norm,
+                   om.title AS term, 'title' AS source, 1 AS priority
+            FROM occupation_master om
+            WHERE om.data_version = %(data_version)s
+              AND om.soc_code IS NOT NULL
+            UNION ALL
+            SELECT om.data_version, om.soc_code, LOWER(om.soc_code),
+                   om.soc_code, 'soc', 2
+            FROM occupation_master om
+            WHERE om.data_version = %(data_version)s
+              AND om.soc_code IS NOT NULL
+            UNION ALL
+            SELECT om.data_version, om.soc_code, LOWER(at.alternate_title),
+                   at.alternate_title, 'alternate', 3
+            FROM alternate_titles at
+            JOIN occupation_master om
+              ON om.data_version = at.data_version
+             AND om.onetsoc_code = at.onetsoc_code
+            WHERE at.data_version = %(data_version)s
+              AND om.soc_code IS NOT NULL
+          ) terms
+        ) ranked
+        WHERE rn = 1
+        """,
+        {"data_version": data_version},
+    )
+    return cur.rowcount
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build occupation search terms")
+    parser.add_argument(
+        "--data-version",
+        default=os.getenv("ONET_DATA_VERSION")
+        or os.getenv("DEFAULT_DATA_VERSION")
+        or "30.1",
+        help="O*NET data version label",
+    )
+    args = parser.parse_args()
+
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            count = build_occupation_search(cur, args.data_version)
+        conn.commit()
+    print(f"occupation_search rows={count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 import argparse
 import csv
 
-from api.db import get_conn
+from api.db import get_conn, notify_cache_invalidation
 
 
 def load_oews(cur, path: str):
@@ -32,6 +32,21 @@ def load_oews(cur, path: str):
         )
 
 
+def refresh_oews_latest(cur):
+    cur.execute("DELETE FROM bls_oews_latest")
+    cur.execute(
+        """
+        INSERT INTO bls_oews_latest
+            (soc_code, ref_year_month, employment, median_wage, mean_wage)
+        SELECT DISTINCT ON (soc_code)
+            soc_code, ref_year_month, employment, median_wage, mean_wage
+        FROM bls_oews_metrics
+        ORDER BY soc_code, ref_year_month DESC
+        """
+    )
+    return cur.rowcount
+
+
 def load_proj(cur, path: str):
     with open(path, "r", encoding="utf-8") as handle:
         reader = csv.DictReader(handle)
@@ -83,8 +98,12 @@ def main():
                 cur.execute("TRUNCATE TABLE bls_oews_metrics, bls_proj_metrics")
             if args.oews:
                 load_oews(cur, args.oews)
+            if args.oews or args.truncate:
+                latest = refresh_oews_latest(cur)
+                print(f"bls_oews_latest rows={latest}")
             if args.projections:
                 load_proj(cur, args.projections)
+        notify_cache_invalidation(conn, "import_bls_stub")
         conn.commit()
 
 
@@ -4,6 +4,7 @@ from pathlib import Path
 from typing import Iterable, Tuple
 
 from api.db import get_conn
+from batch.build_occupation_search import build_occupation_search
 from batch.utils import copy_rows, iter_insert_rows
 
 
@@ -121,6 +122,7 @@ def main():
             )
             if args.mode == "truncate":
                 delete_tables = [
+                    "occupation_detail_doc",
                     "occupation_ai_score",
                     "task_ai_ensemble",
                     "task_ai_score",
@@ -128,6 +130,7 @@ def main():
                     "alternate_titles",
                     "task_catalog",
                     "occupation_task_weight",
+                    "occupation_search",
                     "task_statements",
                     "occupation_master",
                 ]
@@ -179,6 +182,9 @@ def main():
             ],
             iter_task_rating_rows(task_ratings_file, data_version),
         )
+
+        with conn.cursor() as cur:
+            build_occupation_search(cur, data_version)
         conn.commit()
 
 
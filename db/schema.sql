@@ -1,5 +1,7 @@
 BEGIN;
 
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 CREATE TABLE IF NOT EXISTS data_version (
   id TEXT PRIMARY KEY,
   release_date DATE,
@@ -34,6 +36,21 @@ CREATE TABLE IF NOT EXISTS alternate_titles (
     ON DELETE CASCADE
 );
 
+CREATE TABLE IF NOT EXISTS occupation_search (
+  data_version TEXT NOT NULL REFERENCES data_version(id) ON DELETE CASCADE,
+  soc_code VARCHAR(7) NOT NULL,
+  term_norm TEXT NOT NULL,
+  term TEXT NOT NULL,
+  source VARCHAR(10) NOT NULL,
+  PRIMARY KEY (data_version, soc_code, term_norm)
+);
+
+CREATE INDEX IF NOT EXISTS idx_occupation_search_trgm
+  ON occupation_search USING gin (term_norm gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_occupation_search_prefix
+  ON occupation_search (data_version, term_norm text_pattern_ops);
+
 CREATE TABLE IF NOT EXISTS task_statements (
   data_version TEXT NOT NULL REFERENCES data_version(id) ON DELETE CASCADE,
   task_id BIGINT NOT NULL,
@@ -107,9 +124,20 @@ CREATE TABLE IF NOT EXISTS model_run (
   cost_estimate NUMERIC(10,4),
   status TEXT,
   error_message TEXT,
-  error_at TIMESTAMPTZ
+  error_at TIMESTAMPTZ,
+  params_json JSONB,
+  tasks_total INTEGER,
+  tasks_attempted INTEGER NOT NULL DEFAULT 0,
+  tasks_succeeded INTEGER NOT NULL DEFAULT 0,
+  tasks_failed INTEGER NOT NULL DEFAULT 0,
+  tasks_cached INTEGER NOT NULL DEFAULT 0,
+  heartbeat_at TIMESTAMPTZ
 );
 
+CREATE INDEX IF NOT EXISTS idx_model_run_running
+  ON model_run (heartbeat_at)
+  WHERE status = 'running';
+
 CREATE TABLE IF NOT EXISTS task_ai_score (
   id BIGSERIAL PRIMARY KEY,
   data_version TEXT NOT NULL,
@@ -127,6 +155,8 @@ CREATE TABLE IF NOT EXISTS task_ai_score (
   raw_json_ref TEXT,
   prompt_hash TEXT,
   input_hash TEXT,
+  source_task_id BIGINT,
+  dispatch_reason TEXT,
   FOREIGN KEY (data_version, task_id)
     REFERENCES task_statements (data_version, task_id)
     ON DELETE CASCADE
@@ -138,6 +168,80 @@ CREATE UNIQUE INDEX IF NOT EXISTS uniq_task_ai_score_cache
 CREATE INDEX IF NOT EXISTS idx_task_ai_score_task
   ON task_ai_score (data_version, week, task_id);
 
+CREATE TABLE IF NOT EXISTS model_run_batch (
+  id BIGSERIAL PRIMARY KEY,
+  run_id BIGINT NOT NULL REFERENCES model_run(id) ON DELETE CASCADE,
+  provider TEXT NOT NULL,
+  external_id TEXT NOT NULL,
+  prompt_hash TEXT,
+  status TEXT NOT NULL,
+  request_count INTEGER NOT NULL DEFAULT 0,
+  error_message TEXT,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  collected_at TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS idx_model_run_batch_status
+  ON model_run_batch (status, run_id);
+
+CREATE TABLE IF NOT EXISTS model_run_batch_item (
+  batch_id BIGINT NOT NULL REFERENCES model_run_batch(id) ON DELETE CASCADE,
+  custom_id TEXT NOT NULL,
+  task_id BIGINT NOT NULL,
+  input_hash TEXT NOT NULL,
+  task_statement TEXT,
+  context TEXT,
+  task_input TEXT NOT NULL,
+  PRIMARY KEY (batch_id, custom_id)
+);
+
+CREATE TABLE IF NOT EXISTS score_work_item (
+  id BIGSERIAL PRIMARY KEY,
+  data_version TEXT NOT NULL,
+  week VARCHAR(8) NOT NULL,
+  task_id BIGINT NOT NULL,
+  model TEXT NOT NULL,
+  prompt_hash TEXT NOT NULL,
+  input_hash TEXT NOT NULL,
+  task_statement TEXT,
+  context TEXT,
+  task_input TEXT NOT NULL,
+  status TEXT NOT NULL DEFAULT 'pending',
+  attempts INTEGER NOT NULL DEFAULT 0,
+  leased_by TEXT,
+  lease_expires_at TIMESTAMPTZ,
+  run_id BIGINT REFERENCES model_run(id) ON DELETE SET NULL,
+  last_error TEXT,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  UNIQUE (data_version, week, task_id, model, prompt_hash, input_hash)
+);
+
+CREATE INDEX IF NOT EXISTS idx_score_work_item_lease
+  ON score_work_item (data_version, week, model, prompt_hash, id)
+  WHERE status IN ('pending', 'leased');
+
+CREATE INDEX IF NOT EXISTS idx_score_work_item_owner
+  ON score_work_item (leased_by)
+  WHERE status = 'leased';
+
+CREATE TABLE IF NOT EXISTS task_dedupe_cluster (
+  data_version TEXT NOT NULL,
+  task_id BIGINT NOT NULL,
+  representative_task_id BIGINT NOT NULL,
+  similarity NUMERIC(4,3) NOT NULL,
+  method TEXT NOT NULL,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (data_version, task_id),
+  FOREIGN KEY (data_version, task_id)
+    REFERENCES task_statements (data_version, task_id)
+    ON DELETE CASCADE,
+  FOREIGN KEY (data_version, representative_task_id)
+    REFERENCES task_statements (data_version, task_id)
+    ON DELETE CASCADE
+);
+
 CREATE TABLE IF NOT EXISTS task_ai_ensemble (
   data_version TEXT NOT NULL,
   week VARCHAR(8) NOT NULL,
@@ -162,6 +266,7 @@ CREATE TABLE IF NOT EXISTS task_ai_ensemble (
   confidence_std NUMERIC(6,2),
   confidence_min NUMERIC(6,2),
   confidence_max NUMERIC(6,2),
+  model_count INTEGER,
   updated_at TIMESTAMPTZ DEFAULT NOW(),
   PRIMARY KEY (data_version, week, task_id),
   FOREIGN KEY (data_version, task_id)
@@ -191,6 +296,15 @@ CREATE TABLE IF NOT EXISTS occupation_ai_score (
 CREATE INDEX IF NOT EXISTS idx_occupation_ai_score_mean
   ON occupation_ai_score (data_version, week, mean DESC);
 
+CREATE TABLE IF NOT EXISTS occupation_detail_doc (
+  data_version TEXT NOT NULL REFERENCES data_version(id) ON DELETE CASCADE,
+  week VARCHAR(8) NOT NULL,
+  soc_code VARCHAR(7) NOT NULL,
+  doc JSONB NOT NULL,
+  updated_at TIMESTAMPTZ DEFAULT NOW(),
+  PRIMARY KEY (data_version, week, soc_code)
+);
+
 CREATE TABLE IF NOT EXISTS bls_oews_metrics (
   soc_code VARCHAR(7) NOT NULL,
   ref_year_month VARCHAR(7) NOT NULL,
@@ -200,6 +314,18 @@ CREATE TABLE IF NOT EXISTS bls_oews_metrics (
   PRIMARY KEY (soc_code, ref_year_month)
 );
 
+CREATE TABLE IF NOT EXISTS bls_oews_latest (
+  soc_code VARCHAR(7) PRIMARY KEY,
+  ref_year_month VARCHAR(7) NOT NULL,
+  employment INTEGER,
+  median_wage INTEGER,
+  mean_wage INTEGER,
+  updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_bls_oews_latest_employment
+  ON bls_oews_latest (employment DESC NULLS LAST, soc_code);
+
 CREATE TABLE IF NOT EXISTS bls_proj_metrics (
   soc_code VARCHAR(7) NOT NULL,
   projection_period VARCHAR(20) NOT NULL,
@@ -294,6 +420,63 @@ CREATE UNIQUE INDEX IF NOT EXISTS uniq_tech_progress_task_link_dedupe
 CREATE INDEX IF NOT EXISTS idx_tech_progress_task_link_week
   ON tech_progress_task_link (data_version, week);
 
+CREATE TABLE IF NOT EXISTS tech_progress_task_link_rollup (
+  data_version TEXT NOT NULL REFERENCES data_version(id) ON DELETE CASCADE,
+  week VARCHAR(8) NOT NULL,
+  task_id BIGINT NOT NULL,
+  top_tech_id TEXT,
+  top_tech_name TEXT,
+  link_count INTEGER NOT NULL DEFAULT 0,
+  link_types TEXT[] NOT NULL DEFAULT '{}',
+  PRIMARY KEY (data_version, week, task_id)
+);
+
+CREATE OR REPLACE FUNCTION tech_progress_refresh_link_rollup(p_data_version TEXT, p_week TEXT)
+RETURNS INTEGER AS $$
+DECLARE
+  refreshed INTEGER;
+BEGIN
+  DELETE FROM tech_progress_task_link_rollup
+  WHERE data_version = p_data_version
+    AND week = p_week;
+
+  INSERT INTO tech_progress_task_link_rollup (
+    data_version, week, task_id, top_tech_id, top_tech_name, link_count, link_types
+  )
+  SELECT
+    agg.data_version,
+    agg.week,
+    agg.task_id,
+    top.tech_id,
+    top.name,
+    agg.link_count,
+    agg.link_types
+  FROM (
+    SELECT
+      data_version,
+      week,
+      task_id,
+      COUNT(*) AS link_count,
+      array_agg(DISTINCT link_type ORDER BY link_type) AS link_types
+    FROM tech_progress_task_link
+    WHERE data_version = p_data_version
+      AND week = p_week
+    GROUP BY data_version, week, task_id
+  ) agg
+  LEFT JOIN (
+    SELECT DISTINCT ON (l.task_id) l.task_id, l.tech_id, t.name
+    FROM tech_progress_task_link l
+    JOIN tech_progress_technology t ON t.tech_id = l.tech_id
+    WHERE l.data_version = p_data_version
+      AND l.week = p_week
+    ORDER BY l.task_id, l.impact_score DESC
+  ) top ON top.task_id = agg.task_id;
+
+  GET DIAGNOSTICS refreshed = ROW_COUNT;
+  RETURN refreshed;
+END;
+$$ LANGUAGE plpgsql;
+
 CREATE TABLE IF NOT EXISTS tech_progress_weekly_snapshot (
   week VARCHAR(8) NOT NULL,
   data_version TEXT NOT NULL REFERENCES data_version(id) ON DELETE CASCADE,
@@ -314,6 +497,9 @@ CREATE TABLE IF NOT EXISTS tech_progress_weekly_snapshot (
 CREATE INDEX IF NOT EXISTS idx_tech_progress_weekly_snapshot_week
   ON tech_progress_weekly_snapshot (data_version, week);
 
+CREATE INDEX IF NOT EXISTS idx_tech_progress_weekly_snapshot_delta
+  ON tech_progress_weekly_snapshot (data_version, week, delta DESC NULLS LAST, task_id);
+
 CREATE TABLE IF NOT EXISTS tech_progress_llm_task_card (
   data_version TEXT NOT NULL REFERENCES data_version(id) ON DELETE CASCADE,
   week VARCHAR(8) NOT NULL,
@@ -336,4 +522,27 @@ CREATE TABLE IF NOT EXISTS tech_progress_llm_weekly_summary (
   PRIMARY KEY (data_version, week, version)
 );
 
+-- API cache invalidation (LISTEN task_risk_cache)
+CREATE OR REPLACE FUNCTION task_risk_notify_cache() RETURNS trigger AS $$
+BEGIN
+  PERFORM pg_notify('task_risk_cache', TG_TABLE_NAME);
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_data_version_notify_cache ON data_version;
+CREATE TRIGGER trg_data_version_notify_cache
+  AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON data_version
+  FOR EACH STATEMENT EXECUTE FUNCTION task_risk_notify_cache();
+
+DROP TRIGGER IF EXISTS trg_tech_progress_scope_active_notify_cache ON tech_progress_scope_active;
+CREATE TRIGGER trg_tech_progress_scope_active_notify_cache
+  AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON tech_progress_scope_active
+  FOR EACH STATEMENT EXECUTE FUNCTION task_risk_notify_cache();
+
+DROP TRIGGER IF EXISTS trg_tech_progress_weekly_snapshot_notify_cache ON tech_progress_weekly_snapshot;
+CREATE TRIGGER trg_tech_progress_weekly_snapshot_notify_cache
+  AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON tech_progress_weekly_snapshot
+  FOR EACH STATEMENT EXECUTE FUNCTION task_risk_notify_cache();
+
 COMMIT;
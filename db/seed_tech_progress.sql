@@ -407,4 +407,10 @@ SELECT
 FROM sample_tasks
 ON CONFLICT DO NOTHING;
 
+SELECT tech_progress_refresh_link_rollup(weeks.data_version, weeks.week)
+FROM (
+  SELECT DISTINCT data_version, week
+  FROM tech_progress_task_link
+) weeks;
+
 COMMIT;
@@ -0,0 +1,9 @@
+BEGIN;
+
+ALTER TABLE task_ai_score
+  ADD COLUMN IF NOT EXISTS dispatch_reason TEXT;
+
+ALTER TABLE task_ai_ensemble
+  ADD COLUMN IF NOT EXISTS model_count INTEGER;
+
+COMMIT;
@@ -0,0 +1,24 @@
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS bls_oews_latest (
+  soc_code VARCHAR(7) PRIMARY KEY,
+  ref_year_month VARCHAR(7) NOT NULL,
+  employment INTEGER,
+  median_wage INTEGER,
+  mean_wage INTEGER,
+  updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_bls_oews_latest_employment
+  ON bls_oews_latest (employment DESC NULLS LAST, soc_code);
+
+DELETE FROM bls_oews_latest;
+
+INSERT INTO bls_oews_latest
+  (soc_code, ref_year_month, employment, median_wage, mean_wage)
+SELECT DISTINCT ON (soc_code)
+  soc_code, ref_year_month, employment, median_wage, mean_wage
+FROM bls_oews_metrics
+ORDER BY soc_code, ref_year_month DESC;
+
+COMMIT;
@@ -0,0 +1,25 @@
+BEGIN;
+
+CREATE OR REPLACE FUNCTION task_risk_notify_cache() RETURNS trigger AS $$
+BEGIN
+  PERFORM pg_notify('task_risk_cache', TG_TABLE_NAME);
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_data_version_notify_cache ON data_version;
+CREATE TRIGGER trg_data_version_notify_cache
+  AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON data_version
+  FOR EACH STATEMENT EXECUTE FUNCTION task_risk_notify_cache();
+
+DROP TRIGGER IF EXISTS trg_tech_progress_scope_active_notify_cache ON tech_progress_scope_active;
+CREATE TRIGGER trg_tech_progress_scope_active_notify_cache
+  AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON tech_progress_scope_active
+  FOR EACH STATEMENT EXECUTE FUNCTION task_risk_notify_cache();
+
+DROP TRIGGER IF EXISTS trg_tech_progress_weekly_snapshot_notify_cache ON tech_progress_weekly_snapshot;
+CREATE TRIGGER trg_tech_progress_weekly_snapshot_notify_cache
+  AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON tech_progress_weekly_snapshot
+  FOR EACH STATEMENT EXECUTE FUNCTION task_risk_notify_cache();
+
+COMMIT;
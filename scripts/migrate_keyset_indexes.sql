@@ -0,0 +1,6 @@
+BEGIN;
+
+CREATE INDEX IF NOT EXISTS idx_tech_progress_weekly_snapshot_delta
+  ON tech_progress_weekly_snapshot (data_version, week, delta DESC NULLS LAST, task_id);
+
+COMMIT;
@@ -0,0 +1,31 @@
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS model_run_batch (
+  id BIGSERIAL PRIMARY KEY,
+  run_id BIGINT NOT NULL REFERENCES model_run(id) ON DELETE CASCADE,
+  provider TEXT NOT NULL,
+  external_id TEXT NOT NULL,
+  prompt_hash TEXT,
+  status TEXT NOT NULL,
+  request_count INTEGER NOT NULL DEFAULT 0,
+  error_message TEXT,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  collected_at TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS idx_model_run_batch_status
+  ON model_run_batch (status, run_id);
+
+CREATE TABLE IF NOT EXISTS model_run_batch_item (
+  batch_id BIGINT NOT NULL REFERENCES model_run_batch(id) ON DELETE CASCADE,
+  custom_id TEXT NOT NULL,
+  task_id BIGINT NOT NULL,
+  input_hash TEXT NOT NULL,
+  task_statement TEXT,
+  context TEXT,
+  task_input TEXT NOT NULL,
+  PRIMARY KEY (batch_id, custom_id)
+);
+
+COMMIT;
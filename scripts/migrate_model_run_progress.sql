@@ -0,0 +1,16 @@
+BEGIN;
+
+ALTER TABLE model_run
+  ADD COLUMN IF NOT EXISTS params_json JSONB,
+  ADD COLUMN IF NOT EXISTS tasks_total INTEGER,
+  ADD COLUMN IF NOT EXISTS tasks_attempted INTEGER NOT NULL DEFAULT 0,
+  ADD COLUMN IF NOT EXISTS tasks_succeeded INTEGER NOT NULL DEFAULT 0,
+  ADD COLUMN IF NOT EXISTS tasks_failed INTEGER NOT NULL DEFAULT 0,
+  ADD COLUMN IF NOT EXISTS tasks_cached INTEGER NOT NULL DEFAULT 0,
+  ADD COLUMN IF NOT EXISTS heartbeat_at TIMESTAMPTZ;
+
+CREATE INDEX IF NOT EXISTS idx_model_run_running
+  ON model_run (heartbeat_at)
+  WHERE status = 'running';
+
+COMMIT;
@@ -0,0 +1,12 @@
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS occupation_detail_doc (
+  data_version TEXT NOT NULL REFERENCES data_version(id) ON DELETE CASCADE,
+  week VARCHAR(8) NOT NULL,
+  soc_code VARCHAR(7) NOT NULL,
+  doc JSONB NOT NULL,
+  updated_at TIMESTAMPTZ DEFAULT NOW(),
+  PRIMARY KEY (data_version, week, soc_code)
+);
+
+COMMIT;
@@ -0,0 +1,53 @@
+BEGIN;
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE TABLE IF NOT EXISTS occupation_search (
+  data_version TEXT NOT NULL REFERENCES data_version(id) ON DELETE CASCADE,
+  soc_code VARCHAR(7) NOT NULL,
+  term_norm TEXT NOT NULL,
+  term TEXT NOT NULL,
+  source VARCHAR(10) NOT NULL,
+  PRIMARY KEY (data_version, soc_code, term_norm)
+);
+
+CREATE INDEX IF NOT EXISTS idx_occupation_search_trgm
+  ON occupation_search USING gin (term_norm gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_occupation_search_prefix
+  ON occupation_search (data_version, term_norm text_pattern_ops);
+
+-- Same terms as batch.build_occupation_search, for every data_version already loaded.
+INSERT INTO occupation_search (data_version, soc_code, term_norm, term, source)
+SELECT data_version, soc_code, term_norm, term, source
+FROM (
+  SELECT
+    terms.*,
+    ROW_NUMBER() OVER (
+      PARTITION BY terms.data_version, terms.soc_code, terms.term_norm
+      ORDER BY terms.priority
+    ) AS rn
+  FROM (
+    SELECT om.data_version, om.soc_code, LOWER(om.title) AS term_norm,
+           om.title AS term, 'title' AS source, 1 AS priority
+    FROM occupation_master om
+    WHERE om.soc_code IS NOT NULL
+    UNION ALL
+    SELECT om.data_version, om.soc_code, LOWER(om.soc_code),
+           om.soc_code, 'soc', 2
+    FROM occupation_master om
+    WHERE om.soc_code IS NOT NULL
+    UNION ALL
+    SELECT om.data_version, om.soc_code, LOWER(at.alternate_title),
+           at.alternate_title, 'alternate', 3
+    FROM alternate_titles at
+    JOIN occupation_master om
+      ON om.data_version = at.data_version
+     AND om.onetsoc_code = at.onetsoc_code
+    WHERE om.soc_code IS NOT NULL
+  ) terms
+) ranked
+WHERE rn = 1
+ON CONFLICT (data_version, soc_code, term_norm) DO NOTHING;
+
+COMMIT;
@@ -0,0 +1,33 @@
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS score_work_item (
+  id BIGSERIAL PRIMARY KEY,
+  data_version TEXT NOT NULL,
+  week VARCHAR(8) NOT NULL,
+  task_id BIGINT NOT NULL,
+  model TEXT NOT NULL,
+  prompt_hash TEXT NOT NULL,
+  input_hash TEXT NOT NULL,
+  task_statement TEXT,
+  context TEXT,
+  task_input TEXT NOT NULL,
+  status TEXT NOT NULL DEFAULT 'pending',
+  attempts INTEGER NOT NULL DEFAULT 0,
+  leased_by TEXT,
+  lease_expires_at TIMESTAMPTZ,
+  run_id BIGINT REFERENCES model_run(id) ON DELETE SET NULL,
+  last_error TEXT,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  UNIQUE (data_version, week, task_id, model, prompt_hash, input_hash)
+);
+
+CREATE INDEX IF NOT EXISTS idx_score_work_item_lease
+  ON score_work_item (data_version, week, model, prompt_hash, id)
+  WHERE status IN ('pending', 'leased');
+
+CREATE INDEX IF NOT EXISTS idx_score_work_item_owner
+  ON score_work_item (leased_by)
+  WHERE status = 'leased';
+
+COMMIT;
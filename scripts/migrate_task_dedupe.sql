@@ -0,0 +1,22 @@
+BEGIN;
+
+ALTER TABLE task_ai_score
+  ADD COLUMN IF NOT EXISTS source_task_id BIGINT;
+
+CREATE TABLE IF NOT EXISTS task_dedupe_cluster (
+  data_version TEXT NOT NULL,
+  task_id BIGINT NOT NULL,
+  representative_task_id BIGINT NOT NULL,
+  similarity NUMERIC(4,3) NOT NULL,
+  method TEXT NOT NULL,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (data_version, task_id),
+  FOREIGN KEY (data_version, task_id)
+    REFERENCES task_statements (data_version, task_id)
+    ON DELETE CASCADE,
+  FOREIGN KEY (data_version, representative_task_id)
+    REFERENCES task_statements (data_version, task_id)
+    ON DELETE CASCADE
+);
+
+COMMIT;
@@ -0,0 +1,66 @@
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS tech_progress_task_link_rollup (
+  data_version TEXT NOT NULL REFERENCES data_version(id) ON DELETE CASCADE,
+  week VARCHAR(8) NOT NULL,
+  task_id BIGINT NOT NULL,
+  top_tech_id TEXT,
+  top_tech_name TEXT,
+  link_count INTEGER NOT NULL DEFAULT 0,
+  link_types TEXT[] NOT NULL DEFAULT '{}',
+  PRIMARY KEY (data_version, week, task_id)
+);
+
+CREATE OR REPLACE FUNCTION tech_progress_refresh_link_rollup(p_data_version TEXT, p_week TEXT)
+RETURNS INTEGER AS $$
+DECLARE
+  refreshed INTEGER;
+BEGIN
+  DELETE FROM tech_progress_task_link_rollup
+  WHERE data_version = p_data_version
+    AND week = p_week;
+
+  INSERT INTO tech_progress_task_link_rollup (
+    data_version, week, task_id, top_tech_id, top_tech_name, link_count, link_types
+  )
+  SELECT
+    agg.data_version,
+    agg.week,
+    agg.task_id,
+    top.tech_id,
+    top.name,
+    agg.link_count,
+    agg.link_types
+  FROM (
+    SELECT
+      data_version,
+      week,
+      task_id,
+      COUNT(*) AS link_count,
+      array_agg(DISTINCT link_type ORDER BY link_type) AS link_types
+    FROM tech_progress_task_link
+    WHERE data_version = p_data_version
+      AND week = p_week
+    GROUP BY data_version, week, task_id
+  ) agg
+  LEFT JOIN (
+    SELECT DISTINCT ON (l.task_id) l.task_id, l.tech_id, t.name
+    FROM tech_progress_task_link l
+    JOIN tech_progress_technology t ON t.tech_id = l.tech_id
+    WHERE l.data_version = p_data_version
+      AND l.week = p_week
+    ORDER BY l.task_id, l.impact_score DESC
+  ) top ON top.task_id = agg.task_id;
+
+  GET DIAGNOSTICS refreshed = ROW_COUNT;
+  RETURN refreshed;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT tech_progress_refresh_link_rollup(weeks.data_version, weeks.week)
+FROM (
+  SELECT DISTINCT data_version, week
+  FROM tech_progress_task_link
+) weeks;
+
+COMMIT;
@@ -3,7 +3,9 @@ import json
 import os
 from typing import List, Optional, Tuple
 
-from api.db import get_conn
+from api.db import get_conn, notify_cache_invalidation
+from worker.build_task_link_rollup import refresh_link_rollup
+from worker.build_tech_progress_summary import store_summary
 
 DEFAULT_TECH = [
     ("TECH-LLM-001", "LLM Response Drafting", "NLP", ["drafting", "response assistant"], "active"),
@@ -209,7 +211,10 @@ def regenerate(data_version: str, limit: Optional[int]) -> None:
                         for week, data_version, task_id, progress_score, delta, top_changes, evidence_ids in snapshot_rows
                     ],
                 )
+                refresh_link_rollup(cur, data_version, week)
+                store_summary(conn, data_version, week, active_id)
 
+            notify_cache_invalidation(conn, "regenerate_tech_progress")
             conn.commit()
             limit_label = limit if limit else "all"
             print(
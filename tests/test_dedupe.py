@@ -0,0 +1,22 @@
+from worker.dedupe import DedupeMember, cluster_statements
+
+
+def test_plural_and_punctuation_variant_joins_representative():
+    members = cluster_statements(
+        [
+            (1, "Operate forklift to move materials within the warehouse."),
+            (2, "Operate forklifts to move materials within the warehouse"),
+            (3, "Prepare monthly budget reports for department managers."),
+        ]
+    )
+    assert [(member.task_id, member.representative_task_id) for member in members] == [(2, 1)]
+    assert members[0].similarity >= 0.8
+
+
+def test_blank_statements_are_not_clustered():
+    assert cluster_statements([(6, ""), (7, None), (8, "  ...  ")]) == []
+
+
+def test_blank_statement_does_not_absorb_real_one():
+    members = cluster_statements([(1, ""), (2, "Inspect welds for defects."), (3, "Inspect welds for defects")])
+    assert members == [DedupeMember(3, 2, 1.0)]
@@ -0,0 +1,30 @@
+import pytest
+
+from api import queries
+
+
+def test_search_is_substring_unless_fuzzy():
+    query, count_query, params = queries.occupation_list_queries("30.1", None, " Nurse ", "relevance", 1, 20)
+    assert "%%" not in query.replace("'%%.00'", "")
+    assert params["q"] == "%nurse%"
+    query, count_query, params = queries.occupation_list_queries("30.1", None, "nurse", "ai", 1, 20, fuzzy=True)
+    assert "term_norm %% %(q_norm)s" in count_query
+
+
+@pytest.mark.parametrize("value", [None, "", "   "])
+def test_blank_search_is_absent(value):
+    assert queries.normalize_search(value) is None
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [{"k": "abc", "id": 3}, {"k": None, "id": 3}, {"k": 1, "id": "15-1252.00"}, {"k": 1, "id": True}],
+)
+def test_tampered_task_cursor_is_rejected(payload):
+    with pytest.raises(ValueError):
+        queries.parse_cursor(queries.encode_cursor(payload))
+
+
+def test_occupation_cursor_round_trip():
+    cursor = queries.encode_cursor({"k": None, "id": "15-1252.00", "s": "ai"})
+    assert queries.parse_cursor(cursor, "ai", id_type=str, nullable_key=True)["id"] == "15-1252.00"
@@ -0,0 +1,158 @@
+import asyncio
+from contextlib import asynccontextmanager, contextmanager
+
+import pytest
+
+from api import main, queries, routes_async
+from api.cache import resolution_cache, response_cache
+
+TASK_ROWS = [
+    {"task_id": task_id, "task_statement": f"task {task_id}", "progress_score": 0.5, "delta": delta,
+     "top_tech_id": None, "top_tech_name": None, "link_count": 0}
+    for task_id, delta in [(1, "0.40"), (2, "0.30"), (3, "0.30")]
+]
+
+
+def answer(sql, params, many, db):
+    if sql == queries.LATEST_SNAPSHOT_WEEK_SQL:
+        return {"week": db["week"]} if db["week"] else None
+    if sql == queries.LATEST_ACTIVE_WEEK_SQL:
+        return {"week": db["week"]} if db["week"] else None
+    if sql == queries.ACTIVE_SCOPE_ID_SQL:
+        return {"active_id": db["active_id"]} if db["active_id"] else None
+    if sql == queries.TECH_PROGRESS_TASKS_COUNT_SQL:
+        return {"total": len(TASK_ROWS)}
+    if "FROM tech_progress_weekly_snapshot s" in sql and many:
+        return [dict(row, total_count=len(TASK_ROWS)) if "total_count" in sql else dict(row) for row in TASK_ROWS]
+    if "FROM occupation_master om" in sql and many:
+        return [{"onetsoc_code": "15-1252.00", "soc_code": "15-1252", "title": "Developers", "ai_mean": 50,
+                 "ai_std": 1, "employment": 10, "median_wage": 1, "ref_year_month": "2025-05", "total_count": 1}]
+    if "COUNT(*) AS total" in sql:
+        return {"total": 1}
+    return [] if many else None
+
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+        self.sql = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.sql, self.params = sql, params
+
+    def fetchall(self):
+        return answer(self.sql, self.params, True, self.db)
+
+    def fetchone(self):
+        return answer(self.sql, self.params, False, self.db)
+
+
+class FakeConn:
+    def __init__(self, db):
+        self.db = db
+
+    def cursor(self, **_kwargs):
+        return FakeCursor(self.db)
+
+
+class FakeAsyncCursor(FakeCursor):
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, sql, params=None):
+        FakeCursor.execute(self, sql, params)
+
+    async def fetchall(self):
+        return FakeCursor.fetchall(self)
+
+    async def fetchone(self):
+        return FakeCursor.fetchone(self)
+
+
+class FakeAsyncConn(FakeConn):
+    def cursor(self, **_kwargs):
+        return FakeAsyncCursor(self.db)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    state = {"week": "2026-W05", "active_id": "A1"}
+
+    @contextmanager
+    def get_conn():
+        yield FakeConn(state)
+
+    @asynccontextmanager
+    async def get_async_conn():
+        yield FakeAsyncConn(state)
+
+    monkeypatch.setenv("DEFAULT_DATA_VERSION", "30.1")
+    monkeypatch.setattr(main, "get_conn", get_conn)
+    monkeypatch.setattr(routes_async, "get_async_conn", get_async_conn)
+    return state
+
+
+def both(name, **kwargs):
+    responses = []
+    for call in (
+        lambda: getattr(main, name)(**kwargs),
+        lambda: asyncio.run(getattr(routes_async, name)(**kwargs)),
+    ):
+        resolution_cache.clear()
+        response_cache.clear()
+        responses.append(call())
+    return responses
+
+
+TASK_ARGS = dict(
+    week=None, data_version=None, page=1, page_size=2, link_type=None, min_delta=None, include_total=True
+)
+
+
+@pytest.mark.parametrize("week, active_id", [(None, None), ("2026-W05", None), ("2026-W05", "A1")])
+@pytest.mark.parametrize("cursor", [None, ""])
+def test_tech_progress_tasks_same_shape(db, week, active_id, cursor):
+    db.update(week=week, active_id=active_id)
+    sync_payload, async_payload = both("list_tech_progress_tasks", cursor=cursor, **TASK_ARGS)
+    assert sync_payload == async_payload
+    assert "next_cursor" in sync_payload
+
+
+def test_tech_progress_tasks_keyset_page(db):
+    sync_payload, async_payload = both("list_tech_progress_tasks", cursor="", **TASK_ARGS)
+    assert sync_payload == async_payload
+    assert [item["task_id"] for item in sync_payload["items"]] == [1, 2]
+    assert queries.parse_cursor(sync_payload["next_cursor"]) == {"k": "0.30", "id": 2}
+
+
+@pytest.mark.parametrize("week", [None, "2026-W05"])
+def test_tech_progress_summary_same_shape(db, week):
+    db["week"] = week
+    sync_payload, async_payload = both("tech_progress_summary", week=None, data_version=None)
+    assert sync_payload == async_payload
+
+
+@pytest.mark.parametrize("cursor", [None, ""])
+def test_occupations_same_shape(db, cursor):
+    sync_payload, async_payload = both(
+        "list_occupations",
+        search=None,
+        sort="ai",
+        page=1,
+        page_size=20,
+        cursor=cursor,
+        include_total=True,
+        week=None,
+        data_version=None,
+    )
+    assert sync_payload == async_payload
+    assert sync_payload["total"] == 1
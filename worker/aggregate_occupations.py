@@ -2,7 +2,7 @@ import argparse
 import os
 from typing import Optional, Tuple
 
-from api.db import get_conn
+from api.db import get_conn, notify_cache_invalidation
 
 
 def env_flag(name: str, default: str = "0") -> bool:
@@ -42,6 +42,101 @@ def resolve_active_week(conn, data_version: str, requested_week: Optional[str])
     return None, None
 
 
+def build_occupation_detail_docs(cur, data_version: str, week: str) -> int:
+    cur.execute(
+        "DELETE FROM occupation_detail_doc WHERE data_version = %s AND week = %s",
+        (data_version, week),
+    )
+    cur.execute(
+        """
+        INSERT INTO occupation_detail_doc (data_version, week, soc_code, doc, updated_at)
+        SELECT
+            occ.data_version,
+            %(week)s,
+            occ.soc_code,
+            jsonb_build_object(
+                'week', %(week)s::text,
+                'soc_code', occ.soc_code,
+                'onetsoc_codes', occ.onetsoc_codes,
+                'title', occ.title,
+                'description', occ.description,
+                'alternate_titles', COALESCE(alt.titles, '[]'::jsonb),
+                'top_tasks', COALESCE(tasks.items, '[]'::jsonb),
+                'ai_score', score.doc
+            ),
+            NOW()
+        FROM (
+            SELECT
+                data_version,
+                soc_code,
+                jsonb_agg(onetsoc_code ORDER BY onetsoc_code) AS onetsoc_codes,
+                (array_agg(title ORDER BY onetsoc_code))[1] AS title,
+                (array_agg(description ORDER BY onetsoc_code))[1] AS description
+            FROM occupation_master
+            WHERE data_version = %(data_version)s
+              AND soc_code IS NOT NULL
+            GROUP BY data_version, soc_code
+        ) occ
+        LEFT JOIN LATERAL (
+            SELECT jsonb_agg(a.alternate_title ORDER BY a.alternate_title) AS titles
+            FROM (
+                SELECT DISTINCT at.alternate_title
+                FROM alternate_titles at
+                JOIN occupation_master om
+                  ON om.data_version = at.data_version
+                 AND om.onetsoc_code = at.onetsoc_code
+                WHERE at.data_version = occ.data_version
+                  AND om.soc_code = occ.soc_code
+            ) a
+        ) alt ON TRUE
+        LEFT JOIN LATERAL (
+            SELECT jsonb_agg(
+                jsonb_build_object(
+                    'task_id', t.task_id,
+                    'task_statement', t.task_statement,
+                    'weight', t.weight
+                )
+                ORDER BY t.weight DESC, t.task_id
+            ) AS items
+            FROM (
+                SELECT ts.task_id, ts.task_statement, otw.weight
+                FROM occupation_task_weight otw
+                JOIN task_statements ts
+                  ON ts.data_version = otw.data_version
+                 AND ts.task_id = otw.task_id
+                WHERE otw.data_version = occ.data_version
+                  AND otw.soc_code = occ.soc_code
+                ORDER BY otw.weight DESC, ts.task_id
+                LIMIT 20
+            ) t
+        ) tasks ON TRUE
+        LEFT JOIN LATERAL (
+            SELECT to_jsonb(s) AS doc
+            FROM (
+                SELECT
+                    mean,
+                    std,
+                    ai_augmentation_potential_mean,
+                    ai_augmentation_potential_std,
+                    human_context_dependency_mean,
+                    human_context_dependency_std,
+                    physical_world_dependency_mean,
+                    physical_world_dependency_std,
+                    confidence_mean,
+                    confidence_std,
+                    updated_at
+                FROM occupation_ai_score
+                WHERE data_version = occ.data_version
+                  AND week = %(week)s
+                  AND soc_code = occ.soc_code
+            ) s
+        ) score ON TRUE
+        """,
+        {"data_version": data_version, "week": week},
+    )
+    return cur.rowcount
+
+
 def main():
     parser = argparse.ArgumentParser(description="Aggregate occupation AI scores")
     parser.add_argument(
@@ -128,6 +223,10 @@ def main():
             )
             if args.verbose:
                 print("[agg] done", f"rows={cur.rowcount}", flush=True)
+            docs = build_occupation_detail_docs(cur, args.data_version, week)
+            if args.verbose:
+                print("[agg] detail docs", f"rows={docs}", flush=True)
+        notify_cache_invalidation(conn, "aggregate_occupations")
         conn.commit()
 
 
@@ -0,0 +1,52 @@
+import argparse
+import os
+
+from api.db import get_conn, notify_cache_invalidation
+
+
+def refresh_link_rollup(cur, data_version: str, week: str) -> int:
+    cur.execute("SELECT tech_progress_refresh_link_rollup(%s, %s)", (data_version, week))
+    row = cur.fetchone()
+    return int(row[0]) if row and row[0] is not None else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the per-task tech link rollup.")
+    parser.add_argument(
+        "--data-version",
+        default=os.getenv("ONET_DATA_VERSION")
+        or os.getenv("DEFAULT_DATA_VERSION")
+        or "30.1",
+        help="O*NET data version label",
+    )
+    parser.add_argument(
+        "--week",
+        default=os.getenv("TECH_PROGRESS_WEEK"),
+        help="Tech progress week (YYYY-Www). Defaults to every week with links.",
+    )
+    args = parser.parse_args()
+
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            if args.week:
+                weeks = [args.week]
+            else:
+                cur.execute(
+                    """
+                    SELECT DISTINCT week
+                    FROM tech_progress_task_link
+                    WHERE data_version = %s
+                    ORDER BY week
+                    """,
+                    (args.data_version,),
+                )
+                weeks = [row[0] for row in cur.fetchall()]
+            for week in weeks:
+                rows = refresh_link_rollup(cur, args.data_version, week)
+                print("[rollup] week", f"data_version={args.data_version}", f"week={week}", f"rows={rows}", flush=True)
+        notify_cache_invalidation(conn, "build_task_link_rollup")
+        conn.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import argparse
+import json
+import os
+from decimal import Decimal
+from typing import Any, Dict
+
+from psycopg.rows import dict_row
+
+from api import queries
+from api.db import get_conn, notify_cache_invalidation
+from worker.build_llm_task_cards import resolve_active_scope
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError(f"not JSON serializable: {type(value).__name__}")
+
+
+def compute_summary(conn, data_version: str, week: str, active_id: str) -> Dict[str, Any]:
+    params = {"active_id": active_id, "data_version": data_version, "week": week}
+    with conn.cursor(row_factory=dict_row) as cur:
+        cur.execute(queries.TECH_PROGRESS_SUMMARY_METRICS_SQL, params)
+        metrics = cur.fetchone() or {}
+        cur.execute(queries.TECH_PROGRESS_SUMMARY_TOP_TASKS_SQL, params)
+        top_tasks = cur.fetchall()
+        cur.execute(queries.TECH_PROGRESS_SUMMARY_TOP_TECH_SQL, params)
+        top_tech = cur.fetchall()
+    return {
+        "week": week,
+        "active_scope_id": active_id,
+        "tasks_with_change": metrics.get("tasks_with_change", 0),
+        "avg_progress": metrics.get("avg_progress"),
+        "top_tasks": top_tasks,
+        "top_tech": top_tech,
+    }
+
+
+def store_summary(
+    conn,
+    data_version: str,
+    week: str,
+    active_id: str,
+    version: int = queries.TECH_PROGRESS_SUMMARY_VERSION,
+) -> Dict[str, Any]:
+    payload = compute_summary(conn, data_version, week, active_id)
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            INSERT INTO tech_progress_llm_weekly_summary
+              (data_version, week, version, payload_json)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (data_version, week, version)
+            DO UPDATE SET payload_json = EXCLUDED.payload_json,
+                          created_at = NOW()
+            """,
+            (
+                data_version,
+                week,
+                version,
+                json.dumps(payload, ensure_ascii=True, default=_json_default),
+            ),
+        )
+    return payload
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build tech progress weekly summaries.")
+    parser.add_argument(
+        "--data-version",
+        default=os.getenv("ONET_DATA_VERSION")
+        or os.getenv("DEFAULT_DATA_VERSION")
+        or "30.1",
+        help="O*NET data version label",
+    )
+    parser.add_argument(
+        "--week",
+        default=os.getenv("TECH_PROGRESS_WEEK"),
+        help="Tech progress week (YYYY-Www). Defaults to latest active scope week.",
+    )
+    parser.add_argument("--version", type=int, default=queries.TECH_PROGRESS_SUMMARY_VERSION)
+    args = parser.parse_args()
+
+    with get_conn() as conn:
+        week, active_id = resolve_active_scope(conn, args.data_version, args.week)
+        if not week or not active_id:
+            print(
+                "[summary] no active scope",
+                f"data_version={args.data_version}",
+                f"week={args.week or 'latest'}",
+                flush=True,
+            )
+            return
+        payload = store_summary(conn, args.data_version, week, active_id, args.version)
+        notify_cache_invalidation(conn, "build_tech_progress_summary")
+        conn.commit()
+        print(
+            "[summary] done",
+            f"data_version={args.data_version}",
+            f"week={week}",
+            f"active_id={active_id}",
+            f"tasks_with_change={payload['tasks_with_change']}",
+            flush=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+import argparse
+import hashlib
+import os
+import random
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from api.db import get_conn
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def normalize_statement(text: str) -> List[str]:
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+def shingles(text: str, size: int = 5) -> Set[int]:
+    normalized = " ".join(normalize_statement(text))
+    grams = {normalized[i : i + size] for i in range(max(1, len(normalized) - size + 1))} if normalized else set()
+    return {int.from_bytes(hashlib.blake2b(gram.encode("utf-8"), digest_size=4).digest(), "big") for gram in grams}
+
+
+def jaccard(left: Set[int], right: Set[int]) -> float:
+    if not left and not right:
+        return 1.0
+    return len(left & right) / len(left | right)
+
+
+def lsh_bands(num_perm: int, threshold: float, recall: float = 0.99) -> int:
+    # Fewest bands that make a pair exactly at the threshold a candidate with the given probability:
+    # candidates are verified exactly, so extra ones only cost time while missed pairs cost a provider call.
+    for bands in range(1, num_perm + 1):
+        if num_perm % bands == 0 and 1.0 - (1.0 - threshold ** (num_perm // bands)) ** bands >= recall:
+            return bands
+    return num_perm
+
+
+class MinHasher:
+    # One-permutation MinHash: each shingle is hashed once into one of num_perm slots, and empty
+    # slots borrow from the next filled one so identical sets still get identical signatures.
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.a = rng.randrange(1, _MERSENNE_PRIME) | 1
+        self.b = rng.randrange(0, _MERSENNE_PRIME)
+
+    def signature(self, values: Set[int]) -> Tuple[int, ...]:
+        slots: List[Optional[int]] = [None] * self.num_perm
+        for value in values:
+            hashed = (self.a * value + self.b) % _MERSENNE_PRIME
+            slot, rank = hashed % self.num_perm, hashed // self.num_perm
+            if slots[slot] is None or rank < slots[slot]:
+                slots[slot] = rank
+        if all(slot is None for slot in slots):
+            return tuple([_MAX_HASH] * self.num_perm)
+        signature = []
+        for index in range(self.num_perm):
+            offset = 0
+            while slots[(index + offset) % self.num_perm] is None:
+                offset += 1
+            signature.append(slots[(index + offset) % self.num_perm] * self.num_perm + offset)
+        return tuple(signature)
+
+
+@dataclass
+class DedupeMember:
+    task_id: int
+    representative_task_id: int
+    similarity: float
+
+
+def cluster_statements(
+    statements: Iterable[Tuple[int, str]],
+    threshold: float = 0.8,
+    num_perm: int = 64,
+    shingle_size: int = 5,
+) -> List[DedupeMember]:
+    hasher = MinHasher(num_perm)
+    bands = lsh_bands(num_perm, threshold)
+    rows = num_perm // bands
+    buckets: List[Dict[Tuple[int, ...], List[int]]] = [{} for _ in range(bands)]
+    leaders: Dict[int, Set[int]] = {}
+    members: List[DedupeMember] = []
+    # Leader clustering: a task joins the most similar earlier leader, never a member, so every
+    # member is within the threshold of the task whose score it inherits.
+    for task_id, statement in sorted(statements):
+        values = shingles(statement, shingle_size)
+        if not values:
+            # Nothing to compare: blank statements are scored on their own rather than grouped.
+            continue
+        signature = hasher.signature(values)
+        keys = [signature[band * rows : (band + 1) * rows] for band in range(bands)]
+        candidates: Set[int] = set()
+        for band, key in enumerate(keys):
+            candidates.update(buckets[band].get(key, ()))
+        best: Optional[Tuple[float, int]] = None
+        for leader in candidates:
+            similarity = jaccard(values, leaders[leader])
+            if similarity >= threshold and (best is None or (similarity, -leader) > (best[0], -best[1])):
+                best = (similarity, leader)
+        if best is not None:
+            members.append(DedupeMember(task_id, best[1], round(best[0], 3)))
+            continue
+        leaders[task_id] = values
+        for band, key in enumerate(keys):
+            buckets[band].setdefault(key, []).append(task_id)
+    return members
+
+
+def method_label(threshold: float, num_perm: int, shingle_size: int) -> str:
+    return f"minhash:perm={num_perm}:shingle={shingle_size}:threshold={threshold:.2f}"
+
+
+def refresh_clusters(
+    conn,
+    data_version: str,
+    threshold: float,
+    num_perm: int,
+    shingle_size: int,
+    dry_run: bool = False,
+) -> Tuple[int, int]:
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT task_id, task_statement FROM task_statements WHERE data_version = %s",
+            (data_version,),
+        )
+        statements = cur.fetchall()
+    members = cluster_statements(statements, threshold, num_perm, shingle_size)
+    if dry_run:
+        return len(statements), len(members)
+    method = method_label(threshold, num_perm, shingle_size)
+    with conn.cursor() as cur:
+        cur.execute("DELETE FROM task_dedupe_cluster WHERE data_version = %s", (data_version,))
+        with cur.copy(
+            "COPY task_dedupe_cluster (data_version, task_id, representative_task_id, similarity, method) FROM STDIN"
+        ) as copy:
+            for member in members:
+                copy.write_row((data_version, member.task_id, member.representative_task_id, member.similarity, method))
+    conn.commit()
+    return len(statements), len(members)
+
+
+def load_representatives(conn, data_version: str, task_ids: List[int]) -> Dict[int, int]:
+    if not task_ids:
+        return {}
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT task_id, representative_task_id
+            FROM task_dedupe_cluster
+            WHERE data_version = %s
+              AND task_id = ANY(%s)
+            """,
+            (data_version, task_ids),
+        )
+        return {int(task_id): int(rep) for task_id, rep in cur.fetchall()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cluster near-duplicate task statements for scoring.")
+    parser.add_argument(
+        "--data-version",
+        default=os.getenv("ONET_DATA_VERSION")
+        or os.getenv("DEFAULT_DATA_VERSION")
+        or "30.1",
+        help="O*NET data version label",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=float(os.getenv("DEDUPE_THRESHOLD", "0.8")),
+        help="Minimum shingle Jaccard similarity between a member and its representative",
+    )
+    parser.add_argument("--num-perm", type=int, default=int(os.getenv("DEDUPE_NUM_PERM", "64")))
+    parser.add_argument(
+        "--shingle-size",
+        type=int,
+        default=int(os.getenv("DEDUPE_SHINGLE_SIZE", "5")),
+        help="Characters per shingle of the normalized statement",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Report cluster sizes without writing")
+    args = parser.parse_args()
+
+    with get_conn() as conn:
+        total, duplicates = refresh_clusters(
+            conn,
+            args.data_version,
+            args.threshold,
+            args.num_perm,
+            args.shingle_size,
+            args.dry_run,
+        )
+    rate = duplicates / total if total else 0.0
+    print(
+        "[dedupe]",
+        f"data_version={args.data_version}",
+        f"tasks={total}",
+        f"members={duplicates}",
+        f"duplicate_rate={rate:.3f}",
+        f"method={method_label(args.threshold, args.num_perm, args.shingle_size)}",
+        f"dry_run={args.dry_run}",
+        flush=True,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+import argparse
+import os
+from typing import Iterable, List, Optional
+
+from api.db import get_conn, notify_cache_invalidation
+
+ENSEMBLE_UPSERT_SQL = """
+INSERT INTO task_ai_ensemble (
+    data_version, week, task_id,
+    mean, std, min, max,
+    ai_augmentation_potential_mean, ai_augmentation_potential_std,
+    ai_augmentation_potential_min, ai_augmentation_potential_max,
+    human_context_dependency_mean, human_context_dependency_std,
+    human_context_dependency_min, human_context_dependency_max,
+    physical_world_dependency_mean, physical_world_dependency_std,
+    physical_world_dependency_min, physical_world_dependency_max,
+    confidence_mean, confidence_std, confidence_min, confidence_max,
+    model_count, updated_at
+)
+SELECT
+    data_version,
+    week,
+    task_id,
+    AVG(score)::numeric(6,2) AS mean,
+    STDDEV_POP(score)::numeric(6,2) AS std,
+    MIN(score)::numeric(6,2) AS min,
+    MAX(score)::numeric(6,2) AS max,
+    AVG(ai_augmentation_potential)::numeric(6,2) AS ai_augmentation_potential_mean,
+    STDDEV_POP(ai_augmentation_potential)::numeric(6,2) AS ai_augmentation_potential_std,
+    MIN(ai_augmentation_potential)::numeric(6,2) AS ai_augmentation_potential_min,
+    MAX(ai_augmentation_potential)::numeric(6,2) AS ai_augmentation_potential_max,
+    AVG(human_context_dependency)::numeric(6,2) AS human_context_dependency_mean,
+    STDDEV_POP(human_context_dependency)::numeric(6,2) AS human_context_dependency_std,
+    MIN(human_context_dependency)::numeric(6,2) AS human_context_dependency_min,
+    MAX(human_context_dependency)::numeric(6,2) AS human_context_dependency_max,
+    AVG(physical_world_dependency)::numeric(6,2) AS physical_world_dependency_mean,
+    STDDEV_POP(physical_world_dependency)::numeric(6,2) AS physical_world_dependency_std,
+    MIN(physical_world_dependency)::numeric(6,2) AS physical_world_dependency_min,
+    MAX(physical_world_dependency)::numeric(6,2) AS physical_world_dependency_max,
+    AVG(confidence)::numeric(6,2) AS confidence_mean,
+    STDDEV_POP(confidence)::numeric(6,2) AS confidence_std,
+    MIN(confidence)::numeric(6,2) AS confidence_min,
+    MAX(confidence)::numeric(6,2) AS confidence_max,
+    COUNT(DISTINCT model) AS model_count,
+    NOW()
+FROM task_ai_score
+WHERE data_version = %s
+  AND week = %s
+  AND task_id = ANY(%s)
+GROUP BY data_version, week, task_id
+ON CONFLICT (data_version, week, task_id) DO UPDATE
+SET mean = EXCLUDED.mean,
+    std = EXCLUDED.std,
+    min = EXCLUDED.min,
+    max = EXCLUDED.max,
+    ai_augmentation_potential_mean = EXCLUDED.ai_augmentation_potential_mean,
+    ai_augmentation_potential_std = EXCLUDED.ai_augmentation_potential_std,
+    ai_augmentation_potential_min = EXCLUDED.ai_augmentation_potential_min,
+    ai_augmentation_potential_max = EXCLUDED.ai_augmentation_potential_max,
+    human_context_dependency_mean = EXCLUDED.human_context_dependency_mean,
+    human_context_dependency_std = EXCLUDED.human_context_dependency_std,
+    human_context_dependency_min = EXCLUDED.human_context_dependency_min,
+    human_context_dependency_max = EXCLUDED.human_context_dependency_max,
+    physical_world_dependency_mean = EXCLUDED.physical_world_dependency_mean,
+    physical_world_dependency_std = EXCLUDED.physical_world_dependency_std,
+    physical_world_dependency_min = EXCLUDED.physical_world_dependency_min,
+    physical_world_dependency_max = EXCLUDED.physical_world_dependency_max,
+    confidence_mean = EXCLUDED.confidence_mean,
+    confidence_std = EXCLUDED.confidence_std,
+    confidence_min = EXCLUDED.confidence_min,
+    confidence_max = EXCLUDED.confidence_max,
+    model_count = EXCLUDED.model_count,
+    updated_at = EXCLUDED.updated_at
+"""
+
+# Serializes ensemble writers of one (data_version, week): the upsert reads every model's scores,
+# so two workers finishing at once must not each write an average missing the other's rows.
+ENSEMBLE_LOCK_SQL = "SELECT pg_advisory_xact_lock(hashtext('task_ai_ensemble'), hashtext(%s || '|' || %s))"
+
+STALE_TASKS_SQL = """
+SELECT s.task_id
+FROM task_ai_score s
+LEFT JOIN task_ai_ensemble e
+  ON e.data_version = s.data_version
+ AND e.week = s.week
+ AND e.task_id = s.task_id
+WHERE s.data_version = %(data_version)s
+  AND s.week = %(week)s
+  AND s.task_id > %(after)s
+GROUP BY s.task_id, e.updated_at
+HAVING e.updated_at IS NULL OR MAX(s.created_at) > e.updated_at
+ORDER BY s.task_id
+LIMIT %(limit)s
+"""
+
+ALL_TASKS_SQL = """
+SELECT DISTINCT task_id
+FROM task_ai_score
+WHERE data_version = %(data_version)s
+  AND week = %(week)s
+  AND task_id > %(after)s
+ORDER BY task_id
+LIMIT %(limit)s
+"""
+
+
+def upsert_task_ensemble(
+    conn,
+    data_version: str,
+    week: str,
+    task_ids: Iterable[int],
+    chunk_size: int = 1000,
+) -> int:
+    ids = sorted(set(task_ids))
+    step = max(1, chunk_size)
+    for start in range(0, len(ids), step):
+        with conn.cursor() as cur:
+            cur.execute(ENSEMBLE_LOCK_SQL, (data_version, week))
+            cur.execute(ENSEMBLE_UPSERT_SQL, (data_version, week, ids[start : start + step]))
+        conn.commit()
+    return len(ids)
+
+
+def refresh_week_ensemble(
+    conn,
+    data_version: str,
+    week: str,
+    chunk_size: int = 1000,
+    stale_only: bool = False,
+    verbose: bool = False,
+) -> int:
+    sql = STALE_TASKS_SQL if stale_only else ALL_TASKS_SQL
+    after = -1
+    total = 0
+    while True:
+        with conn.cursor() as cur:
+            cur.execute(
+                sql,
+                {"data_version": data_version, "week": week, "after": after, "limit": max(1, chunk_size)},
+            )
+            task_ids: List[int] = [row[0] for row in cur.fetchall()]
+        if not task_ids:
+            break
+        total += upsert_task_ensemble(conn, data_version, week, task_ids, chunk_size)
+        after = task_ids[-1]
+        if verbose:
+            print("[ensemble] chunk", f"week={week}", f"tasks={len(task_ids)}", f"last_task_id={after}", flush=True)
+    return total
+
+
+def _weeks(conn, data_version: str, week: Optional[str]) -> List[str]:
+    if week:
+        return [week]
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT DISTINCT week
+            FROM task_ai_score
+            WHERE data_version = %s
+            ORDER BY week
+            """,
+            (data_version,),
+        )
+        return [row[0] for row in cur.fetchall()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute task_ai_ensemble from task_ai_score.")
+    parser.add_argument(
+        "--data-version",
+        default=os.getenv("ONET_DATA_VERSION")
+        or os.getenv("DEFAULT_DATA_VERSION")
+        or "30.1",
+        help="O*NET data version label",
+    )
+    parser.add_argument(
+        "--week",
+        default=os.getenv("TECH_PROGRESS_WEEK"),
+        help="Tech progress week (YYYY-Www). Defaults to every scored week.",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=int(os.getenv("ENSEMBLE_CHUNK_SIZE", "1000")),
+        help="Tasks per upsert transaction",
+    )
+    parser.add_argument(
+        "--stale-only",
+        action="store_true",
+        help="Only tasks with task_ai_score rows newer than their ensemble row",
+    )
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    with get_conn() as conn:
+        for week in _weeks(conn, args.data_version, args.week):
+            count = refresh_week_ensemble(
+                conn,
+                args.data_version,
+                week,
+                chunk_size=args.chunk_size,
+                stale_only=args.stale_only,
+                verbose=args.verbose,
+            )
+            print("[ensemble] week", f"data_version={args.data_version}", f"week={week}", f"tasks={count}", flush=True)
+        notify_cache_invalidation(conn, "ensemble")
+        conn.commit()
+
+
+if __name__ == "__main__":
+    main()
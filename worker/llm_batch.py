@@ -0,0 +1,302 @@
+import io
+import json
+import os
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from api.env import float_env
+from worker.llm_providers import (
+    ProviderError,
+    ProviderSpec,
+    StructuredOutputSchema,
+    _format_prompt,
+    _get_attr,
+    _mock_scores,
+    anthropic_payload,
+    anthropic_scores,
+    openai_payload,
+    openai_scores,
+    shared_http_client,
+)
+
+BATCH_IN_PROGRESS = "in_progress"
+BATCH_COMPLETED = "completed"
+BATCH_FAILED = "failed"
+
+
+@dataclass
+class BatchRequest:
+    custom_id: str
+    task_input: str
+
+
+@dataclass
+class BatchResult:
+    custom_id: str
+    scores: Optional[Dict[str, float]] = None
+    error: Optional[str] = None
+
+
+class BatchClient(ABC):
+    @abstractmethod
+    def submit(
+        self,
+        requests: List[BatchRequest],
+        prompt_template: str,
+        schema: Optional[StructuredOutputSchema] = None,
+    ) -> str:
+        ...
+
+    @abstractmethod
+    def poll(self, batch_id: str) -> str:
+        ...
+
+    @abstractmethod
+    def results(
+        self,
+        batch_id: str,
+        schema: Optional[StructuredOutputSchema] = None,
+    ) -> Iterator[BatchResult]:
+        ...
+
+
+def _openai_batch_result(line: Dict[str, Any], schema: Optional[StructuredOutputSchema]) -> BatchResult:
+    custom_id = str(line.get("custom_id"))
+    response = line.get("response") or {}
+    error = line.get("error")
+    if error or response.get("status_code") != 200:
+        detail = error or (response.get("body") or {}).get("error") or f"status {response.get('status_code')}"
+        return BatchResult(custom_id=custom_id, error=str(detail))
+    try:
+        return BatchResult(custom_id=custom_id, scores=openai_scores(response.get("body") or {}, schema))
+    except (ProviderError, ValueError) as exc:
+        return BatchResult(custom_id=custom_id, error=str(exc))
+
+
+@dataclass
+class OpenAIBatchClient(BatchClient):
+    model: str
+    api_key_env: str = "OPENAI_API_KEY"
+    base_url_env: str = "LLM_OPENAI_BASE_URL"
+    client: object = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        try:
+            from openai import OpenAI
+        except Exception as exc:
+            raise ProviderError("Missing dependency: openai") from exc
+
+        api_key = os.getenv(self.api_key_env)
+        if not api_key:
+            raise ProviderError(f"Missing API key: {self.api_key_env}")
+        base_url = os.getenv(self.base_url_env, "").strip() or os.getenv("OPENAI_BASE_URL", "").strip() or None
+        self.client = OpenAI(api_key=api_key, base_url=base_url, http_client=shared_http_client("openai", base_url))
+
+    def submit(
+        self,
+        requests: List[BatchRequest],
+        prompt_template: str,
+        schema: Optional[StructuredOutputSchema] = None,
+    ) -> str:
+        lines = [
+            json.dumps(
+                {
+                    "custom_id": request.custom_id,
+                    "method": "POST",
+                    "url": "/v1/responses",
+                    "body": openai_payload(
+                        self.model, _format_prompt(prompt_template, request.task_input), schema
+                    ),
+                },
+                ensure_ascii=True,
+            )
+            for request in requests
+        ]
+        upload = self.client.files.create(
+            file=("batch.jsonl", io.BytesIO("\n".join(lines).encode("utf-8"))),
+            purpose="batch",
+        )
+        batch = self.client.batches.create(
+            input_file_id=upload.id,
+            endpoint="/v1/responses",
+            completion_window="24h",
+        )
+        return batch.id
+
+    def poll(self, batch_id: str) -> str:
+        status = self.client.batches.retrieve(batch_id).status
+        if status == "failed":
+            return BATCH_FAILED
+        # Expired and cancelled batches still expose the requests that finished.
+        if status in ("completed", "expired", "cancelled"):
+            return BATCH_COMPLETED
+        return BATCH_IN_PROGRESS
+
+    def results(
+        self,
+        batch_id: str,
+        schema: Optional[StructuredOutputSchema] = None,
+    ) -> Iterator[BatchResult]:
+        batch = self.client.batches.retrieve(batch_id)
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in self.client.files.content(file_id).text.splitlines():
+                if line.strip():
+                    yield _openai_batch_result(json.loads(line), schema)
+
+
+@dataclass
+class AnthropicBatchClient(BatchClient):
+    model: str
+    api_key_env: str = "ANTHROPIC_API_KEY"
+    client: object = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        try:
+            import anthropic
+        except Exception as exc:
+            raise ProviderError("Missing dependency: anthropic") from exc
+
+        api_key = os.getenv(self.api_key_env)
+        if not api_key:
+            raise ProviderError(f"Missing API key: {self.api_key_env}")
+        base_url = os.getenv("ANTHROPIC_BASE_URL", "").strip() or None
+        self.client = anthropic.Anthropic(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=shared_http_client("anthropic", base_url),
+        )
+
+    def submit(
+        self,
+        requests: List[BatchRequest],
+        prompt_template: str,
+        schema: Optional[StructuredOutputSchema] = None,
+    ) -> str:
+        batch = self.client.messages.batches.create(
+            requests=[
+                {
+                    "custom_id": request.custom_id,
+                    "params": anthropic_payload(
+                        self.model, _format_prompt(prompt_template, request.task_input), schema
+                    ),
+                }
+                for request in requests
+            ]
+        )
+        return batch.id
+
+    def poll(self, batch_id: str) -> str:
+        status = self.client.messages.batches.retrieve(batch_id).processing_status
+        return BATCH_COMPLETED if status == "ended" else BATCH_IN_PROGRESS
+
+    def results(
+        self,
+        batch_id: str,
+        schema: Optional[StructuredOutputSchema] = None,
+    ) -> Iterator[BatchResult]:
+        for entry in self.client.messages.batches.results(batch_id):
+            result = entry.result
+            if result.type != "succeeded":
+                detail = _get_attr(_get_attr(result, "error"), "error") or _get_attr(result, "error")
+                yield BatchResult(custom_id=entry.custom_id, error=f"{result.type}: {detail}")
+                continue
+            try:
+                yield BatchResult(custom_id=entry.custom_id, scores=anthropic_scores(result.message, schema))
+            except (ProviderError, ValueError) as exc:
+                yield BatchResult(custom_id=entry.custom_id, error=str(exc))
+
+
+@dataclass
+class MockBatchClient(BatchClient):
+    model: str
+    root: Path = field(default_factory=lambda: Path(os.getenv("LLM_MOCK_BATCH_DIR", "worker/output/mock_batches")))
+    delay: float = field(default_factory=lambda: float_env("LLM_MOCK_BATCH_DELAY", 0.0))
+
+    def _path(self, batch_id: str, suffix: str) -> Path:
+        return self.root / f"{batch_id}.{suffix}"
+
+    def submit(
+        self,
+        requests: List[BatchRequest],
+        prompt_template: str,
+        schema: Optional[StructuredOutputSchema] = None,
+    ) -> str:
+        self.root.mkdir(parents=True, exist_ok=True)
+        batch_id = f"mockbatch_{uuid.uuid4().hex[:16]}"
+        lines = [
+            json.dumps(
+                {
+                    "custom_id": request.custom_id,
+                    "body": {
+                        "model": self.model,
+                        "input": _format_prompt(prompt_template, request.task_input),
+                        "schema": {"name": schema.name, "schema": schema.schema} if schema else None,
+                    },
+                },
+                ensure_ascii=True,
+            )
+            for request in requests
+        ]
+        self._path(batch_id, "input.jsonl").write_text("\n".join(lines))
+        meta = {"id": batch_id, "status": "in_progress", "created_at": time.time(), "request_count": len(lines)}
+        self._path(batch_id, "json").write_text(json.dumps(meta))
+        return batch_id
+
+    def poll(self, batch_id: str) -> str:
+        meta_path = self._path(batch_id, "json")
+        if not meta_path.exists():
+            return BATCH_FAILED
+        meta = json.loads(meta_path.read_text())
+        if meta["status"] == "in_progress" and time.time() - meta["created_at"] >= self.delay:
+            # Mirrors the provider protocol: results are only downloadable once the job has completed.
+            outputs = []
+            for line in self._path(batch_id, "input.jsonl").read_text().splitlines():
+                request = json.loads(line)
+                body = request["body"]
+                request_schema = StructuredOutputSchema(**body["schema"]) if body.get("schema") else None
+                scores = _mock_scores(f"{body['model']}|{body['input']}", request_schema)
+                outputs.append(
+                    json.dumps(
+                        {
+                            "custom_id": request["custom_id"],
+                            "response": {"status_code": 200, "body": {"output_text": json.dumps(scores)}},
+                        }
+                    )
+                )
+            self._path(batch_id, "output.jsonl").write_text("\n".join(outputs))
+            meta["status"] = "completed"
+            meta_path.write_text(json.dumps(meta))
+        return BATCH_COMPLETED if meta["status"] == "completed" else BATCH_IN_PROGRESS
+
+    def results(
+        self,
+        batch_id: str,
+        schema: Optional[StructuredOutputSchema] = None,
+    ) -> Iterator[BatchResult]:
+        output_path = self._path(batch_id, "output.jsonl")
+        if not output_path.exists():
+            raise ProviderError(f"Batch not completed: {batch_id}")
+        for line in output_path.read_text().splitlines():
+            if line.strip():
+                yield _openai_batch_result(json.loads(line), schema)
+
+
+_BATCH_CLIENTS = {
+    "openai": OpenAIBatchClient,
+    "anthropic": AnthropicBatchClient,
+}
+
+
+def get_batch_client(spec: ProviderSpec, use_mock: bool) -> BatchClient:
+    if use_mock:
+        return MockBatchClient(model=spec.label)
+    client_class = _BATCH_CLIENTS.get(spec.provider)
+    if not client_class:
+        raise ProviderError(f"Batch mode not supported for provider: {spec.provider}")
+    return client_class(model=spec.model)
@@ -1,15 +1,31 @@
 import hashlib
 import json
 import os
+import random
 import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
-from typing import Any, Dict, Iterable, List, Optional
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+from api.env import float_env, float_env_optional, int_env
+
+T = TypeVar("T")
 
 
 class ProviderError(RuntimeError):
     pass
 
 
+class RateLimitError(ProviderError):
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
 class ScoreProvider:
     def score(
         self,
@@ -36,11 +52,18 @@ class ProviderSpec:
 class StructuredOutputSchema:
     name: str
     schema: Dict[str, Any]
+    max_output_tokens: Optional[int] = None
 
 
 @dataclass
 class MockProvider(ScoreProvider):
     model: str
+    latency: float = field(default_factory=lambda: float_env("LLM_MOCK_LATENCY", 0.0))
+    max_concurrency: int = field(default_factory=lambda: int_env("LLM_MOCK_MAX_CONCURRENCY", 0))
+    throttle_rate: float = field(default_factory=lambda: float_env("LLM_MOCK_THROTTLE_RATE", 0.0))
+    retry_after: float = field(default_factory=lambda: float_env("LLM_MOCK_RETRY_AFTER", 1.0))
+    _in_flight: int = field(default=0, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
 
     def score(
         self,
@@ -50,8 +73,32 @@ class MockProvider(ScoreProvider):
         model_version: str,
         schema: Optional[StructuredOutputSchema] = None,
     ) -> Dict[str, float]:
-        seed = f"{self.model}|{model_version}|{prompt_version}|{prompt_template}|{task_statement}"
-        return _mock_scores(seed, schema)
+        with self._lock:
+            self._in_flight += 1
+            overloaded = 0 < self.max_concurrency < self._in_flight
+        try:
+            if overloaded or (self.throttle_rate > 0 and random.random() < self.throttle_rate):
+                raise RateLimitError("mock rate limit", retry_after=self.retry_after)
+            if self.latency > 0:
+                time.sleep(self.latency)
+            seed = f"{self.model}|{model_version}|{prompt_version}|{prompt_template}|{task_statement}"
+            items = (schema.schema.get("properties") or {}).get("results") if schema else None
+            if items:
+                return {"results": self._mock_results(seed, task_statement, items)}
+            return _mock_scores(seed, schema)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def _mock_results(self, seed: str, task_statement: str, rules: Dict[str, Any]) -> List[Dict[str, Any]]:
+        item_schema = StructuredOutputSchema(name="item", schema=rules.get("items") or {})
+        drop_rate = float_env("LLM_MOCK_DROP_RATE", 0.0)
+        results = []
+        for task_id in _TASK_ID_RE.findall(task_statement):
+            if drop_rate > 0 and random.random() < drop_rate:
+                continue
+            results.append({**_mock_scores(f"{seed}|{task_id}", item_schema), "task_id": int(task_id)})
+        return results
 
 
 @dataclass
@@ -59,6 +106,7 @@ class OpenAIProvider(ScoreProvider):
     model: str
     api_key_env: str = "OPENAI_API_KEY"
     base_url_env: str = "LLM_OPENAI_BASE_URL"
+    pool_size: int = 0
     client: object = field(init=False, repr=False)
 
     def __post_init__(self) -> None:
@@ -70,8 +118,9 @@ class OpenAIProvider(ScoreProvider):
         api_key = os.getenv(self.api_key_env)
         if not api_key:
             raise ProviderError(f"Missing API key: {self.api_key_env}")
-        base_url = os.getenv(self.base_url_env, "").strip() or None
-        self.client = OpenAI(api_key=api_key, base_url=base_url)
+        base_url = os.getenv(self.base_url_env, "").strip() or os.getenv("OPENAI_BASE_URL", "").strip() or None
+        http_client = shared_http_client("openai", base_url, self.pool_size)
+        self.client = OpenAI(api_key=api_key, base_url=base_url, http_client=http_client)
 
     def score(
         self,
@@ -82,37 +131,16 @@ class OpenAIProvider(ScoreProvider):
         schema: Optional[StructuredOutputSchema] = None,
     ) -> Dict[str, float]:
         prompt = _format_prompt(prompt_template, task_statement)
-        payload = {
-            "model": self.model,
-            "input": prompt,
-            "max_output_tokens": _max_output_tokens(schema),
-        }
-        text_payload: Dict[str, Any] = {}
-        if schema:
-            text_payload["format"] = _openai_text_format(schema)
-        temperature = _float_env_optional("LLM_TEMPERATURE")
-        if temperature is not None:
-            payload["temperature"] = temperature
-        reasoning_effort = _openai_reasoning_effort(self.model)
-        if reasoning_effort:
-            payload["reasoning"] = {"effort": reasoning_effort}
-        verbosity = _openai_text_verbosity(self.model)
-        if verbosity:
-            text_payload["verbosity"] = verbosity
-        if text_payload:
-            payload["text"] = text_payload
-        response = self.client.responses.create(**payload)
-        text = _extract_openai_text(response)
-        if schema:
-            data = _parse_json_text(text)
-            return _normalize_scores(data, schema)
-        return {"ai_substitution_risk": _parse_score(text)}
+        response = self.client.responses.create(**openai_payload(self.model, prompt, schema))
+        return openai_scores(response, schema)
 
 
 @dataclass
 class AnthropicProvider(ScoreProvider):
     model: str
     api_key_env: str = "ANTHROPIC_API_KEY"
+    base_url_env: str = "ANTHROPIC_BASE_URL"
+    pool_size: int = 0
     client: object = field(init=False, repr=False)
 
     def __post_init__(self) -> None:
@@ -124,7 +152,9 @@ class AnthropicProvider(ScoreProvider):
         api_key = os.getenv(self.api_key_env)
         if not api_key:
             raise ProviderError(f"Missing API key: {self.api_key_env}")
-        self.client = anthropic.Anthropic(api_key=api_key)
+        base_url = os.getenv(self.base_url_env, "").strip() or None
+        http_client = shared_http_client("anthropic", base_url, self.pool_size)
+        self.client = anthropic.Anthropic(api_key=api_key, base_url=base_url, http_client=http_client)
 
     def score(
         self,
@@ -140,46 +170,17 @@ class AnthropicProvider(ScoreProvider):
             content = prompt
             if extra_note:
                 content = f"{prompt}\n\nIMPORTANT: {extra_note}"
-            payload = {
-                "model": self.model,
-                "max_tokens": _max_output_tokens(schema),
-                "temperature": _float_env("LLM_TEMPERATURE", 0.0),
-                "messages": [{"role": "user", "content": content}],
-            }
-            if schema:
-                payload["system"] = (
-                    "You must call the tool and include every required field. "
-                    "If a field is unknown, set it to 0 and set confidence to 0."
-                )
-                payload["tools"] = [
-                    {
-                        "name": schema.name,
-                        "description": "Return task risk scores as structured JSON.",
-                        "input_schema": schema.schema,
-                    }
-                ]
-                payload["tool_choice"] = {"type": "tool", "name": schema.name}
-            return self.client.messages.create(**payload)
+            return self.client.messages.create(**anthropic_payload(self.model, content, schema))
 
         message = _call()
         if schema:
-            tool_input = _extract_anthropic_tool_input(message, schema.name)
-            if tool_input is None:
-                text = _extract_anthropic_text(message)
-                data = _parse_json_text(text)
-            else:
-                data = tool_input
+            data = _anthropic_data(message, schema)
             missing = _missing_required_fields(data, schema)
             if missing:
                 message = _call(
                     "Return ALL required fields. Missing fields: " + ", ".join(missing)
                 )
-                tool_input = _extract_anthropic_tool_input(message, schema.name)
-                if tool_input is None:
-                    text = _extract_anthropic_text(message)
-                    data = _parse_json_text(text)
-                else:
-                    data = tool_input
+                data = _anthropic_data(message, schema)
             data = _fill_missing_scores(data, schema)
             return _normalize_scores(data, schema)
         text = _extract_anthropic_text(message)
@@ -191,6 +192,7 @@ class LocalOpenAIProvider(ScoreProvider):
     model: str
     base_url_env: str = "LLM_LOCAL_BASE_URL"
     api_key_env: str = "LLM_LOCAL_API_KEY"
+    pool_size: int = 0
     client: object = field(init=False, repr=False)
 
     def __post_init__(self) -> None:
@@ -203,7 +205,8 @@ class LocalOpenAIProvider(ScoreProvider):
         if not base_url:
             raise ProviderError(f"Missing base URL: {self.base_url_env}")
         api_key = os.getenv(self.api_key_env, "").strip() or "local"
-        self.client = OpenAI(api_key=api_key, base_url=base_url)
+        http_client = shared_http_client("local", base_url, self.pool_size)
+        self.client = OpenAI(api_key=api_key, base_url=base_url, http_client=http_client)
 
     def score(
         self,
@@ -214,31 +217,428 @@ class LocalOpenAIProvider(ScoreProvider):
         schema: Optional[StructuredOutputSchema] = None,
     ) -> Dict[str, float]:
         prompt = _format_prompt(prompt_template, task_statement)
-        payload = {
-            "model": self.model,
-            "input": prompt,
-            "max_output_tokens": _max_output_tokens(schema),
+        response = self.client.responses.create(**openai_payload(self.model, prompt, schema))
+        return openai_scores(response, schema)
+
+
+class TokenBucket:
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0 if per_minute > 0 else 0.0
+        self.capacity = capacity or max(per_minute, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0) -> float:
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if self.rate:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                wait = self.paused_until - now
+                if wait <= 0:
+                    if not self.rate:
+                        return waited
+                    if self.tokens >= amount:
+                        self.tokens -= amount
+                        return waited
+                    wait = (amount - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class AdaptiveConcurrency:
+    def __init__(self, max_limit: int, min_limit: int = 1, cooldown: float = 1.0):
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.limit = float(max(self.min_limit, self.max_limit // 2))
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def saturated(self) -> bool:
+        with self._cond:
+            return self.in_flight >= int(self.limit)
+
+    def release(self, throttled: bool = False) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if throttled:
+                # One multiplicative decrease per cooldown, not one per in-flight call that hit the limit.
+                if now - self._last_decrease >= self.cooldown:
+                    self.limit = max(float(self.min_limit), self.limit / 2)
+                    self._last_decrease = now
+            else:
+                self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+
+class ProviderRateLimiter:
+    def __init__(
+        self,
+        provider: str,
+        rpm: float = 0.0,
+        tpm: float = 0.0,
+        max_concurrency: int = 4,
+        min_concurrency: int = 1,
+    ):
+        self.provider = provider
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm) if tpm > 0 else None
+        self.concurrency = AdaptiveConcurrency(max_concurrency, min_concurrency)
+        self.calls = 0
+        self.throttled = 0
+        self.waited = 0.0
+
+    def call(self, fn: Callable[[], T], tokens: int = 0) -> T:
+        waited = self.requests.acquire(1)
+        if self.tokens is not None and tokens:
+            waited += self.tokens.acquire(tokens)
+        self.waited += waited
+        self.concurrency.acquire()
+        throttled = False
+        try:
+            self.calls += 1
+            return fn()
+        except Exception as exc:
+            limited = as_rate_limit_error(exc)
+            if limited is None:
+                raise
+            throttled = True
+            self.throttled += 1
+            if limited.retry_after:
+                self.requests.pause(limited.retry_after)
+            if limited is exc:
+                raise
+            raise limited from exc
+        finally:
+            self.concurrency.release(throttled)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "provider": self.provider,
+            "calls": self.calls,
+            "throttled": self.throttled,
+            "waited_seconds": round(self.waited, 3),
+            "concurrency_limit": int(self.concurrency.limit),
+            "max_concurrency": self.concurrency.max_limit,
         }
-        text_payload: Dict[str, Any] = {}
-        if schema:
-            text_payload["format"] = _openai_text_format(schema)
-        temperature = _float_env_optional("LLM_TEMPERATURE")
-        if temperature is not None:
-            payload["temperature"] = temperature
-        reasoning_effort = _openai_reasoning_effort(self.model)
-        if reasoning_effort:
-            payload["reasoning"] = {"effort": reasoning_effort}
-        verbosity = _openai_text_verbosity(self.model)
-        if verbosity:
-            text_payload["verbosity"] = verbosity
-        if text_payload:
-            payload["text"] = text_payload
-        response = self.client.responses.create(**payload)
-        text = _extract_openai_text(response)
-        if schema:
-            data = _parse_json_text(text)
-            return _normalize_scores(data, schema)
-        return {"ai_substitution_risk": _parse_score(text)}
+
+
+@dataclass
+class RateLimitedProvider(ScoreProvider):
+    inner: ScoreProvider
+    limiter: ProviderRateLimiter
+
+    def score(
+        self,
+        task_statement: str,
+        prompt_template: str,
+        prompt_version: str,
+        model_version: str,
+        schema: Optional[StructuredOutputSchema] = None,
+    ) -> Dict[str, float]:
+        tokens = len(_format_prompt(prompt_template, task_statement)) // 4 + _max_output_tokens(schema)
+        return self.limiter.call(
+            lambda: self.inner.score(
+                task_statement,
+                prompt_template,
+                prompt_version,
+                model_version,
+                schema=schema,
+            ),
+            tokens,
+        )
+
+
+class LatencyTracker:
+    def __init__(self, percentile: float = 95.0, window: int = 200, min_samples: int = 20):
+        self.percentile = min(100.0, max(0.0, percentile))
+        self.min_samples = max(1, min_samples)
+        self._samples = deque(maxlen=max(self.min_samples, window))
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def deadline(self) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * self.percentile / 100.0))]
+
+
+class HedgeLost(Exception):
+    pass
+
+
+@dataclass
+class HedgedProvider(ScoreProvider):
+    inner: ScoreProvider
+    limiter: ProviderRateLimiter
+    latency: LatencyTracker
+    max_concurrency: int = 4
+    hedged: int = 0
+    hedge_wins: int = 0
+    skipped: int = 0
+    _executor: ThreadPoolExecutor = field(init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=max(1, self.max_concurrency) * 2, thread_name_prefix="hedge")
+
+    def score(
+        self,
+        task_statement: str,
+        prompt_template: str,
+        prompt_version: str,
+        model_version: str,
+        schema: Optional[StructuredOutputSchema] = None,
+    ) -> Dict[str, float]:
+        tokens = len(_format_prompt(prompt_template, task_statement)) // 4 + _max_output_tokens(schema)
+        settled = threading.Event()
+
+        def call(started: threading.Event) -> Dict[str, float]:
+            def timed() -> Dict[str, float]:
+                started.set()
+                # A copy still queued in the limiter when the other one answers is never sent.
+                if settled.is_set():
+                    raise HedgeLost()
+                begun = time.monotonic()
+                result = self.inner.score(task_statement, prompt_template, prompt_version, model_version, schema=schema)
+                self.latency.add(time.monotonic() - begun)
+                return result
+
+            try:
+                return self.limiter.call(timed, tokens)
+            finally:
+                started.set()
+
+        deadline = self.latency.deadline()
+        if deadline is None:
+            return call(threading.Event())
+        started = threading.Event()
+        primary = self._executor.submit(call, started)
+        # Time spent waiting for the limiter does not count toward the deadline.
+        started.wait()
+        done, _ = wait([primary], timeout=deadline)
+        if done:
+            return primary.result()
+        if self.limiter.concurrency.saturated():
+            # A backup would only queue behind calls already waiting for a slot.
+            with self._lock:
+                self.skipped += 1
+            return primary.result()
+        backup = self._executor.submit(call, threading.Event())
+        with self._lock:
+            self.hedged += 1
+        pending = {primary, backup}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is not None:
+                        error = error or future.exception()
+                        continue
+                    if future is backup:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    return future.result()
+            raise error
+        finally:
+            # An in-flight request cannot be interrupted; the loser's result is discarded.
+            settled.set()
+
+    def stats(self) -> Dict[str, Any]:
+        deadline = self.latency.deadline()
+        with self._lock:
+            return {
+                "deadline_seconds": round(deadline, 3) if deadline is not None else None,
+                "hedged": self.hedged,
+                "hedge_wins": self.hedge_wins,
+                "skipped": self.skipped,
+            }
+
+
+_HEDGED: Dict[str, HedgedProvider] = {}
+
+
+def hedge_stats() -> List[Dict[str, Any]]:
+    return [{"model": label, **provider.stats()} for label, provider in _HEDGED.items()]
+
+
+def _retry_after_seconds(headers: Any) -> Optional[float]:
+    if not headers:
+        return None
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000.0
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def as_rate_limit_error(exc: BaseException) -> Optional[RateLimitError]:
+    if isinstance(exc, RateLimitError):
+        return exc
+    response = getattr(exc, "response", None)
+    status = getattr(exc, "status_code", None) or getattr(response, "status_code", None)
+    if status != 429 and type(exc).__name__ != "RateLimitError":
+        return None
+    return RateLimitError(str(exc), _retry_after_seconds(getattr(response, "headers", None)))
+
+
+_RATE_LIMITERS: Dict[str, ProviderRateLimiter] = {}
+_RATE_LIMITERS_LOCK = threading.Lock()
+
+
+def get_rate_limiter(provider: str, max_concurrency: Optional[int] = None) -> ProviderRateLimiter:
+    key = normalize_provider(provider)
+    with _RATE_LIMITERS_LOCK:
+        limiter = _RATE_LIMITERS.get(key)
+        if limiter is None:
+            prefix = f"LLM_{key.upper()}"
+            if max_concurrency is None:
+                max_concurrency = int_env(f"{prefix}_CONCURRENCY", int_env("LLM_CONCURRENCY", 4))
+            limiter = ProviderRateLimiter(
+                key,
+                rpm=float_env(f"{prefix}_RPM", 0.0),
+                tpm=float_env(f"{prefix}_TPM", 0.0),
+                max_concurrency=max_concurrency,
+                min_concurrency=int_env(f"{prefix}_MIN_CONCURRENCY", 1),
+            )
+            _RATE_LIMITERS[key] = limiter
+        return limiter
+
+
+def rate_limiter_stats() -> List[Dict[str, Any]]:
+    with _RATE_LIMITERS_LOCK:
+        return [limiter.stats() for limiter in _RATE_LIMITERS.values()]
+
+
+_DEFAULT_BASE_URLS = {
+    "openai": "https://api.openai.com/v1",
+    "anthropic": "https://api.anthropic.com",
+}
+
+
+class SharedHttpClient:
+    def __init__(self, base_url: str, pool_size: int):
+        import httpx
+
+        http2 = env_flag("LLM_HTTP2")
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                print("[llm] http2 unavailable, install httpx[http2]", f"base_url={base_url}", flush=True)
+                http2 = False
+        self.base_url = base_url
+        self.pool_size = max(1, pool_size)
+        self.http2 = http2
+        self.requests = 0
+        self.responses = 0
+        self.errors = 0
+        self.versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.client = httpx.Client(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=self.pool_size,
+                max_keepalive_connections=self.pool_size,
+                keepalive_expiry=float_env("LLM_HTTP_KEEPALIVE_SECONDS", 30.0),
+            ),
+            timeout=httpx.Timeout(
+                float_env("LLM_HTTP_READ_TIMEOUT", 600.0),
+                connect=float_env("LLM_HTTP_CONNECT_TIMEOUT", 5.0),
+            ),
+            event_hooks={"request": [self._on_request], "response": [self._on_response]},
+        )
+
+    def _on_request(self, request) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def _on_response(self, response) -> None:
+        with self._lock:
+            self.responses += 1
+            self.versions[response.http_version] = self.versions.get(response.http_version, 0) + 1
+            if response.status_code >= 500:
+                self.errors += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "base_url": self.base_url,
+                "pool_size": self.pool_size,
+                "http2": self.http2,
+                "requests": self.requests,
+                "responses": self.responses,
+                "server_errors": self.errors,
+                **{f"responses_{version}": count for version, count in sorted(self.versions.items())},
+            }
+
+    def close(self) -> None:
+        self.client.close()
+
+
+_HTTP_CLIENTS: Dict[Tuple[str, int], SharedHttpClient] = {}
+_HTTP_CLIENTS_LOCK = threading.Lock()
+
+
+def shared_http_client(provider: str, base_url: Optional[str] = None, pool_size: int = 0):
+    url = (base_url or _DEFAULT_BASE_URLS.get(provider, provider)).rstrip("/")
+    size = max(1, int_env("LLM_HTTP_POOL_SIZE", 0) or pool_size or int_env("LLM_CONCURRENCY", 4))
+    # Keyed on the pool size too, so a caller never inherits a smaller pool sized by an earlier one.
+    key = (url, size)
+    with _HTTP_CLIENTS_LOCK:
+        shared = _HTTP_CLIENTS.get(key)
+        if shared is None:
+            shared = SharedHttpClient(url, size)
+            _HTTP_CLIENTS[key] = shared
+        return shared.client
+
+
+def http_client_stats() -> List[Dict[str, Any]]:
+    with _HTTP_CLIENTS_LOCK:
+        return [shared.stats() for shared in _HTTP_CLIENTS.values()]
+
+
+def close_http_clients() -> None:
+    with _HTTP_CLIENTS_LOCK:
+        for shared in _HTTP_CLIENTS.values():
+            shared.close()
+        _HTTP_CLIENTS.clear()
 
 
 _PROVIDER_ALIASES = {
@@ -263,6 +663,7 @@ _PROVIDER_CLASSES = {
 }
 
 _SCORE_RE = re.compile(r"-?\d+(?:\.\d+)?")
+_TASK_ID_RE = re.compile(r"^Task ID: (\d+)$", re.MULTILINE)
 
 
 def normalize_provider(name: str) -> str:
@@ -307,14 +708,33 @@ def is_provider_enabled(provider: str, enabled: Iterable[str]) -> bool:
     return not enabled_set or provider in enabled_set
 
 
-def get_provider(spec: ProviderSpec, use_mock: bool) -> ScoreProvider:
+def get_provider(
+    spec: ProviderSpec,
+    use_mock: bool,
+    max_concurrency: Optional[int] = None,
+) -> ScoreProvider:
     if use_mock:
-        return MockProvider(model=spec.label)
-    provider = spec.provider
-    provider_class = _PROVIDER_CLASSES.get(provider)
-    if not provider_class:
-        raise ProviderError(f"Unknown provider: {provider}")
-    return provider_class(model=spec.model)
+        inner: ScoreProvider = MockProvider(model=spec.label)
+    else:
+        provider_class = _PROVIDER_CLASSES.get(spec.provider)
+        if not provider_class:
+            raise ProviderError(f"Unknown provider: {spec.provider}")
+        inner = provider_class(model=spec.model, pool_size=max_concurrency or 0)
+    limiter = get_rate_limiter(spec.provider, max_concurrency)
+    if not env_flag(f"LLM_{spec.provider.upper()}_HEDGE"):
+        return RateLimitedProvider(inner=inner, limiter=limiter)
+    # Hedging sits outside the limiter so a backup still respects it, but only the provider call is timed.
+    provider = HedgedProvider(
+        inner=inner,
+        limiter=limiter,
+        latency=LatencyTracker(
+            percentile=float_env("LLM_HEDGE_PERCENTILE", 95.0),
+            min_samples=int_env("LLM_HEDGE_MIN_SAMPLES", 20),
+        ),
+        max_concurrency=max_concurrency or int_env("LLM_CONCURRENCY", 4),
+    )
+    _HEDGED[spec.label] = provider
+    return provider
 
 
 def env_flag(name: str, default: str = "0") -> bool:
@@ -342,6 +762,98 @@ def _parse_score(text: Optional[str]) -> float:
     return score
 
 
+def openai_payload(model: str, prompt: str, schema: Optional[StructuredOutputSchema]) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {
+        "model": model,
+        "input": prompt,
+        "max_output_tokens": _max_output_tokens(schema),
+    }
+    text_payload: Dict[str, Any] = {}
+    if schema:
+        text_payload["format"] = _openai_text_format(schema)
+    temperature = float_env_optional("LLM_TEMPERATURE")
+    if temperature is not None:
+        payload["temperature"] = temperature
+    reasoning_effort = _openai_reasoning_effort(model)
+    if reasoning_effort:
+        payload["reasoning"] = {"effort": reasoning_effort}
+    verbosity = _openai_text_verbosity(model)
+    if verbosity:
+        text_payload["verbosity"] = verbosity
+    if text_payload:
+        payload["text"] = text_payload
+    return payload
+
+
+def openai_scores(response, schema: Optional[StructuredOutputSchema]) -> Dict[str, float]:
+    text = _extract_openai_text(response)
+    if schema:
+        data = _parse_json_text(text)
+        return _normalize_scores(data, schema)
+    return {"ai_substitution_risk": _parse_score(text)}
+
+
+def anthropic_payload(model: str, content: str, schema: Optional[StructuredOutputSchema]) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {
+        "model": model,
+        "max_tokens": _max_output_tokens(schema),
+        "temperature": float_env("LLM_TEMPERATURE", 0.0),
+        "messages": [{"role": "user", "content": content}],
+    }
+    if schema:
+        payload["system"] = (
+            "You must call the tool and include every required field. "
+            "If a field is unknown, set it to 0 and set confidence to 0."
+        )
+        payload["tools"] = [
+            {
+                "name": schema.name,
+                "description": "Return task risk scores as structured JSON.",
+                "input_schema": schema.schema,
+            }
+        ]
+        payload["tool_choice"] = {"type": "tool", "name": schema.name}
+    return payload
+
+
+def anthropic_scores(message, schema: Optional[StructuredOutputSchema]) -> Dict[str, float]:
+    if schema:
+        data = _fill_missing_scores(_anthropic_data(message, schema), schema)
+        return _normalize_scores(data, schema)
+    return {"ai_substitution_risk": _parse_score(_extract_anthropic_text(message))}
+
+
+def _anthropic_data(message, schema: StructuredOutputSchema) -> Dict[str, Any]:
+    tool_input = _extract_anthropic_tool_input(message, schema.name)
+    if tool_input is None:
+        return _parse_json_text(_extract_anthropic_text(message))
+    return tool_input
+
+
+def multi_task_schema(schema: StructuredOutputSchema, count: int) -> StructuredOutputSchema:
+    properties = schema.schema.get("properties", {})
+    required = schema.schema.get("required") or list(properties.keys())
+    item = {
+        **schema.schema,
+        "required": ["task_id", *required],
+        "properties": {"task_id": {"type": "integer"}, **properties},
+    }
+    return StructuredOutputSchema(
+        name=f"{schema.name}_multi",
+        schema={
+            "type": "object",
+            "additionalProperties": False,
+            "required": ["results"],
+            "properties": {"results": {"type": "array", "items": item}},
+        },
+        max_output_tokens=_max_output_tokens(schema) * max(1, count),
+    )
+
+
+def format_multi_task_input(items: Iterable[Tuple[int, str]]) -> str:
+    return "\n\n---\n\n".join(f"Task ID: {task_id}\n{task_input}" for task_id, task_input in items)
+
+
 def _openai_text_format(schema: StructuredOutputSchema) -> Dict[str, Any]:
     return {
         "type": "json_schema",
@@ -373,19 +885,25 @@ def _parse_json_text(text: Optional[str]) -> Dict[str, Any]:
     raise ProviderError(f"Could not parse JSON from: {value[:200]}")
 
 
-def _normalize_scores(data: Dict[str, Any], schema: StructuredOutputSchema) -> Dict[str, float]:
+def _normalize_scores(data: Dict[str, Any], schema: StructuredOutputSchema) -> Dict[str, Any]:
     properties = schema.schema.get("properties", {})
     required = schema.schema.get("required") or list(properties.keys())
-    scores: Dict[str, float] = {}
+    scores: Dict[str, Any] = {}
     for key in required:
         if key not in data:
             raise ProviderError(f"Missing field: {key}")
         value = data.get(key)
+        rules = properties.get(key, {})
+        if rules.get("type") == "array":
+            scores[key] = _normalize_items(key, value, rules)
+            continue
         try:
             number = float(value)
         except (TypeError, ValueError) as exc:
             raise ProviderError(f"Invalid value for {key}: {value}") from exc
-        rules = properties.get(key, {})
+        if rules.get("type") == "integer":
+            scores[key] = int(number)
+            continue
         minimum = rules.get("minimum")
         maximum = rules.get("maximum")
         if minimum is not None:
@@ -396,6 +914,22 @@ def _normalize_scores(data: Dict[str, Any], schema: StructuredOutputSchema) -> D
     return scores
 
 
+def _normalize_items(key: str, value: Any, rules: Dict[str, Any]) -> List[Dict[str, Any]]:
+    if not isinstance(value, list):
+        raise ProviderError(f"Invalid value for {key}: {value}")
+    item_schema = StructuredOutputSchema(name=key, schema=rules.get("items") or {})
+    items = []
+    for entry in value:
+        if not isinstance(entry, dict):
+            continue
+        # Malformed entries are dropped; callers treat them like any other missing item.
+        try:
+            items.append(_normalize_scores(entry, item_schema))
+        except ProviderError:
+            continue
+    return items
+
+
 def _missing_required_fields(data: Dict[str, Any], schema: StructuredOutputSchema) -> List[str]:
     properties = schema.schema.get("properties", {})
     required = schema.schema.get("required") or list(properties.keys())
@@ -433,43 +967,13 @@ def _mock_scores(seed: str, schema: Optional[StructuredOutputSchema]) -> Dict[st
     return scores
 
 
-def _int_env(name: str, default: int) -> int:
-    value = os.getenv(name, "")
-    if not value:
-        return default
-    try:
-        return int(value)
-    except ValueError:
-        return default
-
-
 def _max_output_tokens(schema: Optional[StructuredOutputSchema]) -> int:
-    base = _int_env("LLM_MAX_OUTPUT_TOKENS", 16)
+    base = int_env("LLM_MAX_OUTPUT_TOKENS", 16)
     if schema:
-        return max(base, 128)
+        return max(base, schema.max_output_tokens or 128)
     return base
 
 
-def _float_env(name: str, default: float) -> float:
-    value = os.getenv(name, "")
-    if not value:
-        return default
-    try:
-        return float(value)
-    except ValueError:
-        return default
-
-
-def _float_env_optional(name: str) -> Optional[float]:
-    value = os.getenv(name, "").strip()
-    if not value:
-        return None
-    try:
-        return float(value)
-    except ValueError:
-        return None
-
-
 def _openai_reasoning_effort(model: str) -> Optional[str]:
     value = os.getenv("LLM_OPENAI_REASONING_EFFORT") or os.getenv("LLM_REASONING_EFFORT")
     if value:
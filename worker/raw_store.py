@@ -0,0 +1,214 @@
+import argparse
+import gzip
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from api.db import get_conn
+from api.env import int_env
+
+SEGMENT_SUFFIX = ".jsonl.gz"
+LEGACY_FILE_RE = re.compile(r"^run_(\d+)_week_(.+?)_task_\d+_.+\.json$")
+_REF_RE = re.compile(r"^(?P<path>.+\.jsonl\.gz)#(?P<offset>\d+):(?P<length>\d+)$")
+
+
+class RawSegmentWriter:
+    def __init__(self, root: Path, run_id: int, max_bytes: int):
+        self.root = root
+        self.run_id = run_id
+        self.max_bytes = max_bytes
+        # A new process never appends to an older segment, which may end in a torn record.
+        existing = root.glob(f"run_{run_id}_*{SEGMENT_SUFFIX}")
+        self.seq = max((_segment_seq(path) for path in existing), default=0)
+        self.path: Optional[Path] = None
+        self.handle = None
+        self.index = None
+
+    def _rotate(self) -> None:
+        self.close()
+        self.seq += 1
+        self.path = self.root / f"run_{self.run_id}_{self.seq:04d}{SEGMENT_SUFFIX}"
+        self.handle = open(self.path, "ab")
+        self.index = open(self.path.with_name(self.path.name + ".idx"), "a")
+
+    def append(self, key: str, payload: Dict[str, Any]) -> str:
+        if self.handle is None or self.handle.tell() >= self.max_bytes:
+            self._rotate()
+        data = gzip.compress(json.dumps(payload, ensure_ascii=True).encode("utf-8") + b"\n", mtime=0)
+        offset = self.handle.tell()
+        self.handle.write(data)
+        self.handle.flush()
+        self.index.write(json.dumps({"key": key, "offset": offset, "length": len(data)}) + "\n")
+        self.index.flush()
+        return f"{self.path}#{offset}:{len(data)}"
+
+    def close(self) -> None:
+        if self.handle is not None:
+            self.handle.close()
+            self.index.close()
+            self.handle = None
+            self.index = None
+
+
+class RawStore:
+    def __init__(self, root: Path, max_bytes: Optional[int] = None):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes or int_env("LLM_RAW_SEGMENT_BYTES", 64 * 1024 * 1024)
+        self._writers: Dict[int, RawSegmentWriter] = {}
+
+    def append(self, run_id: int, key: str, payload: Dict[str, Any]) -> str:
+        writer = self._writers.get(run_id)
+        if writer is None:
+            writer = RawSegmentWriter(self.root, run_id, self.max_bytes)
+            self._writers[run_id] = writer
+        return writer.append(key, payload)
+
+    def close(self) -> None:
+        for writer in self._writers.values():
+            writer.close()
+        self._writers.clear()
+
+    def __enter__(self) -> "RawStore":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+def _segment_seq(path: Path) -> int:
+    try:
+        return int(path.name[: -len(SEGMENT_SUFFIX)].rsplit("_", 1)[1])
+    except (IndexError, ValueError):
+        return 0
+
+
+def parse_raw_ref(ref: str) -> Optional[Tuple[str, int, int]]:
+    match = _REF_RE.match(ref or "")
+    if not match:
+        return None
+    return match.group("path"), int(match.group("offset")), int(match.group("length"))
+
+
+def read_raw(ref: str) -> Dict[str, Any]:
+    parsed = parse_raw_ref(ref)
+    if parsed is None:
+        return json.loads(Path(ref).read_text())
+    path, offset, length = parsed
+    with open(path, "rb") as handle:
+        handle.seek(offset)
+        data = handle.read(length)
+    if len(data) != length:
+        raise ValueError(f"truncated raw record: {ref}")
+    return json.loads(gzip.decompress(data))
+
+
+def iter_segment(path: Path) -> Iterator[Dict[str, Any]]:
+    with gzip.open(path, "rt") as handle:
+        for line in handle:
+            if line.strip():
+                yield json.loads(line)
+
+
+def migrate_legacy_files(
+    conn,
+    root: Path,
+    delete: bool = False,
+    chunk_size: int = 1000,
+    verbose: bool = False,
+) -> int:
+    legacy: Dict[int, List[Tuple[Path, str]]] = {}
+    for path in sorted(root.glob("run_*_week_*_task_*.json")):
+        match = LEGACY_FILE_RE.match(path.name)
+        if match:
+            legacy.setdefault(int(match.group(1)), []).append((path, match.group(2)))
+
+    migrated = 0
+    skipped = 0
+    with RawStore(root) as store:
+        for run_id, files in sorted(legacy.items()):
+            for start in range(0, len(files), max(1, chunk_size)):
+                chunk = files[start : start + chunk_size]
+                # Refs were stored as given on the command line; cover both relative and absolute forms.
+                old_refs = {path: (str(path), str(path.resolve())) for path, _week in chunk}
+                with conn.cursor() as cur:
+                    cur.execute(
+                        "SELECT DISTINCT raw_json_ref FROM task_ai_score WHERE raw_json_ref = ANY(%s)",
+                        ([ref for refs in old_refs.values() for ref in refs],),
+                    )
+                    referenced = {row[0] for row in cur.fetchall()}
+                # Files no row points at were migrated by an earlier run (or never stored); appending them again
+                # would duplicate their records in the segments.
+                pending = [(path, week) for path, week in chunk if referenced.intersection(old_refs[path])]
+                skipped += len(chunk) - len(pending)
+                if not pending:
+                    continue
+                moves = set()
+                for path, week in pending:
+                    payload = json.loads(path.read_text())
+                    key = f"{week}:{payload.get('task_id')}:{payload.get('model_label')}"
+                    new_ref = store.append(run_id, key, payload)
+                    moves.update((ref, new_ref) for ref in old_refs[path])
+                with conn.cursor() as cur:
+                    cur.execute(
+                        """
+                        CREATE TEMP TABLE IF NOT EXISTS raw_ref_move (old_ref TEXT, new_ref TEXT)
+                        ON COMMIT DELETE ROWS
+                        """
+                    )
+                    with cur.copy("COPY raw_ref_move (old_ref, new_ref) FROM STDIN") as copy:
+                        for move in moves:
+                            copy.write_row(move)
+                    cur.execute(
+                        """
+                        UPDATE task_ai_score s
+                        SET raw_json_ref = m.new_ref
+                        FROM raw_ref_move m
+                        WHERE s.raw_json_ref = m.old_ref
+                        """
+                    )
+                conn.commit()
+                if delete:
+                    for path, _week in pending:
+                        path.unlink()
+                migrated += len(pending)
+                if verbose:
+                    print(
+                        "[raw] migrate",
+                        f"run_id={run_id}",
+                        f"files={len(pending)}",
+                        f"total={migrated}",
+                        f"skipped={skipped}",
+                        flush=True,
+                    )
+    return migrated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Raw LLM output segment store.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    show = sub.add_parser("show", help="Print the record behind a raw_json_ref")
+    show.add_argument("ref")
+    migrate = sub.add_parser("migrate", help="Pack legacy per-task JSON files into segments")
+    migrate.add_argument("--output-dir", default="worker/output")
+    migrate.add_argument(
+        "--delete",
+        action="store_true",
+        help="Remove legacy files once their rows point at segments",
+    )
+    migrate.add_argument("--chunk-size", type=int, default=1000)
+    migrate.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    if args.command == "show":
+        print(json.dumps(read_raw(args.ref), ensure_ascii=True, indent=2))
+        return
+
+    with get_conn() as conn:
+        count = migrate_legacy_files(conn, Path(args.output_dir), args.delete, args.chunk_size, args.verbose)
+    print(f"[raw] migrated files={count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,134 @@
 import random
+import threading
 import time
-from typing import Callable, Iterable, Type, TypeVar
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Type, TypeVar
+
+from api.env import float_env, int_env
+from worker.llm_providers import RateLimitError, normalize_provider
 
 T = TypeVar("T")
 
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"circuit open for {name}, next probe in {retry_after:.1f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = 0.5,
+        window: int = 20,
+        min_calls: int = 10,
+        open_seconds: float = 60.0,
+        probes: int = 1,
+    ):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = max(1, min_calls)
+        self.open_seconds = open_seconds
+        self.probes = max(1, probes)
+        self.state = BREAKER_CLOSED
+        self.opened = 0
+        self.rejected = 0
+        self._outcomes: Deque[bool] = deque(maxlen=max(self.min_calls, window))
+        self._opened_at = 0.0
+        self._probing = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> None:
+        if self.failure_rate <= 0:
+            return
+        with self._lock:
+            if self.state == BREAKER_OPEN:
+                remaining = self._opened_at + self.open_seconds - time.monotonic()
+                if remaining > 0:
+                    self.rejected += 1
+                    raise CircuitOpenError(self.name, remaining)
+                self.state = BREAKER_HALF_OPEN
+                self._probing = 0
+            if self.state == BREAKER_HALF_OPEN:
+                if self._probing >= self.probes:
+                    self.rejected += 1
+                    raise CircuitOpenError(self.name, 0.0)
+                self._probing += 1
+
+    def record(self, success: bool) -> None:
+        if self.failure_rate <= 0:
+            return
+        with self._lock:
+            if self.state == BREAKER_HALF_OPEN:
+                self._probing = max(0, self._probing - 1)
+                if success:
+                    self.state = BREAKER_CLOSED
+                    self._outcomes.clear()
+                else:
+                    self._trip()
+                return
+            if self.state == BREAKER_OPEN:
+                return
+            self._outcomes.append(success)
+            failures = self._outcomes.count(False)
+            if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_rate:
+                self._trip()
+
+    def release(self) -> None:
+        with self._lock:
+            if self.state == BREAKER_HALF_OPEN:
+                self._probing = max(0, self._probing - 1)
+
+    def _trip(self) -> None:
+        self.state = BREAKER_OPEN
+        self.opened += 1
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "provider": self.name,
+                "state": self.state,
+                "opened": self.opened,
+                "rejected": self.rejected,
+                "window_calls": len(self._outcomes),
+                "window_failures": self._outcomes.count(False),
+            }
+
+
+_BREAKERS: Dict[str, CircuitBreaker] = {}
+_BREAKERS_LOCK = threading.Lock()
+
+
+def get_circuit_breaker(provider: str) -> CircuitBreaker:
+    key = normalize_provider(provider)
+    with _BREAKERS_LOCK:
+        breaker = _BREAKERS.get(key)
+        if breaker is None:
+            prefix = f"LLM_{key.upper()}_BREAKER"
+            breaker = CircuitBreaker(
+                key,
+                failure_rate=float_env(f"{prefix}_FAILURE_RATE", float_env("LLM_BREAKER_FAILURE_RATE", 0.5)),
+                window=int_env("LLM_BREAKER_WINDOW", 20),
+                min_calls=int_env("LLM_BREAKER_MIN_CALLS", 10),
+                open_seconds=float_env("LLM_BREAKER_OPEN_SECONDS", 60.0),
+                probes=int_env("LLM_BREAKER_PROBES", 1),
+            )
+            _BREAKERS[key] = breaker
+        return breaker
+
+
+def circuit_breaker_stats() -> List[Dict[str, Any]]:
+    with _BREAKERS_LOCK:
+        return [breaker.stats() for breaker in _BREAKERS.values()]
+
 
 def retry_call(
     fn: Callable[[], T],
@@ -12,16 +137,38 @@ def retry_call(
     max_delay: float = 10.0,
     jitter: float = 0.2,
     retry_exceptions: Iterable[Type[BaseException]] = (Exception,),
+    breaker: Optional[CircuitBreaker] = None,
 ) -> T:
+    # The breaker sees one outcome per logical call, after retries: a call that recovers on retry is
+    # healthy, and a half-open probe slot is held for the whole call.
+    if breaker is not None:
+        breaker.allow()
     attempt = 0
-    while True:
-        try:
-            return fn()
-        except retry_exceptions as exc:
-            attempt += 1
-            if attempt > retries:
-                raise exc
-            delay = min(max_delay, base_delay * (2 ** (attempt - 1)))
-            jitter_amount = delay * jitter
-            sleep_for = delay + random.uniform(-jitter_amount, jitter_amount)
-            time.sleep(max(0.0, sleep_for))
+    try:
+        while True:
+            try:
+                result = fn()
+            except retry_exceptions as exc:
+                attempt += 1
+                if attempt > retries:
+                    raise
+                delay = min(max_delay, base_delay * (2 ** (attempt - 1)))
+                jitter_amount = delay * jitter
+                sleep_for = delay + random.uniform(-jitter_amount, jitter_amount)
+                retry_after = getattr(exc, "retry_after", None)
+                if retry_after:
+                    sleep_for = max(sleep_for, retry_after)
+                time.sleep(max(0.0, sleep_for))
+            else:
+                if breaker is not None:
+                    breaker.record(True)
+                return result
+    except RateLimitError:
+        # Throttling is paced by the rate limiter; it says nothing about provider health.
+        if breaker is not None:
+            breaker.release()
+        raise
+    except Exception:
+        if breaker is not None:
+            breaker.record(False)
+        raise
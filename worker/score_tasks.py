@@ -2,24 +2,47 @@ import argparse
 import hashlib
 import json
 import os
+import socket
+import time
+from dataclasses import dataclass, field, replace
+from functools import partial
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from api.db import get_conn
+from worker.dedupe import load_representatives
+from worker.ensemble import refresh_week_ensemble, upsert_task_ensemble
+from worker.llm_batch import (
+    BATCH_COMPLETED,
+    BATCH_FAILED,
+    BATCH_IN_PROGRESS,
+    BatchClient,
+    BatchRequest,
+    get_batch_client,
+)
 from worker.llm_providers import (
     ProviderError,
+    ProviderSpec,
+    RateLimitError,
+    ScoreProvider,
     StructuredOutputSchema,
     env_flag,
+    format_multi_task_input,
     get_enabled_providers,
     get_provider,
+    hedge_stats,
+    http_client_stats,
     is_provider_enabled,
+    multi_task_schema,
     parse_model_spec,
+    rate_limiter_stats,
 )
-from worker.retry import retry_call
+from worker.raw_store import RawStore
+from worker.retry import CircuitBreaker, CircuitOpenError, circuit_breaker_stats, get_circuit_breaker, retry_call
+from worker.score_writer import ScoreWriter
+from worker.scoring_engine import ScoringEngine, provider_concurrency
 
-PROMPT_TEMPLATE = (
-    "You are scoring AI impact for a single task. "
-    "Return a JSON object that matches the provided schema exactly.\n"
+SCORING_RULES = (
     "Scoring rules:\n"
     "- ai_substitution_risk: 0-100, higher = easier to replace by AI.\n"
     "- ai_augmentation_potential: 0-100, higher = AI can strongly assist.\n"
@@ -27,7 +50,21 @@ PROMPT_TEMPLATE = (
     "- physical_world_dependency: 0-100, higher = requires physical presence.\n"
     "- confidence: 0-1, higher = more confident.\n"
     "Use the AI Tech Progress context when present; if it says \"None\", treat as unknown.\n\n"
-    "Task and context:\n{task_statement}"
+)
+
+PROMPT_TEMPLATE = (
+    "You are scoring AI impact for a single task. "
+    "Return a JSON object that matches the provided schema exactly.\n"
+    + SCORING_RULES
+    + "Task and context:\n{task_statement}"
+)
+
+MULTI_PROMPT_TEMPLATE = (
+    "You are scoring AI impact for several tasks independently. "
+    "Return a JSON object that matches the provided schema exactly, "
+    "with one entry in results for every task below and its task_id copied from the Task ID line.\n"
+    + SCORING_RULES
+    + "Tasks and context:\n{task_statement}"
 )
 
 SCORE_SCHEMA = StructuredOutputSchema(
@@ -57,6 +94,13 @@ def hash_text(value: str) -> str:
     return hashlib.sha256(value.encode("utf-8")).hexdigest()
 
 
+def prompt_hash_for(args, tasks_per_call: int = 1) -> str:
+    # Scores from a packed call came from a different prompt and keep their own identity.
+    if tasks_per_call > 1:
+        return hash_text(f"{MULTI_PROMPT_TEMPLATE}|{tasks_per_call}|{args.prompt_version}|{args.model_version}")
+    return hash_text(f"{PROMPT_TEMPLATE}|{args.prompt_version}|{args.model_version}")
+
+
 def resolve_active_scope(
     conn, data_version: str, requested_week: Optional[str]
 ) -> Tuple[Optional[str], Optional[str]]:
@@ -240,6 +284,1091 @@ def build_task_input(task_statement: str, week: str, context: str) -> str:
     return "\n".join(lines).strip()
 
 
+def fetch_cached_inputs(
+    conn,
+    data_version: str,
+    week: str,
+    model: str,
+    prompt_hashes: List[str],
+    task_inputs: List["TaskInput"],
+) -> Set[Tuple[int, str]]:
+    if not task_inputs:
+        return set()
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT task_id, input_hash
+            FROM task_ai_score
+            WHERE data_version = %s
+              AND week = %s
+              AND model = %s
+              AND prompt_hash = ANY(%s)
+              AND task_id = ANY(%s)
+              AND input_hash = ANY(%s)
+            """,
+            (
+                data_version,
+                week,
+                model,
+                prompt_hashes,
+                [item.task_id for item in task_inputs],
+                list({item.input_hash for item in task_inputs}),
+            ),
+        )
+        return {(int(task_id), input_hash) for task_id, input_hash in cur.fetchall()}
+
+
+@dataclass
+class TaskInput:
+    task_id: int
+    task_statement: str
+    context: str
+    task_input: str
+    input_hash: str
+    work_id: Optional[int] = None
+    dispatch_reason: Optional[str] = None
+
+
+def fetch_open_batch_inputs(
+    conn,
+    data_version: str,
+    week: str,
+    model: str,
+    prompt_hash: str,
+) -> Set[Tuple[int, str]]:
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT i.task_id, i.input_hash
+            FROM model_run_batch_item i
+            JOIN model_run_batch b ON b.id = i.batch_id
+            JOIN model_run mr ON mr.id = b.run_id
+            WHERE b.status = %s
+              AND b.prompt_hash = %s
+              AND mr.data_version = %s
+              AND mr.week = %s
+              AND mr.model = %s
+            """,
+            (BATCH_IN_PROGRESS, prompt_hash, data_version, week, model),
+        )
+        return {(int(task_id), input_hash) for task_id, input_hash in cur.fetchall()}
+
+
+@dataclass
+class ModelRun:
+    spec: ProviderSpec
+    provider: Optional[ScoreProvider]
+    run_id: int
+    prompt_version: str = ""
+    model_version: str = ""
+    batch_client: Optional[BatchClient] = None
+    pending: List[TaskInput] = field(default_factory=list)
+    done: List[TaskInput] = field(default_factory=list)
+    outstanding: int = 0
+    cache_hits: int = 0
+    scored: int = 0
+    failed: int = 0
+    fallbacks: int = 0
+    followers: Dict[int, List[TaskInput]] = field(default_factory=dict)
+    propagated: int = 0
+    adaptive_skips: int = 0
+    error: Optional[BaseException] = None
+    item_errors: Dict[int, str] = field(default_factory=dict)
+    finished: bool = False
+
+
+def store_score(
+    writer: ScoreWriter,
+    run: ModelRun,
+    item: TaskInput,
+    scores: Dict[str, float],
+    raw_store: RawStore,
+    data_version: str,
+    week: str,
+    prompt_hash: str,
+    verbose: bool,
+) -> None:
+    spec = run.spec
+    model_label = spec.label
+    run.scored += 1
+    run.done.append(item)
+    substitution = scores.get("ai_substitution_risk")
+    if verbose:
+        print(
+            "[llm] score",
+            f"model={model_label}",
+            f"task_id={item.task_id}",
+            f"score={substitution}",
+            flush=True,
+        )
+    payload = {
+        "provider": spec.provider,
+        "model": spec.model,
+        "model_label": model_label,
+        "prompt_version": run.prompt_version,
+        "model_version": run.model_version,
+        "data_version": data_version,
+        "week": week,
+        "task_id": item.task_id,
+        "task_statement": item.task_statement,
+        "task_input": item.task_input,
+        "tech_progress_context": item.context,
+        "score": substitution,
+        "scores": scores,
+    }
+    raw_ref = raw_store.append(run.run_id, f"{week}:{item.task_id}:{model_label}", payload)
+
+    # Near-duplicate members reuse the representative's scores and raw output, keeping their own input hash.
+    for member, source_task_id in [(item, None)] + [(m, item.task_id) for m in run.followers.pop(item.task_id, [])]:
+        if source_task_id is not None:
+            run.scored += 1
+            run.propagated += 1
+            run.done.append(member)
+        writer.add(
+            (
+                data_version,
+                week,
+                member.task_id,
+                model_label,
+                substitution,
+                scores.get("ai_substitution_risk"),
+                scores.get("ai_augmentation_potential"),
+                scores.get("human_context_dependency"),
+                scores.get("physical_world_dependency"),
+                scores.get("confidence"),
+                run.run_id,
+                raw_ref,
+                prompt_hash,
+                member.input_hash,
+                source_task_id,
+                item.dispatch_reason,
+            )
+        )
+
+
+def propagate_cached_scores(
+    conn,
+    run: ModelRun,
+    data_version: str,
+    week: str,
+    prompt_hashes: List[str],
+    pairs: List[Tuple[TaskInput, TaskInput]],
+) -> List[TaskInput]:
+    if not pairs:
+        return []
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            INSERT INTO task_ai_score (
+                data_version, week, task_id, model, score, ai_substitution_risk, ai_augmentation_potential,
+                human_context_dependency, physical_world_dependency, confidence, run_id, raw_json_ref,
+                prompt_hash, input_hash, source_task_id, dispatch_reason
+            )
+            SELECT s.data_version, s.week, m.task_id, s.model, s.score, s.ai_substitution_risk,
+                   s.ai_augmentation_potential, s.human_context_dependency, s.physical_world_dependency,
+                   s.confidence, %(run_id)s, s.raw_json_ref, s.prompt_hash, m.input_hash, s.task_id,
+                   s.dispatch_reason
+            FROM unnest(%(task_ids)s::bigint[], %(input_hashes)s::text[], %(rep_ids)s::bigint[], %(rep_hashes)s::text[])
+                 AS m(task_id, input_hash, rep_task_id, rep_input_hash)
+            JOIN task_ai_score s
+              ON s.data_version = %(data_version)s
+             AND s.week = %(week)s
+             AND s.model = %(model)s
+             AND s.prompt_hash = ANY(%(prompt_hashes)s)
+             AND s.task_id = m.rep_task_id
+             AND s.input_hash = m.rep_input_hash
+            ON CONFLICT (data_version, week, task_id, model, prompt_hash, input_hash) DO NOTHING
+            RETURNING task_id
+            """,
+            {
+                "run_id": run.run_id,
+                "data_version": data_version,
+                "week": week,
+                "model": run.spec.label,
+                "prompt_hashes": prompt_hashes,
+                "task_ids": [member.task_id for member, _ in pairs],
+                "input_hashes": [member.input_hash for member, _ in pairs],
+                "rep_ids": [rep.task_id for _, rep in pairs],
+                "rep_hashes": [rep.input_hash for _, rep in pairs],
+            },
+        )
+        copied = {int(row[0]) for row in cur.fetchall()}
+    conn.commit()
+    return [member for member, _ in pairs if member.task_id in copied]
+
+
+def finish_model_run(conn, writer: ScoreWriter, run: ModelRun, verbose: bool) -> None:
+    run.finished = True
+    try:
+        writer.flush()
+    except Exception as exc:
+        if run.error is None:
+            run.error = exc
+    if run.error is not None:
+        conn.rollback()
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                UPDATE model_run
+                SET status = %s,
+                    error_message = %s,
+                    error_at = NOW(),
+                    tasks_attempted = %s,
+                    tasks_succeeded = %s,
+                    tasks_failed = %s,
+                    tasks_cached = %s,
+                    heartbeat_at = NOW()
+                WHERE id = %s
+                """,
+                (
+                    "deferred" if isinstance(run.error, CircuitOpenError) else "failed",
+                    str(run.error),
+                    run.scored + run.failed,
+                    run.scored,
+                    run.failed,
+                    run.cache_hits,
+                    run.run_id,
+                ),
+            )
+        conn.commit()
+        return
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            UPDATE model_run
+            SET status = %s,
+                tasks_attempted = %s,
+                tasks_succeeded = %s,
+                tasks_failed = %s,
+                tasks_cached = %s,
+                heartbeat_at = NOW()
+            WHERE id = %s
+            """,
+            ("completed", run.scored + run.failed, run.scored, run.failed, run.cache_hits, run.run_id),
+        )
+    conn.commit()
+    if verbose:
+        print(
+            "[llm] done",
+            f"model={run.spec.label}",
+            f"scored={run.scored}",
+            f"cache_hits={run.cache_hits}",
+            f"fallbacks={run.fallbacks}",
+            f"propagated={run.propagated}",
+            f"adaptive_skips={run.adaptive_skips}",
+            flush=True,
+        )
+
+
+def checkpoint_runs(conn, runs: List[ModelRun], lease: Optional[Tuple[str, float]] = None) -> None:
+    active = [run for run in runs if not run.finished]
+    if not active:
+        return
+    with conn.cursor() as cur:
+        if lease is not None:
+            renew_leases(cur, *lease)
+        cur.executemany(
+            """
+            UPDATE model_run
+            SET tasks_attempted = %s,
+                tasks_succeeded = %s,
+                tasks_failed = %s,
+                tasks_cached = %s,
+                heartbeat_at = NOW()
+            WHERE id = %s
+            """,
+            [(run.scored + run.failed, run.scored, run.failed, run.cache_hits, run.run_id) for run in active],
+        )
+    conn.commit()
+
+
+def mark_stale_runs(conn, stale_seconds: float) -> List[Tuple[int, str, str]]:
+    if stale_seconds <= 0:
+        return []
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            UPDATE model_run
+            SET status = 'abandoned',
+                error_message = 'no heartbeat since ' || COALESCE(heartbeat_at, created_at)::text,
+                error_at = NOW()
+            WHERE status = 'running'
+              AND COALESCE(heartbeat_at, created_at) < NOW() - make_interval(secs => %s)
+            RETURNING id, data_version, week
+            """,
+            (stale_seconds,),
+        )
+        runs = [(row[0], row[1], row[2]) for row in cur.fetchall()]
+    conn.commit()
+    return runs
+
+
+def refresh_stale_weeks(conn, weeks: Set[Tuple[str, str]], verbose: bool = False) -> None:
+    # A worker that died between flushing scores and its ensemble upsert leaves those tasks stale.
+    for data_version, week in sorted(weeks):
+        count = refresh_week_ensemble(conn, data_version, week, stale_only=True)
+        if count or verbose:
+            print("[llm] ensemble stale", f"data_version={data_version}", f"week={week}", f"tasks={count}", flush=True)
+
+
+def load_resume_run(conn, run_id: int, stale_seconds: float) -> Optional[Dict[str, Any]]:
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT id, data_version, week, model, prompt_version, model_version, status, params_json,
+                   tasks_succeeded, tasks_failed,
+                   COALESCE(heartbeat_at, created_at) >= NOW() - make_interval(secs => %s) AS live
+            FROM model_run
+            WHERE id = %s
+            """,
+            (max(stale_seconds, 0), run_id),
+        )
+        row = cur.fetchone()
+    if not row:
+        print("[llm] resume: run not found", f"run_id={run_id}", flush=True)
+        return None
+    columns = [
+        "id",
+        "data_version",
+        "week",
+        "model",
+        "prompt_version",
+        "model_version",
+        "status",
+        "params_json",
+        "tasks_succeeded",
+        "tasks_failed",
+        "live",
+    ]
+    run = dict(zip(columns, row))
+    run["params_json"] = _ensure_json(run["params_json"]) or {}
+    if run["status"] in ("completed", "skipped", "batch_submitted"):
+        print("[llm] resume: nothing to do", f"run_id={run_id}", f"status={run['status']}", flush=True)
+        return None
+    if run["params_json"].get("mode") == "work":
+        print("[llm] resume: queue runs recover through lease expiry", f"run_id={run_id}", flush=True)
+        return None
+    if run["status"] == "running" and run["live"]:
+        print("[llm] resume: run is still live", f"run_id={run_id}", flush=True)
+        return None
+    return run
+
+
+def fetch_model_confidence(
+    conn,
+    data_version: str,
+    week: str,
+    model: str,
+    prompt_hashes: List[str],
+    task_inputs: List[TaskInput],
+) -> Dict[Tuple[int, str], Optional[float]]:
+    if not task_inputs:
+        return {}
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT task_id, input_hash, confidence
+            FROM task_ai_score
+            WHERE data_version = %s
+              AND week = %s
+              AND model = %s
+              AND prompt_hash = ANY(%s)
+              AND task_id = ANY(%s)
+              AND input_hash = ANY(%s)
+            """,
+            (
+                data_version,
+                week,
+                model,
+                prompt_hashes,
+                [item.task_id for item in task_inputs],
+                list({item.input_hash for item in task_inputs}),
+            ),
+        )
+        return {
+            (int(task_id), input_hash): float(confidence) if confidence is not None else None
+            for task_id, input_hash, confidence in cur.fetchall()
+        }
+
+
+def fetch_disagreement_history(conn, data_version: str, week: str, task_ids: List[int]) -> Dict[int, float]:
+    if not task_ids:
+        return {}
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT DISTINCT ON (task_id) task_id, std
+            FROM task_ai_ensemble
+            WHERE data_version = %s
+              AND week < %s
+              AND task_id = ANY(%s)
+              AND COALESCE(model_count, 2) > 1
+            ORDER BY task_id, week DESC
+            """,
+            (data_version, week, task_ids),
+        )
+        return {int(task_id): float(std or 0) for task_id, std in cur.fetchall()}
+
+
+def plan_secondary_dispatch(
+    conn,
+    primary_label: str,
+    task_inputs: List[TaskInput],
+    deltas: Dict[int, Any],
+    data_version: str,
+    week: str,
+    prompt_hashes: List[str],
+    args,
+) -> Dict[int, str]:
+    confidence = fetch_model_confidence(conn, data_version, week, primary_label, prompt_hashes, task_inputs)
+    history = fetch_disagreement_history(conn, data_version, week, [item.task_id for item in task_inputs])
+    plan: Dict[int, str] = {}
+    for item in task_inputs:
+        reasons = []
+        key = (item.task_id, item.input_hash)
+        if key not in confidence:
+            reasons.append("primary_missing")
+        elif confidence[key] is None or confidence[key] < args.adaptive_min_confidence:
+            reasons.append("low_confidence")
+        # Tasks without a multi-model week yet get one, so disagreement history exists next time.
+        if item.task_id not in history:
+            reasons.append("no_history")
+        elif history[item.task_id] >= args.adaptive_max_std:
+            reasons.append("disagreement")
+        delta = deltas.get(item.task_id)
+        if delta is not None and abs(float(delta)) >= args.adaptive_min_delta:
+            reasons.append("progress_delta")
+        if reasons:
+            plan[item.task_id] = ",".join(reasons)
+    return plan
+
+
+def score_call(
+    provider,
+    task_statement: str,
+    template: str,
+    schema: StructuredOutputSchema,
+    args,
+    breaker: Optional[CircuitBreaker] = None,
+):
+    return retry_call(
+        lambda: provider.score(
+            task_statement,
+            template,
+            args.prompt_version,
+            args.model_version,
+            schema=schema,
+        ),
+        retries=args.max_retries,
+        base_delay=args.retry_base_delay,
+        max_delay=args.retry_max_delay,
+        jitter=args.retry_jitter,
+        breaker=breaker,
+    )
+
+
+def score_group(
+    provider,
+    group: List[TaskInput],
+    args,
+    breaker: Optional[CircuitBreaker] = None,
+) -> Tuple[Dict[int, Dict[str, float]], Set[int]]:
+    results: Dict[int, Dict[str, float]] = {}
+    if len(group) > 1:
+        wanted = {item.task_id for item in group}
+        try:
+            data = score_call(
+                provider,
+                format_multi_task_input((item.task_id, item.task_input) for item in group),
+                MULTI_PROMPT_TEMPLATE,
+                multi_task_schema(SCORE_SCHEMA, len(group)),
+                args,
+                breaker,
+            )
+            for entry in data.get("results") or []:
+                task_id = entry.pop("task_id", None)
+                if task_id in wanted and task_id not in results:
+                    results[task_id] = entry
+        except (RateLimitError, CircuitOpenError):
+            # Splitting the group would only multiply calls against a throttled or tripped provider.
+            raise
+        except ProviderError:
+            # Unparseable or off-schema packed output.
+            pass
+    packed = set(results)
+    # Anything the packed call dropped or garbled is rescored on its own.
+    for item in group:
+        if item.task_id not in results:
+            results[item.task_id] = score_call(provider, item.task_input, PROMPT_TEMPLATE, SCORE_SCHEMA, args, breaker)
+    return results, packed
+
+
+def score_runs(
+    conn,
+    writer: ScoreWriter,
+    runs: List[ModelRun],
+    args,
+    raw_store: RawStore,
+    data_version: str,
+    week: str,
+    prompt_hash: str,
+    finish: bool = True,
+    lease: Optional[Tuple[str, float]] = None,
+) -> None:
+    # Task-major order keeps every provider busy; results are consumed in this order.
+    tasks_per_call = max(1, args.tasks_per_call)
+    packed_hash = prompt_hash_for(args, tasks_per_call)
+    groups = {
+        run.run_id: [
+            run.pending[start : start + tasks_per_call]
+            for start in range(0, len(run.pending), tasks_per_call)
+        ]
+        for run in runs
+    }
+    jobs = []
+    for index in range(max((len(run_groups) for run_groups in groups.values()), default=0)):
+        for run in runs:
+            run_groups = groups[run.run_id]
+            if index < len(run_groups):
+                group = run_groups[index]
+                breaker = get_circuit_breaker(run.spec.provider)
+                jobs.append((run.spec.provider, (run, group), partial(score_group, run.provider, group, args, breaker)))
+    with ScoringEngine(args.concurrency) as engine:
+        window = sum(engine.limit_for(provider) for provider in {run.spec.provider for run in runs}) * 2
+        for (run, group), future in engine.run_ordered(
+            jobs,
+            window=window,
+            skip=lambda job: job[0].error is not None,
+        ):
+            run.outstanding -= len(group)
+            if run.error is None:
+                flushes = writer.flushes
+                done_before = len(run.done)
+                results = None
+                try:
+                    results, packed = future.result()
+                    if len(group) > 1:
+                        run.fallbacks += len(group) - len(packed)
+                    for item in group:
+                        store_score(
+                            writer,
+                            run,
+                            item,
+                            results[item.task_id],
+                            raw_store,
+                            data_version,
+                            week,
+                            packed_hash if item.task_id in packed else prompt_hash,
+                            args.verbose,
+                        )
+                except Exception as exc:
+                    stored = {item.task_id for item in run.done[done_before:]}
+                    unscored = [item for item in group if item.task_id not in stored]
+                    if lease is not None and results is None and not isinstance(exc, CircuitOpenError):
+                        # A provider error fails only its own queue items; a failed score flush stops the model.
+                        for item in unscored:
+                            run.item_errors[item.work_id] = str(exc)
+                    else:
+                        run.error = exc
+                    # A tripped breaker defers the rest of the run instead of failing it task by task.
+                    if not isinstance(exc, CircuitOpenError):
+                        run.failed += len(unscored)
+                    if args.verbose:
+                        print(
+                            "[llm] error",
+                            f"model={run.spec.label}",
+                            f"error={exc}",
+                            flush=True,
+                        )
+                if writer.flushes != flushes:
+                    checkpoint_runs(conn, runs, lease)
+            if finish and not run.finished and (run.error is not None or run.outstanding <= 0):
+                finish_model_run(conn, writer, run, args.verbose)
+
+
+def enqueue_work(
+    conn,
+    data_version: str,
+    week: str,
+    model: str,
+    prompt_hash: str,
+    task_inputs: List[TaskInput],
+) -> int:
+    if not task_inputs:
+        return 0
+    with conn.cursor() as cur:
+        cur.executemany(
+            """
+            INSERT INTO score_work_item (
+                data_version, week, task_id, model, prompt_hash, input_hash,
+                task_statement, context, task_input
+            )
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            ON CONFLICT (data_version, week, task_id, model, prompt_hash, input_hash)
+            DO UPDATE SET status = 'pending',
+                          attempts = 0,
+                          last_error = NULL,
+                          updated_at = NOW()
+            WHERE score_work_item.status = 'failed'
+            """,
+            [
+                (
+                    data_version,
+                    week,
+                    item.task_id,
+                    model,
+                    prompt_hash,
+                    item.input_hash,
+                    item.task_statement,
+                    item.context,
+                    item.task_input,
+                )
+                for item in task_inputs
+            ],
+        )
+    conn.commit()
+    return len(task_inputs)
+
+
+def lease_work(
+    conn,
+    run: ModelRun,
+    worker_id: str,
+    data_version: str,
+    week: str,
+    prompt_hash: str,
+    score_hashes: List[str],
+    size: int,
+    lease_seconds: float,
+    max_attempts: int,
+) -> List[TaskInput]:
+    params = {
+        "data_version": data_version,
+        "week": week,
+        "model": run.spec.label,
+        "prompt_hash": prompt_hash,
+        "score_hashes": score_hashes,
+        "max_attempts": max_attempts,
+        "size": max(1, size),
+        "worker_id": worker_id,
+        "lease_seconds": lease_seconds,
+        "run_id": run.run_id,
+    }
+    with conn.cursor() as cur:
+        # A lease that expired on its last attempt is never picked again; fail it so a re-enqueue resets it.
+        cur.execute(
+            """
+            UPDATE score_work_item
+            SET status = 'failed',
+                leased_by = NULL,
+                lease_expires_at = NULL,
+                last_error = 'lease expired',
+                updated_at = NOW()
+            WHERE status = 'leased'
+              AND lease_expires_at < NOW()
+              AND attempts >= %(max_attempts)s
+              AND data_version = %(data_version)s
+              AND week = %(week)s
+              AND model = %(model)s
+              AND prompt_hash = %(prompt_hash)s
+            """,
+            params,
+        )
+        rows = []
+        # Items whose scores already reached task_ai_score (e.g. before a failed flush or a crash) are closed, not
+        # sent to the provider again.
+        while not rows:
+            cur.execute(
+                """
+                WITH picked AS (
+                  SELECT w.id,
+                         EXISTS (
+                           SELECT 1
+                           FROM task_ai_score s
+                           WHERE s.data_version = w.data_version
+                             AND s.week = w.week
+                             AND s.task_id = w.task_id
+                             AND s.model = w.model
+                             AND s.prompt_hash = ANY(%(score_hashes)s)
+                             AND s.input_hash = w.input_hash
+                         ) AS scored
+                  FROM score_work_item w
+                  WHERE w.data_version = %(data_version)s
+                    AND w.week = %(week)s
+                    AND w.model = %(model)s
+                    AND w.prompt_hash = %(prompt_hash)s
+                    AND w.attempts < %(max_attempts)s
+                    AND (w.status = 'pending' OR (w.status = 'leased' AND w.lease_expires_at < NOW()))
+                  ORDER BY w.id
+                  LIMIT %(size)s
+                  FOR UPDATE SKIP LOCKED
+                )
+                UPDATE score_work_item w
+                SET status = CASE WHEN picked.scored THEN 'done' ELSE 'leased' END,
+                    leased_by = CASE WHEN picked.scored THEN NULL ELSE %(worker_id)s END,
+                    lease_expires_at = CASE
+                      WHEN picked.scored THEN NULL
+                      ELSE NOW() + make_interval(secs => %(lease_seconds)s)
+                    END,
+                    attempts = CASE WHEN picked.scored THEN w.attempts ELSE w.attempts + 1 END,
+                    run_id = CASE WHEN picked.scored THEN w.run_id ELSE %(run_id)s END,
+                    updated_at = NOW()
+                FROM picked
+                WHERE w.id = picked.id
+                RETURNING w.id, w.task_id, w.input_hash, w.task_statement, w.context, w.task_input, picked.scored
+                """,
+                params,
+            )
+            picked = cur.fetchall()
+            if not picked:
+                break
+            rows = [row[:6] for row in picked if not row[6]]
+    conn.commit()
+    return [
+        TaskInput(
+            task_id=task_id,
+            task_statement=task_statement,
+            context=context,
+            task_input=task_input,
+            input_hash=input_hash,
+            work_id=work_id,
+        )
+        for work_id, task_id, input_hash, task_statement, context, task_input in sorted(rows)
+    ]
+
+
+def renew_leases(cur, worker_id: str, lease_seconds: float) -> None:
+    cur.execute(
+        """
+        UPDATE score_work_item
+        SET lease_expires_at = NOW() + make_interval(secs => %s)
+        WHERE leased_by = %s
+          AND status = 'leased'
+        """,
+        (lease_seconds, worker_id),
+    )
+
+
+def complete_work(conn, run: ModelRun, worker_id: str, max_attempts: int) -> None:
+    done_ids = [item.work_id for item in run.done]
+    done = set(done_ids)
+    # Items left behind by an open circuit go back to the queue without using up an attempt.
+    deferred = isinstance(run.error, CircuitOpenError)
+    released = [item.work_id for item in run.pending if item.work_id not in done]
+    run_error = str(run.error) if run.error is not None else None
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            UPDATE score_work_item
+            SET status = 'done',
+                lease_expires_at = NULL,
+                updated_at = NOW()
+            WHERE id = ANY(%s)
+              AND leased_by = %s
+            """,
+            (done_ids, worker_id),
+        )
+        cur.execute(
+            """
+            UPDATE score_work_item w
+            SET status = CASE WHEN w.attempts >= %(max_attempts)s AND NOT r.refund THEN 'failed' ELSE 'pending' END,
+                attempts = CASE WHEN r.refund THEN w.attempts - 1 ELSE w.attempts END,
+                leased_by = NULL,
+                lease_expires_at = NULL,
+                last_error = r.error,
+                updated_at = NOW()
+            FROM unnest(%(ids)s::bigint[], %(errors)s::text[], %(refunds)s::boolean[]) AS r(id, error, refund)
+            WHERE w.id = r.id
+              AND w.leased_by = %(worker_id)s
+              AND w.status = 'leased'
+            """,
+            {
+                "max_attempts": max_attempts,
+                "ids": released,
+                "errors": [run.item_errors.get(work_id, run_error) for work_id in released],
+                "refunds": [deferred and work_id not in run.item_errors for work_id in released],
+                "worker_id": worker_id,
+            },
+        )
+    conn.commit()
+
+
+def run_queue_worker(
+    conn,
+    writer: ScoreWriter,
+    runs: List[ModelRun],
+    args,
+    raw_store: RawStore,
+    data_version: str,
+    week: str,
+    prompt_hash: str,
+    score_hashes: List[str],
+) -> Set[int]:
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    lease = (worker_id, args.lease_seconds)
+    touched: Set[int] = set()
+    active = list(runs)
+    while active:
+        for run in active:
+            run.pending = lease_work(
+                conn,
+                run,
+                worker_id,
+                data_version,
+                week,
+                prompt_hash,
+                score_hashes,
+                args.lease_size,
+                args.lease_seconds,
+                args.max_attempts,
+            )
+            run.outstanding = len(run.pending)
+        working = [run for run in active if run.pending]
+        if not working:
+            break
+        score_runs(conn, writer, working, args, raw_store, data_version, week, prompt_hash, finish=False, lease=lease)
+        try:
+            writer.flush()
+        except Exception as exc:
+            # Rows still buffered never reached task_ai_score; items flushed earlier in the lease did.
+            unwritten = writer.buffered_keys()
+            for run in working:
+                run.done = [
+                    item for item in run.done if (item.task_id, run.spec.label, item.input_hash) not in unwritten
+                ]
+                if run.error is None:
+                    run.error = exc
+        for run in working:
+            complete_work(conn, run, worker_id, args.max_attempts)
+            touched.update(item.task_id for item in run.done)
+            failed = len(run.item_errors)
+            run.done = []
+            run.item_errors = {}
+            if args.verbose:
+                print(
+                    "[llm] lease done",
+                    f"model={run.spec.label}",
+                    f"worker={worker_id}",
+                    f"leased={len(run.pending)}",
+                    f"scored={run.scored}",
+                    f"failed={failed}",
+                    flush=True,
+                )
+            if run.error is not None:
+                finish_model_run(conn, writer, run, args.verbose)
+        checkpoint_runs(conn, runs)
+        active = [run for run in active if run.error is None]
+    for run in runs:
+        if not run.finished:
+            finish_model_run(conn, writer, run, args.verbose)
+    return touched
+
+
+def batch_custom_id(item: TaskInput) -> str:
+    return f"task-{item.task_id}-{item.input_hash[:16]}"
+
+
+def submit_batches(conn, run: ModelRun, prompt_hash: str, max_requests: int, verbose: bool) -> int:
+    submitted = 0
+    step = max(1, max_requests)
+    for start in range(0, len(run.pending), step):
+        chunk = run.pending[start : start + step]
+        external_id = run.batch_client.submit(
+            [BatchRequest(custom_id=batch_custom_id(item), task_input=item.task_input) for item in chunk],
+            PROMPT_TEMPLATE,
+            SCORE_SCHEMA,
+        )
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                INSERT INTO model_run_batch (run_id, provider, external_id, prompt_hash, status, request_count)
+                VALUES (%s, %s, %s, %s, %s, %s)
+                RETURNING id
+                """,
+                (run.run_id, run.spec.provider, external_id, prompt_hash, BATCH_IN_PROGRESS, len(chunk)),
+            )
+            batch_id = cur.fetchone()[0]
+            cur.executemany(
+                """
+                INSERT INTO model_run_batch_item
+                  (batch_id, custom_id, task_id, input_hash, task_statement, context, task_input)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+                """,
+                [
+                    (
+                        batch_id,
+                        batch_custom_id(item),
+                        item.task_id,
+                        item.input_hash,
+                        item.task_statement,
+                        item.context,
+                        item.task_input,
+                    )
+                    for item in chunk
+                ],
+            )
+            cur.execute("UPDATE model_run SET status = %s WHERE id = %s", ("batch_submitted", run.run_id))
+        conn.commit()
+        submitted += len(chunk)
+        if verbose:
+            print(
+                "[llm] batch submit",
+                f"model={run.spec.label}",
+                f"run_id={run.run_id}",
+                f"batch={external_id}",
+                f"requests={len(chunk)}",
+                flush=True,
+            )
+    return submitted
+
+
+def collect_batches(conn, args, use_mock: bool, raw_store: RawStore) -> int:
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT b.id, b.run_id, b.external_id, b.prompt_hash,
+                   mr.data_version, mr.week, mr.model, mr.prompt_version, mr.model_version
+            FROM model_run_batch b
+            JOIN model_run mr ON mr.id = b.run_id
+            WHERE b.status = %s
+              AND mr.data_version = %s
+              AND (%s::text IS NULL OR mr.week = %s)
+            ORDER BY b.id
+            """,
+            (BATCH_IN_PROGRESS, args.data_version, args.week, args.week),
+        )
+        batches = cur.fetchall()
+
+    clients: Dict[str, BatchClient] = {}
+    touched: Dict[Tuple[str, str], Set[int]] = {}
+    finished_runs: Set[int] = set()
+    pending = 0
+    writer = ScoreWriter(conn, flush_size=args.flush_size, flush_interval=args.flush_interval)
+    for batch_id, run_id, external_id, prompt_hash, data_version, week, model, prompt_version, model_version in batches:
+        spec = parse_model_spec(model)
+        client = clients.get(model)
+        if client is None:
+            client = get_batch_client(spec, use_mock)
+            clients[model] = client
+        status = client.poll(external_id)
+        if status == BATCH_IN_PROGRESS:
+            pending += 1
+            if args.verbose:
+                print("[llm] batch pending", f"model={model}", f"batch={external_id}", flush=True)
+            continue
+
+        error_message = None
+        scored = 0
+        if status == BATCH_COMPLETED:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT custom_id, task_id, input_hash, task_statement, context, task_input
+                    FROM model_run_batch_item
+                    WHERE batch_id = %s
+                    """,
+                    (batch_id,),
+                )
+                items = {
+                    row[0]: TaskInput(
+                        task_id=row[1],
+                        task_statement=row[3],
+                        context=row[4],
+                        task_input=row[5],
+                        input_hash=row[2],
+                    )
+                    for row in cur.fetchall()
+                }
+            run = ModelRun(
+                spec=spec,
+                provider=None,
+                run_id=run_id,
+                prompt_version=prompt_version,
+                model_version=model_version,
+            )
+            failures = 0
+            for result in client.results(external_id, SCORE_SCHEMA):
+                item = items.get(result.custom_id)
+                if item is None:
+                    continue
+                if result.scores is None:
+                    failures += 1
+                    if args.verbose:
+                        print(
+                            "[llm] batch error",
+                            f"model={model}",
+                            f"task_id={item.task_id}",
+                            f"error={result.error}",
+                            flush=True,
+                        )
+                    continue
+                store_score(
+                    writer, run, item, result.scores, raw_store, data_version, week, prompt_hash, args.verbose
+                )
+                touched.setdefault((data_version, week), set()).add(item.task_id)
+            writer.flush()
+            scored = run.scored
+            missing = len(items) - scored
+            if missing:
+                # Unscored requests stay cache misses and are resubmitted by the next batch run.
+                error_message = f"{missing} of {len(items)} requests not scored ({failures} errors)"
+        else:
+            error_message = f"provider batch {external_id} failed"
+
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                UPDATE model_run_batch
+                SET status = %s,
+                    error_message = %s,
+                    updated_at = NOW(),
+                    collected_at = NOW()
+                WHERE id = %s
+                """,
+                (BATCH_COMPLETED if status == BATCH_COMPLETED else BATCH_FAILED, error_message, batch_id),
+            )
+        conn.commit()
+        finished_runs.add(run_id)
+        if args.verbose:
+            print(
+                "[llm] batch collect",
+                f"model={model}",
+                f"batch={external_id}",
+                f"status={status}",
+                f"scored={scored}",
+                flush=True,
+            )
+
+    for run_id in finished_runs:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                UPDATE model_run mr
+                SET status = CASE WHEN agg.all_failed THEN 'failed' ELSE 'completed' END,
+                    error_message = agg.errors,
+                    error_at = CASE WHEN agg.any_failed THEN NOW() ELSE mr.error_at END
+                FROM (
+                  SELECT run_id,
+                         COUNT(*) FILTER (WHERE status = %(open)s) AS open_count,
+                         bool_and(status = %(failed)s) AS all_failed,
+                         bool_or(status = %(failed)s) AS any_failed,
+                         string_agg(error_message, '; ' ORDER BY id) AS errors
+                  FROM model_run_batch
+                  WHERE run_id = %(run_id)s
+                  GROUP BY run_id
+                ) agg
+                WHERE mr.id = agg.run_id
+                  AND agg.open_count = 0
+                """,
+                {"open": BATCH_IN_PROGRESS, "failed": BATCH_FAILED, "run_id": run_id},
+            )
+        conn.commit()
+
+    for (data_version, week), task_ids in touched.items():
+        upsert_task_ensemble(conn, data_version, week, sorted(task_ids))
+    return pending
+
+
 def main():
     parser = argparse.ArgumentParser(description="Score tasks with LLMs (mocked by default)")
     parser.add_argument("--limit", type=int, default=20)
@@ -267,12 +1396,112 @@ def main():
     parser.add_argument("--retry-base-delay", type=float, default=float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5")))
     parser.add_argument("--retry-max-delay", type=float, default=float(os.getenv("LLM_RETRY_MAX_DELAY", "10.0")))
     parser.add_argument("--retry-jitter", type=float, default=float(os.getenv("LLM_RETRY_JITTER", "0.2")))
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=int(os.getenv("LLM_CONCURRENCY", "4")),
+        help="In-flight scoring calls per provider (override with LLM_<PROVIDER>_CONCURRENCY)",
+    )
+    parser.add_argument(
+        "--flush-size",
+        type=int,
+        default=int(os.getenv("LLM_WRITE_BATCH_SIZE", "100")),
+        help="Buffered task_ai_score rows per COPY flush",
+    )
+    parser.add_argument(
+        "--flush-interval",
+        type=float,
+        default=float(os.getenv("LLM_WRITE_FLUSH_SECONDS", "5.0")),
+        help="Flush buffered scores at least this often (seconds)",
+    )
+    parser.add_argument("--resume", type=int, help="Continue the remaining work of an interrupted model_run id")
+    parser.add_argument(
+        "--stale-after",
+        type=float,
+        default=float(os.getenv("LLM_RUN_STALE_SECONDS", "1800")),
+        help="Mark running model_runs without a heartbeat for this many seconds as abandoned (0 disables)",
+    )
+    parser.add_argument(
+        "--tasks-per-call",
+        type=int,
+        default=int(os.getenv("LLM_TASKS_PER_CALL", "1")),
+        help="sync: tasks packed into one provider call; missing results fall back to single-task calls",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=["sync", "batch", "collect", "enqueue", "work"],
+        default=os.getenv("LLM_SCORE_MODE", "sync"),
+        help=(
+            "sync: score now; batch: submit provider batch jobs; collect: ingest finished batch jobs; "
+            "enqueue: queue uncached work in score_work_item; work: lease and score queued work"
+        ),
+    )
+    parser.add_argument(
+        "--lease-size",
+        type=int,
+        default=int(os.getenv("LLM_QUEUE_LEASE_SIZE", "50")),
+        help="work: queue items leased per model at a time",
+    )
+    parser.add_argument(
+        "--lease-seconds",
+        type=float,
+        default=float(os.getenv("LLM_QUEUE_LEASE_SECONDS", "600")),
+        help="work: lease duration; renewed on every score flush",
+    )
+    parser.add_argument(
+        "--max-attempts",
+        type=int,
+        default=int(os.getenv("LLM_QUEUE_MAX_ATTEMPTS", "3")),
+        help="work: leases per item before it is marked failed",
+    )
+    parser.add_argument(
+        "--batch-max-requests",
+        type=int,
+        default=int(os.getenv("LLM_BATCH_MAX_REQUESTS", "5000")),
+        help="Requests per provider batch job",
+    )
+    parser.add_argument("--wait", action="store_true", help="collect: poll until no batch is in progress")
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=float(os.getenv("LLM_BATCH_POLL_SECONDS", "60")),
+        help="collect --wait: seconds between polls",
+    )
+    parser.add_argument(
+        "--dedupe",
+        action="store_true",
+        default=env_flag("LLM_DEDUPE", "0"),
+        help="sync: score one task per near-duplicate cluster (see worker.dedupe) and copy its scores to the rest",
+    )
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        default=env_flag("LLM_ADAPTIVE", "0"),
+        help="sync: score with the first model, then call the others only for tasks that need a second opinion",
+    )
+    parser.add_argument(
+        "--adaptive-min-confidence",
+        type=float,
+        default=float(os.getenv("LLM_ADAPTIVE_MIN_CONFIDENCE", "0.7")),
+        help="adaptive: dispatch other models when the first model's confidence is below this",
+    )
+    parser.add_argument(
+        "--adaptive-max-std",
+        type=float,
+        default=float(os.getenv("LLM_ADAPTIVE_MAX_STD", "10")),
+        help="adaptive: dispatch when the last multi-model ensemble std of the task is at least this",
+    )
+    parser.add_argument(
+        "--adaptive-min-delta",
+        type=float,
+        default=float(os.getenv("LLM_ADAPTIVE_MIN_DELTA", "0.1")),
+        help="adaptive: dispatch when the tech-progress |delta| of the task is at least this",
+    )
     parser.add_argument("--verbose", action="store_true", default=env_flag("LLM_VERBOSE", "0"))
     args = parser.parse_args()
 
     models = [m.strip() for m in args.models.split(",") if m.strip()]
     output_dir = Path(args.output_dir)
-    output_dir.mkdir(parents=True, exist_ok=True)
     data_version = args.data_version
     use_mock = env_flag("USE_MOCK_LLM", "1")
     enabled_providers = get_enabled_providers()
@@ -283,9 +1512,50 @@ def main():
             model_specs.append(parse_model_spec(raw))
         except ProviderError as exc:
             print(f"[llm] skip invalid spec '{raw}': {exc}")
+    args.adaptive_primary = model_specs[0].label if model_specs else None
+
+    with get_conn() as conn, RawStore(output_dir) as raw_store:
+        if args.mode == "collect":
+            while True:
+                pending = collect_batches(conn, args, use_mock, raw_store)
+                if not args.wait or pending == 0:
+                    break
+                time.sleep(max(0.0, args.poll_interval))
+            print("[llm] collect", f"data_version={data_version}", f"pending_batches={pending}", flush=True)
+            return
+
+        abandoned = mark_stale_runs(conn, args.stale_after)
+        if abandoned:
+            print("[llm] abandoned stale runs", f"run_ids={[run_id for run_id, _, _ in abandoned]}", flush=True)
+            refresh_stale_weeks(conn, {(dv, week) for _, dv, week in abandoned}, args.verbose)
+
+        resume = None
+        if args.resume is not None:
+            resume = load_resume_run(conn, args.resume, args.stale_after)
+            if resume is None:
+                return
+            # Tasks scored before the crash come back as cache hits and never reach the ensemble upsert.
+            refresh_stale_weeks(conn, {(resume["data_version"], resume["week"])}, args.verbose)
+            # A resumed run replays its own scope, model and prompt; only the remaining tasks are scored.
+            params = resume["params_json"]
+            data_version = resume["data_version"]
+            args.week = resume["week"]
+            args.limit = params.get("limit", args.limit)
+            args.prompt_version = resume["prompt_version"]
+            args.model_version = resume["model_version"]
+            args.tasks_per_call = params.get("tasks_per_call", 1)
+            args.dedupe = params.get("dedupe", False)
+            # Resuming one model of an adaptive run re-plans its dispatch against the recorded primary.
+            args.adaptive_primary = params.get("adaptive_primary")
+            args.adaptive = bool(params.get("adaptive")) and args.adaptive_primary is not None
+            args.adaptive_min_confidence = params.get("adaptive_min_confidence", args.adaptive_min_confidence)
+            args.adaptive_max_std = params.get("adaptive_max_std", args.adaptive_max_std)
+            args.adaptive_min_delta = params.get("adaptive_min_delta", args.adaptive_min_delta)
+            model_specs = [parse_model_spec(resume["model"])]
 
-    with get_conn() as conn:
         week, active_id = resolve_active_scope(conn, data_version, args.week)
+        if resume is not None and resume["params_json"].get("active_id"):
+            active_id = resume["params_json"]["active_id"]
         if not week or not active_id:
             print(
                 "[llm] no active scope",
@@ -295,31 +1565,34 @@ def main():
             )
             return
 
-        with conn.cursor() as cur:
-            cur.execute(
-                """
-                SELECT sat.task_id, ts.task_statement
-                FROM tech_progress_scope_active_task sat
-                JOIN task_statements ts
-                  ON ts.data_version = sat.data_version
-                 AND ts.task_id = sat.task_id
-                LEFT JOIN task_catalog tc
-                  ON tc.data_version = sat.data_version
-                 AND tc.task_id = sat.task_id
-                WHERE sat.active_id = %(active_id)s
-                  AND sat.data_version = %(data_version)s
-                ORDER BY tc.score DESC NULLS LAST, sat.task_id
-                LIMIT %(limit)s
-                """,
-                {
-                    "active_id": active_id,
-                    "data_version": data_version,
-                    "limit": args.limit,
-                },
-            )
-            tasks = cur.fetchall()
+        # Queue workers lease their work from score_work_item instead of selecting tasks.
+        tasks = []
+        if args.mode != "work":
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT sat.task_id, ts.task_statement
+                    FROM tech_progress_scope_active_task sat
+                    JOIN task_statements ts
+                      ON ts.data_version = sat.data_version
+                     AND ts.task_id = sat.task_id
+                    LEFT JOIN task_catalog tc
+                      ON tc.data_version = sat.data_version
+                     AND tc.task_id = sat.task_id
+                    WHERE sat.active_id = %(active_id)s
+                      AND sat.data_version = %(data_version)s
+                    ORDER BY tc.score DESC NULLS LAST, sat.task_id
+                    LIMIT %(limit)s
+                    """,
+                    {
+                        "active_id": active_id,
+                        "data_version": data_version,
+                        "limit": args.limit,
+                    },
+                )
+                tasks = cur.fetchall()
 
-        if not tasks:
+        if not tasks and args.mode != "work":
             print(
                 "[llm] no tasks",
                 f"data_version={data_version}",
@@ -343,9 +1616,66 @@ def main():
                 f"tasks={len(tasks)}",
                 f"models={model_labels}",
                 f"mock={use_mock}",
+                f"mode={args.mode}",
+                flush=True,
+            )
+
+        prompt_hash = prompt_hash_for(args)
+        # Single-task scores are reused by packed runs; packed scores only by runs packing the same way.
+        cache_hashes = [prompt_hash]
+        if args.tasks_per_call > 1:
+            cache_hashes.append(prompt_hash_for(args, args.tasks_per_call))
+        task_inputs: List[TaskInput] = []
+        for task_id, task_statement in tasks:
+            context = format_progress_context(task_cards.get(task_id), task_snapshots.get(task_id))
+            task_input = build_task_input(task_statement or "", week, context)
+            task_inputs.append(
+                TaskInput(
+                    task_id=task_id,
+                    task_statement=task_statement,
+                    context=context,
+                    task_input=task_input,
+                    input_hash=hash_text(task_input),
+                )
+            )
+
+        if args.dedupe and args.mode != "sync":
+            print("[llm] --dedupe only applies to sync mode; scoring every task", f"mode={args.mode}", flush=True)
+            args.dedupe = False
+        if args.adaptive and args.mode != "sync":
+            print(
+                "[llm] --adaptive only applies to sync mode; every model scores every task",
+                f"mode={args.mode}",
                 flush=True,
             )
+            args.adaptive = False
+        inputs_by_task = {item.task_id: item for item in task_inputs}
+        representatives = load_representatives(conn, data_version, task_ids) if args.dedupe else {}
 
+        if args.mode == "enqueue":
+            for spec in model_specs:
+                if not is_provider_enabled(spec.provider, enabled_providers):
+                    continue
+                cached = fetch_cached_inputs(conn, data_version, week, spec.label, cache_hashes, task_inputs)
+                queued = enqueue_work(
+                    conn,
+                    data_version,
+                    week,
+                    spec.label,
+                    prompt_hash,
+                    [item for item in task_inputs if (item.task_id, item.input_hash) not in cached],
+                )
+                print(
+                    "[llm] enqueue",
+                    f"model={spec.label}",
+                    f"week={week}",
+                    f"queued={queued}",
+                    f"cache_hits={len(cached)}",
+                    flush=True,
+                )
+            return
+
+        runs: List[ModelRun] = []
         for spec in model_specs:
             model_label = spec.label
             if not is_provider_enabled(spec.provider, enabled_providers):
@@ -376,7 +1706,12 @@ def main():
                 continue
 
             try:
-                provider = get_provider(spec, use_mock)
+                if args.mode == "batch":
+                    provider = None
+                    batch_client = get_batch_client(spec, use_mock)
+                else:
+                    provider = get_provider(spec, use_mock, provider_concurrency(spec.provider, args.concurrency))
+                    batch_client = None
             except ProviderError as exc:
                 with conn.cursor() as cur:
                     cur.execute(
@@ -404,281 +1739,185 @@ def main():
                     )
                 continue
             with conn.cursor() as cur:
-                cur.execute(
-                    """
-                    INSERT INTO model_run (data_version, week, model, prompt_version, model_version, status)
-                    VALUES (%s, %s, %s, %s, %s, %s)
-                    RETURNING id
-                    """,
-                    (
-                        data_version,
-                        week,
-                        model_label,
-                        args.prompt_version,
-                        args.model_version,
-                        "running",
-                    ),
-                )
-                run_id = cur.fetchone()[0]
-                conn.commit()
-
-            prompt_hash = hash_text(
-                f"{PROMPT_TEMPLATE}|{args.prompt_version}|{args.model_version}"
-            )
-            cache_hits = 0
-            scored = 0
-            if args.verbose:
-                print("[llm] run", f"model={model_label}", f"run_id={run_id}", flush=True)
-            try:
-                for task_id, task_statement in tasks:
-                    card = task_cards.get(task_id)
-                    snapshot = task_snapshots.get(task_id)
-                    context = format_progress_context(card, snapshot)
-                    task_input = build_task_input(task_statement or "", week, context)
-                    input_hash = hash_text(task_input)
-                    with conn.cursor() as cur:
-                        cur.execute(
-                            """
-                            SELECT 1
-                            FROM task_ai_score
-                            WHERE data_version = %s
-                              AND week = %s
-                              AND task_id = %s AND model = %s
-                              AND prompt_hash = %s AND input_hash = %s
-                            """,
-                            (
-                                data_version,
-                                week,
-                                task_id,
-                                model_label,
-                                prompt_hash,
-                                input_hash,
-                            ),
-                        )
-                        if cur.fetchone():
-                            cache_hits += 1
-                            if args.verbose:
-                                print(
-                                    "[llm] cache",
-                                    f"model={model_label}",
-                                    f"task_id={task_id}",
-                                    flush=True,
-                                )
-                            continue
-
-                    def _score_call():
-                        return provider.score(
-                            task_input,
-                            PROMPT_TEMPLATE,
-                            args.prompt_version,
-                            args.model_version,
-                            schema=SCORE_SCHEMA,
-                        )
-
-                    scores = retry_call(
-                        _score_call,
-                        retries=args.max_retries,
-                        base_delay=args.retry_base_delay,
-                        max_delay=args.retry_max_delay,
-                        jitter=args.retry_jitter,
-                    )
-                    scored += 1
-                    substitution = scores.get("ai_substitution_risk")
-                    if args.verbose:
-                        print(
-                            "[llm] score",
-                            f"model={model_label}",
-                            f"task_id={task_id}",
-                            f"score={substitution}",
-                            flush=True,
-                        )
-                    payload = {
-                        "provider": spec.provider,
-                        "model": spec.model,
-                        "model_label": model_label,
-                        "prompt_version": args.prompt_version,
-                        "model_version": args.model_version,
-                        "data_version": data_version,
-                        "week": week,
-                        "task_id": task_id,
-                        "task_statement": task_statement,
-                        "task_input": task_input,
-                        "tech_progress_context": context,
-                        "score": substitution,
-                        "scores": scores,
-                    }
-                    safe_model = model_label.replace(":", "_").replace("/", "_")
-                    safe_week = week.replace("/", "_")
-                    raw_path = (
-                        output_dir
-                        / f"run_{run_id}_week_{safe_week}_task_{task_id}_{safe_model}.json"
-                    )
-                    raw_path.write_text(json.dumps(payload, ensure_ascii=True))
-
-                    with conn.cursor() as cur:
-                        cur.execute(
-                            """
-                            INSERT INTO task_ai_score
-                                (data_version, week, task_id, model, score, ai_substitution_risk,
-                                 ai_augmentation_potential, human_context_dependency, physical_world_dependency,
-                                 confidence, run_id, raw_json_ref, prompt_hash, input_hash)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                            ON CONFLICT (data_version, week, task_id, model, prompt_hash, input_hash) DO NOTHING
-                            """,
-                            (
-                                data_version,
-                                week,
-                                task_id,
-                                model_label,
-                                substitution,
-                                scores.get("ai_substitution_risk"),
-                                scores.get("ai_augmentation_potential"),
-                                scores.get("human_context_dependency"),
-                                scores.get("physical_world_dependency"),
-                                scores.get("confidence"),
-                                run_id,
-                                str(raw_path),
-                                prompt_hash,
-                                input_hash,
-                            ),
-                        )
-                    conn.commit()
-
-            except ProviderError as exc:
-                with conn.cursor() as cur:
+                if resume is not None:
                     cur.execute(
                         """
                         UPDATE model_run
                         SET status = %s,
-                            error_message = %s,
-                            error_at = NOW()
+                            error_message = NULL,
+                            error_at = NULL,
+                            tasks_total = %s,
+                            heartbeat_at = NOW()
                         WHERE id = %s
+                        RETURNING id
                         """,
-                        ("failed", str(exc), run_id),
-                    )
-                conn.commit()
-                if args.verbose:
-                    print(
-                        "[llm] error",
-                        f"model={model_label}",
-                        f"error={exc}",
-                        flush=True,
+                        ("running", len(task_inputs), resume["id"]),
                     )
-                continue
-            except Exception as exc:
-                with conn.cursor() as cur:
+                else:
                     cur.execute(
                         """
-                        UPDATE model_run
-                        SET status = %s,
-                            error_message = %s,
-                            error_at = NOW()
-                        WHERE id = %s
-                        """,
-                        ("failed", str(exc), run_id),
-                    )
-                conn.commit()
-                if args.verbose:
-                    print(
-                        "[llm] error",
-                        f"model={model_label}",
-                        f"error={exc}",
-                        flush=True,
-                    )
-                continue
-            else:
-                with conn.cursor() as cur:
-                    cur.execute(
-                        """
-                        UPDATE model_run
-                        SET status = %s
-                        WHERE id = %s
+                        INSERT INTO model_run (
+                            data_version, week, model, prompt_version, model_version, status,
+                            params_json, tasks_total, heartbeat_at
+                        )
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, NOW())
+                        RETURNING id
                         """,
-                        ("completed", run_id),
+                        (
+                            data_version,
+                            week,
+                            model_label,
+                            args.prompt_version,
+                            args.model_version,
+                            "running",
+                            json.dumps(
+                                {
+                                    "active_id": active_id,
+                                    "limit": args.limit,
+                                    "mode": args.mode,
+                                    "tasks_per_call": args.tasks_per_call,
+                                    "dedupe": args.dedupe,
+                                    "adaptive": args.adaptive,
+                                    "adaptive_primary": args.adaptive_primary if args.adaptive else None,
+                                    "adaptive_min_confidence": args.adaptive_min_confidence,
+                                    "adaptive_max_std": args.adaptive_max_std,
+                                    "adaptive_min_delta": args.adaptive_min_delta,
+                                }
+                            ),
+                            len(task_inputs),
+                        ),
                     )
+                run_id = cur.fetchone()[0]
                 conn.commit()
+
+            run = ModelRun(
+                spec=spec,
+                provider=provider,
+                run_id=run_id,
+                prompt_version=args.prompt_version,
+                model_version=args.model_version,
+                batch_client=batch_client,
+            )
+            runs.append(run)
+            if args.verbose:
+                print("[llm] run", f"model={model_label}", f"run_id={run_id}", flush=True)
+
+            cached = fetch_cached_inputs(conn, data_version, week, model_label, cache_hashes, task_inputs)
+            if args.mode == "batch":
+                cached |= fetch_open_batch_inputs(conn, data_version, week, model_label, prompt_hash)
+            cached_followers: List[Tuple[TaskInput, TaskInput]] = []
+            for item in task_inputs:
+                if (item.task_id, item.input_hash) in cached:
+                    run.cache_hits += 1
+                    if args.verbose:
+                        print(
+                            "[llm] cache",
+                            f"model={model_label}",
+                            f"task_id={item.task_id}",
+                            flush=True,
+                        )
+                    continue
+                # Only follow a representative scored against the same tech-progress context.
+                representative = inputs_by_task.get(representatives.get(item.task_id))
+                if representative is not None and representative.context == item.context:
+                    if (representative.task_id, representative.input_hash) in cached:
+                        cached_followers.append((item, representative))
+                    else:
+                        run.followers.setdefault(representative.task_id, []).append(item)
+                    continue
+                run.pending.append(item)
+            run.outstanding = len(run.pending)
+            if resume is not None:
+                # Work finished before the crash now shows up as cache hits; keep it counted as scored.
+                run.scored = resume["tasks_succeeded"] or 0
+                run.cache_hits = max(0, run.cache_hits - run.scored)
                 if args.verbose:
                     print(
-                        "[llm] done",
-                        f"model={model_label}",
-                        f"scored={scored}",
-                        f"cache_hits={cache_hits}",
+                        "[llm] resume",
+                        f"run_id={run_id}",
+                        f"remaining={len(run.pending)}",
+                        f"previously_scored={run.scored}",
                         flush=True,
                     )
+            copied = propagate_cached_scores(conn, run, data_version, week, cache_hashes, cached_followers)
+            run.scored += len(copied)
+            run.propagated += len(copied)
+            run.done.extend(copied)
 
-        task_ids = [task_id for task_id, _ in tasks]
-        if task_ids:
-            with conn.cursor() as cur:
-                cur.execute(
-                    """
-                    INSERT INTO task_ai_ensemble (
-                        data_version, week, task_id,
-                        mean, std, min, max,
-                        ai_augmentation_potential_mean, ai_augmentation_potential_std,
-                        ai_augmentation_potential_min, ai_augmentation_potential_max,
-                        human_context_dependency_mean, human_context_dependency_std,
-                        human_context_dependency_min, human_context_dependency_max,
-                        physical_world_dependency_mean, physical_world_dependency_std,
-                        physical_world_dependency_min, physical_world_dependency_max,
-                        confidence_mean, confidence_std, confidence_min, confidence_max,
-                        updated_at
-                    )
-                    SELECT
-                        data_version,
-                        week,
-                        task_id,
-                        AVG(score)::numeric(6,2) AS mean,
-                        STDDEV_POP(score)::numeric(6,2) AS std,
-                        MIN(score)::numeric(6,2) AS min,
-                        MAX(score)::numeric(6,2) AS max,
-                        AVG(ai_augmentation_potential)::numeric(6,2) AS ai_augmentation_potential_mean,
-                        STDDEV_POP(ai_augmentation_potential)::numeric(6,2) AS ai_augmentation_potential_std,
-                        MIN(ai_augmentation_potential)::numeric(6,2) AS ai_augmentation_potential_min,
-                        MAX(ai_augmentation_potential)::numeric(6,2) AS ai_augmentation_potential_max,
-                        AVG(human_context_dependency)::numeric(6,2) AS human_context_dependency_mean,
-                        STDDEV_POP(human_context_dependency)::numeric(6,2) AS human_context_dependency_std,
-                        MIN(human_context_dependency)::numeric(6,2) AS human_context_dependency_min,
-                        MAX(human_context_dependency)::numeric(6,2) AS human_context_dependency_max,
-                        AVG(physical_world_dependency)::numeric(6,2) AS physical_world_dependency_mean,
-                        STDDEV_POP(physical_world_dependency)::numeric(6,2) AS physical_world_dependency_std,
-                        MIN(physical_world_dependency)::numeric(6,2) AS physical_world_dependency_min,
-                        MAX(physical_world_dependency)::numeric(6,2) AS physical_world_dependency_max,
-                        AVG(confidence)::numeric(6,2) AS confidence_mean,
-                        STDDEV_POP(confidence)::numeric(6,2) AS confidence_std,
-                        MIN(confidence)::numeric(6,2) AS confidence_min,
-                        MAX(confidence)::numeric(6,2) AS confidence_max,
-                        NOW()
-                    FROM task_ai_score
-                    WHERE data_version = %s
-                      AND week = %s
-                      AND task_id = ANY(%s)
-                    GROUP BY data_version, week, task_id
-                    ON CONFLICT (data_version, week, task_id) DO UPDATE
-                    SET mean = EXCLUDED.mean,
-                        std = EXCLUDED.std,
-                        min = EXCLUDED.min,
-                        max = EXCLUDED.max,
-                        ai_augmentation_potential_mean = EXCLUDED.ai_augmentation_potential_mean,
-                        ai_augmentation_potential_std = EXCLUDED.ai_augmentation_potential_std,
-                        ai_augmentation_potential_min = EXCLUDED.ai_augmentation_potential_min,
-                        ai_augmentation_potential_max = EXCLUDED.ai_augmentation_potential_max,
-                        human_context_dependency_mean = EXCLUDED.human_context_dependency_mean,
-                        human_context_dependency_std = EXCLUDED.human_context_dependency_std,
-                        human_context_dependency_min = EXCLUDED.human_context_dependency_min,
-                        human_context_dependency_max = EXCLUDED.human_context_dependency_max,
-                        physical_world_dependency_mean = EXCLUDED.physical_world_dependency_mean,
-                        physical_world_dependency_std = EXCLUDED.physical_world_dependency_std,
-                        physical_world_dependency_min = EXCLUDED.physical_world_dependency_min,
-                        physical_world_dependency_max = EXCLUDED.physical_world_dependency_max,
-                        confidence_mean = EXCLUDED.confidence_mean,
-                        confidence_std = EXCLUDED.confidence_std,
-                        confidence_min = EXCLUDED.confidence_min,
-                        confidence_max = EXCLUDED.confidence_max,
-                        updated_at = EXCLUDED.updated_at
-                    """,
-                    (data_version, week, task_ids),
+        writer = ScoreWriter(conn, flush_size=args.flush_size, flush_interval=args.flush_interval)
+        for run in runs:
+            if run.outstanding == 0 and args.mode != "work":
+                finish_model_run(conn, writer, run, args.verbose)
+
+        changed: Set[int] = set()
+        secondaries = [run for run in runs if run.spec.label != args.adaptive_primary] if args.adaptive else []
+        if args.mode == "batch":
+            for run in runs:
+                if run.finished:
+                    continue
+                try:
+                    submit_batches(conn, run, prompt_hash, args.batch_max_requests, args.verbose)
+                except Exception as exc:
+                    run.error = exc
+                    finish_model_run(conn, writer, run, args.verbose)
+        elif args.mode == "work":
+            changed = run_queue_worker(
+                conn, writer, runs, args, raw_store, data_version, week, prompt_hash, cache_hashes
+            )
+        elif secondaries:
+            primaries = [run for run in runs if run.spec.label == args.adaptive_primary]
+            score_runs(conn, writer, primaries, args, raw_store, data_version, week, prompt_hash)
+            deltas = {
+                task_id: (task_cards.get(task_id) or task_snapshots.get(task_id) or {}).get("delta")
+                for task_id in task_ids
+            }
+            plan = plan_secondary_dispatch(
+                conn, args.adaptive_primary, task_inputs, deltas, data_version, week, cache_hashes, args
+            )
+            for run in secondaries:
+                if run.finished:
+                    continue
+                dispatched = [
+                    replace(item, dispatch_reason=plan[item.task_id]) for item in run.pending if item.task_id in plan
+                ]
+                run.adaptive_skips = len(run.pending) - len(dispatched)
+                run.pending = dispatched
+                run.outstanding = len(dispatched)
+                if not dispatched:
+                    finish_model_run(conn, writer, run, args.verbose)
+            remaining = [run for run in secondaries if not run.finished]
+            score_runs(conn, writer, remaining, args, raw_store, data_version, week, prompt_hash)
+            changed = {item.task_id for run in runs for item in run.done}
+            if args.verbose:
+                reasons: Dict[str, int] = {}
+                for value in plan.values():
+                    for reason in value.split(","):
+                        reasons[reason] = reasons.get(reason, 0) + 1
+                print(
+                    "[llm] adaptive",
+                    f"primary={args.adaptive_primary}",
+                    f"tasks={len(task_inputs)}",
+                    f"dispatched={len(plan)}",
+                    *(f"{reason}={count}" for reason, count in sorted(reasons.items())),
+                    flush=True,
                 )
-            conn.commit()
+        else:
+            score_runs(conn, writer, runs, args, raw_store, data_version, week, prompt_hash)
+            changed = {item.task_id for run in runs for item in run.done}
+            if args.verbose:
+                for stats in rate_limiter_stats():
+                    print("[llm] rate_limit", *(f"{key}={value}" for key, value in stats.items()), flush=True)
+                for stats in http_client_stats():
+                    print("[llm] http_pool", *(f"{key}={value}" for key, value in stats.items()), flush=True)
+                for stats in circuit_breaker_stats():
+                    print("[llm] breaker", *(f"{key}={value}" for key, value in stats.items()), flush=True)
+                for stats in hedge_stats():
+                    print("[llm] hedge", *(f"{key}={value}" for key, value in stats.items()), flush=True)
+
+        # Only tasks that received new scores in this run; batch results are folded in by --mode collect.
+        count = upsert_task_ensemble(conn, data_version, week, changed)
+        if args.verbose:
+            print("[llm] ensemble", f"week={week}", f"tasks={count}", flush=True)
 
 
 if __name__ == "__main__":
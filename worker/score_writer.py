@@ -0,0 +1,102 @@
+import time
+from typing import List, Sequence, Set, Tuple
+
+SCORE_COLUMNS = [
+    "data_version",
+    "week",
+    "task_id",
+    "model",
+    "score",
+    "ai_substitution_risk",
+    "ai_augmentation_potential",
+    "human_context_dependency",
+    "physical_world_dependency",
+    "confidence",
+    "run_id",
+    "raw_json_ref",
+    "prompt_hash",
+    "input_hash",
+    "source_task_id",
+    "dispatch_reason",
+]
+
+
+class ScoreWriter:
+    def __init__(self, conn, flush_size: int = 100, flush_interval: float = 5.0):
+        self.conn = conn
+        self.flush_size = max(1, flush_size)
+        self.flush_interval = flush_interval
+        self.rows: List[Tuple] = []
+        self.written = 0
+        self.flushes = 0
+        self._last_flush = time.monotonic()
+        self._staged = False
+
+    def add(self, row: Sequence) -> None:
+        self.rows.append(tuple(row))
+        if len(self.rows) >= self.flush_size or self._interval_elapsed():
+            self.flush()
+
+    def buffered_keys(self) -> Set[Tuple]:
+        columns = [SCORE_COLUMNS.index(name) for name in ("task_id", "model", "input_hash")]
+        return {tuple(row[index] for index in columns) for row in self.rows}
+
+    def _interval_elapsed(self) -> bool:
+        return self.flush_interval > 0 and time.monotonic() - self._last_flush >= self.flush_interval
+
+    def _ensure_stage(self, cur) -> None:
+        if self._staged:
+            return
+        cur.execute(
+            """
+            CREATE TEMP TABLE IF NOT EXISTS task_ai_score_stage (
+              data_version TEXT,
+              week VARCHAR(8),
+              task_id BIGINT,
+              model TEXT,
+              score NUMERIC(6,2),
+              ai_substitution_risk NUMERIC(6,2),
+              ai_augmentation_potential NUMERIC(6,2),
+              human_context_dependency NUMERIC(6,2),
+              physical_world_dependency NUMERIC(6,2),
+              confidence NUMERIC(6,2),
+              run_id BIGINT,
+              raw_json_ref TEXT,
+              prompt_hash TEXT,
+              input_hash TEXT,
+              source_task_id BIGINT,
+              dispatch_reason TEXT
+            ) ON COMMIT DELETE ROWS
+            """
+        )
+        self._staged = True
+
+    def flush(self) -> int:
+        self._last_flush = time.monotonic()
+        if not self.rows:
+            return 0
+        rows = self.rows
+        col_sql = ", ".join(SCORE_COLUMNS)
+        try:
+            with self.conn.cursor() as cur:
+                self._ensure_stage(cur)
+                with cur.copy(f"COPY task_ai_score_stage ({col_sql}) FROM STDIN") as copy:
+                    for row in rows:
+                        copy.write_row(row)
+                cur.execute(
+                    f"""
+                    INSERT INTO task_ai_score ({col_sql})
+                    SELECT {col_sql}
+                    FROM task_ai_score_stage
+                    ON CONFLICT (data_version, week, task_id, model, prompt_hash, input_hash) DO NOTHING
+                    """
+                )
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            self._staged = False
+            raise
+        self.rows = []
+        self.written += len(rows)
+        self.flushes += 1
+        return len(rows)
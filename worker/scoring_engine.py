@@ -0,0 +1,63 @@
+import os
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+def provider_concurrency(provider: str, default: int) -> int:
+    value = os.getenv(f"LLM_{provider.upper()}_CONCURRENCY", "").strip()
+    if not value:
+        return max(1, default)
+    try:
+        return max(1, int(value))
+    except ValueError:
+        return max(1, default)
+
+
+class ScoringEngine:
+    def __init__(self, default_concurrency: int = 4):
+        self.default_concurrency = max(1, default_concurrency)
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+
+    def limit_for(self, provider: str) -> int:
+        return provider_concurrency(provider, self.default_concurrency)
+
+    def submit(self, provider: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        executor = self._executors.get(provider)
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=self.limit_for(provider),
+                thread_name_prefix=f"score-{provider}",
+            )
+            self._executors[provider] = executor
+        return executor.submit(fn, *args, **kwargs)
+
+    def run_ordered(
+        self,
+        jobs: Iterable[Tuple[str, T, Callable[[], Any]]],
+        window: int,
+        skip: Optional[Callable[[T], bool]] = None,
+    ) -> Iterator[Tuple[T, Future]]:
+        # Keeps at most `window` calls in flight and yields them in submission order.
+        in_flight: Deque[Tuple[T, Future]] = deque()
+        for provider, item, fn in jobs:
+            if skip is not None and skip(item):
+                continue
+            in_flight.append((item, self.submit(provider, fn)))
+            while len(in_flight) >= max(1, window):
+                yield in_flight.popleft()
+        while in_flight:
+            yield in_flight.popleft()
+
+    def shutdown(self, cancel_pending: bool = False) -> None:
+        for executor in self._executors.values():
+            executor.shutdown(wait=True, cancel_futures=cancel_pending)
+        self._executors.clear()
+
+    def __enter__(self) -> "ScoringEngine":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.shutdown(cancel_pending=exc_type is not None)